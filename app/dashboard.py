@@ -0,0 +1,110 @@
+# app/dashboard.py
+"""
+Interactive explorer for raw vs neutral sprint times.
+
+    streamlit run app/dashboard.py
+
+The results frame and the venue aggregates are built once per version of
+the Parquet file (keyed by its mtime), the athlete table is read from the
+incremental aggregate store, and both are shared across reruns
+through st.cache_resource, so nothing is copied. A widget change only
+recomputes a filter mask, a downsampled scatter and, for what-if, one
+vectorized correction.
+"""
+
+import streamlit as st
+
+from dashboard_data import (
+    DATA_PATH, MAX_POINTS, aggregates, athlete_aggregates, downsample, filter_mask, load, what_if,
+)
+from correction_engine import CorrectionParams, DEFAULT_PARAMS
+
+st.set_page_config(page_title="KineticGen", page_icon="🏃", layout="wide")
+
+
+@st.cache_resource(show_spinner="Loading results...")
+def cached_data(path, mtime):
+    df = load(path)
+    return df, aggregates(df, "venue"), athlete_aggregates(path)
+
+
+@st.cache_data(max_entries=64)
+def cached_filter(path, mtime, venues, athletes, wind, altitude, years):
+    df, _, _ = cached_data(path, mtime)
+    return filter_mask(df, venues, athletes, wind, altitude, years)
+
+
+if not DATA_PATH.exists():
+    st.error(f"No data at {DATA_PATH}. Run the pipeline first (python src/pipeline.py).")
+    st.stop()
+
+mtime = DATA_PATH.stat().st_mtime
+df, by_venue, by_athlete = cached_data(str(DATA_PATH), mtime)
+
+# --- sidebar filters ---
+st.sidebar.header("Filters")
+venues = tuple(st.sidebar.multiselect("Venue", by_venue["venue"].tolist()))
+athletes = tuple(st.sidebar.multiselect("Athlete", by_athlete["athlete"].drop_duplicates().tolist()))
+
+
+def range_slider(label, col, step):
+    lo, hi = float(df[col].min()), float(df[col].max())
+    if not lo < hi:
+        return None
+    return st.sidebar.slider(label, lo, hi, (lo, hi), step=step)
+
+
+wind = range_slider("Wind (m/s)", "wind", 0.1)
+altitude = range_slider("Altitude (m)", "altitude_m", 10.0)
+year_min, year_max = df["year"].min(), df["year"].max()
+years = None
+if year_min is not None and year_min < year_max:
+    years = st.sidebar.slider("Season", int(year_min), int(year_max), (int(year_min), int(year_max)))
+
+mask = cached_filter(str(DATA_PATH), mtime, venues, athletes, wind, altitude, years)
+view = df[mask]
+
+st.title("🏃 Raw vs neutral sprint times")
+c1, c2, c3 = st.columns(3)
+c1.metric("Results", f"{len(view):,}")
+c2.metric("Best raw", f"{view['perf'].min():.2f} s" if len(view) else "–")
+c3.metric("Best neutral", f"{view['t_neutral'].min():.2f} s" if len(view) else "–")
+
+tab_times, tab_env, tab_tables, tab_what_if = st.tabs(["Times", "Conditions", "Aggregates", "What-if"])
+
+with tab_times:
+    pts = downsample(view, "perf", "t_neutral")
+    st.caption(f"Showing {len(pts):,} of {len(view):,} results (grid-thinned above {MAX_POINTS:,}).")
+    st.scatter_chart(pts, x="perf", y="t_neutral", color="venue" if len(venues) else None)
+
+with tab_env:
+    x = st.radio("Condition", ["wind", "rho_air_abs", "altitude_m"], horizontal=True)
+    st.scatter_chart(downsample(view, x, "delta"), x=x, y="delta")
+
+with tab_tables:
+    left, right = st.columns(2)
+    left.subheader("Venues")
+    left.dataframe(by_venue if not venues else by_venue[by_venue["venue"].isin(venues)],
+                   hide_index=True, use_container_width=True)
+    right.subheader("Athletes")
+    right.dataframe(by_athlete if not athletes else by_athlete[by_athlete["athlete"].isin(athletes)],
+                    hide_index=True, use_container_width=True)
+
+with tab_what_if:
+    a, b = st.columns(2)
+    w = a.slider("Wind (m/s)", -4.0, 4.0, 0.0, 0.1)
+    alt = a.slider("Altitude (m)", 0, 3000, 0, 50)
+    temp = b.slider("Temperature (°C)", -5, 40, 20)
+    rh = b.slider("Relative humidity (%)", 0, 100, 50)
+    with st.expander("Correction coefficients"):
+        params = CorrectionParams(
+            rho_ref=DEFAULT_PARAMS.rho_ref,
+            alt_scale=st.number_input("alt_scale (s/m)", value=DEFAULT_PARAMS.alt_scale, format="%.5f"),
+            wind_coeff=st.number_input("wind_coeff (s per m/s)", value=DEFAULT_PARAMS.wind_coeff, format="%.3f"),
+            rho_coeff=st.number_input("rho_coeff", value=DEFAULT_PARAMS.rho_coeff, format="%.3f"),
+        )
+    times, rho = what_if(view, w, alt, temp, rh, params)
+    st.caption(f"Air density under this condition: {rho:.3f} kg/m³")
+    table = view[["athlete", "venue", "date", "perf"]].join(times)
+    table["gain"] = table["perf"] - table["t_what_if"]
+    st.dataframe(table.nsmallest(200, "t_what_if"), hide_index=True, use_container_width=True)
@@ -0,0 +1,136 @@
+# app/dashboard_data.py
+"""
+Data layer of the dashboard: loading, filtering, aggregates, downsampling
+and what-if corrections. It has no Streamlit imports, so it can be reused
+and timed on its own. dashboard.py adds the caching and the widgets.
+
+Everything here works on whole columns. Venue and athlete are categoricals,
+so filtering a million rows is a few NumPy comparisons on integer codes.
+The athlete table comes from the incremental aggregate store
+(athlete_aggregates.py): a new data version folds in only the new results.
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "src" / "features"))
+from athlete_aggregates import readable, refresh_store  # noqa: E402
+from atmosphere import air_density  # noqa: E402
+from correction_engine import DEFAULT_PARAMS, neutral_times  # noqa: E402
+from results_dataset import ResultsDataset  # noqa: E402
+
+DATA_PATH = ROOT / "data" / "processed" / "results_physics_refined.parquet"
+STORE_DIR = ROOT / "data" / "processed" / "athlete_aggregates"
+COLUMNS = ["competitor", "dob", "venue", "date", "perf", "wind",
+           "altitude_m", "rho_air_abs", "t_neutral", "delta"]
+MAX_POINTS = 5000
+GRID = 200  # cells per axis used to thin scatter plots
+
+
+def _text(values):
+    """Column as text with '?' for missing; the clean schema stores names as dictionaries (categoricals)."""
+    return values.astype("string").fillna("?")
+
+
+def athlete_label(df):
+    return _text(df["competitor"]) + " (" + _text(df["dob"]) + ")"
+
+
+def load(path=DATA_PATH):
+    """Dashboard frame: projected columns, categorical keys, year and athlete label."""
+    df = ResultsDataset(path).read(COLUMNS)
+    df["athlete"] = athlete_label(df).astype("category")
+    df["venue"] = _text(df["venue"]).astype("category")
+    df["year"] = pd.to_numeric(df["date"].astype("string").str[-4:], errors="coerce").astype("Int16")
+    return df.drop(columns=["competitor", "dob"]).reset_index(drop=True)
+
+
+def aggregates(df, by):
+    """Per-venue or per-athlete summary table, computed once per data version."""
+    g = df.groupby(by, observed=True)
+    out = g.agg(
+        n=("perf", "size"),
+        best_perf=("perf", "min"),
+        best_neutral=("t_neutral", "min"),
+        mean_delta=("delta", "mean"),
+        mean_wind=("wind", "mean"),
+        altitude_m=("altitude_m", "median"),
+    )
+    return out.sort_values("best_neutral").reset_index()
+
+
+def athlete_aggregates(path=DATA_PATH, store_dir=STORE_DIR):
+    """Per-athlete summary table read from the aggregate store, brought up to date with path first."""
+    t = readable(refresh_store(path, store_dir)[0].athletes)
+    t.insert(0, "athlete", athlete_label(t))
+    out = t[["athlete", "results", "seasons", "best_perf", "best_legal", "best_neutral",
+             "mean_delta", "mean_wind", "sd_neutral"]].rename(columns={"results": "n"})
+    return out.sort_values("best_neutral").reset_index(drop=True)
+
+
+def filter_mask(df, venues=(), athletes=(), wind=None, altitude=None, years=None):
+    """Boolean mask for the sidebar filters; empty selections mean 'all'."""
+    mask = np.ones(len(df), dtype=bool)
+    for col, chosen in (("venue", venues), ("athlete", athletes)):
+        if chosen:
+            cats = df[col].cat.categories
+            codes = cats.get_indexer(list(chosen))
+            mask &= np.isin(df[col].cat.codes.to_numpy(), codes[codes >= 0])
+    for col, bounds in (("wind", wind), ("altitude_m", altitude)):
+        if bounds is not None:
+            v = df[col].to_numpy(dtype=np.float64, na_value=np.nan)
+            mask &= (v >= bounds[0]) & (v <= bounds[1])
+    if years is not None:
+        y = df["year"].to_numpy(dtype=np.float64, na_value=np.nan)
+        mask &= (y >= years[0]) & (y <= years[1])
+    return mask
+
+
+def downsample(df, x, y, max_points=MAX_POINTS, grid=GRID, seed=0):
+    """At most max_points rows for a scatter of x vs y.
+
+    Keeps one row per occupied cell of a grid × grid lattice, so sparse
+    regions and outliers survive. If that is still too many rows, it takes
+    a seeded random subset.
+    """
+    if len(df) <= max_points:
+        return df
+    xv = df[x].to_numpy(dtype=np.float64, na_value=np.nan)
+    yv = df[y].to_numpy(dtype=np.float64, na_value=np.nan)
+    ok = np.flatnonzero(np.isfinite(xv) & np.isfinite(yv))
+    xv, yv = xv[ok], yv[ok]
+
+    def cell(v):
+        lo, hi = v.min(), v.max()
+        return np.minimum(((v - lo) / ((hi - lo) or 1.0) * grid).astype(np.int64), grid - 1)
+
+    keys = cell(xv) * grid + cell(yv)
+    first = np.full(grid * grid, -1)
+    first[keys[::-1]] = np.arange(len(keys))[::-1]  # reversed writes: earliest row wins
+    keep = ok[first[first >= 0]]
+    if len(keep) > max_points:
+        keep = np.random.default_rng(seed).choice(keep, max_points, replace=False)
+    return df.iloc[np.sort(keep)]
+
+
+def standard_pressure_pa(altitude_m):
+    """ISA pressure at altitude (Pa), for what-if scenarios without weather data."""
+    return 101325.0 * (1.0 - 2.25577e-5 * np.asarray(altitude_m, dtype=np.float64)) ** 5.25588
+
+
+def what_if(df, wind=0.0, altitude_m=0.0, temp_c=20.0, rh_pct=50.0, params=DEFAULT_PARAMS):
+    """Times each result would have run under one hypothetical condition.
+
+    Neutral times are recomputed with `params`, then moved to the new
+    condition by inverting the linear correction.
+    """
+    neutral = neutral_times(df["perf"], df["wind"], df["altitude_m"], df["rho_air_abs"], params)
+    rho = float(air_density(temp_c, standard_pressure_pa(altitude_m), rh_pct))
+    zero = np.zeros(len(df))
+    # t_neutral = t + shift(condition), so t = t_neutral − shift(condition)
+    shift = neutral_times(zero, zero + wind, zero + altitude_m, zero + rho, params)
+    return pd.DataFrame({"t_neutral": neutral, "t_what_if": neutral - shift}, index=df.index), rho
@@ -0,0 +1,68 @@
+# benchmarks/bench_corrections.py
+"""
+Rows/s of the vectorized correction engine vs. the old row-wise df.apply path.
+
+Run from the repo root:  python benchmarks/bench_corrections.py [n_rows]
+"""
+
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src" / "features"))
+from correction_engine import DEFAULT_PARAMS, correct_frame, correct_parquet  # noqa: E402
+
+P = DEFAULT_PARAMS
+
+
+def neutral_time(row):
+    """The original per-row implementation from physics_corrections.py."""
+    base = row["perf"]
+    wind_corr = P.wind_coeff * row["wind"]
+    alt_corr = P.alt_scale * row["altitude_m"]
+    rho_corr = P.rho_coeff * (P.rho_ref - row["rho_air_abs"])
+    return base + wind_corr - alt_corr + rho_corr
+
+
+def make_frame(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "perf": rng.normal(10.2, 0.25, n),
+        "wind": rng.uniform(-2.0, 2.0, n).round(1),
+        "altitude_m": rng.choice([5.0, 94.0, 506.0, 2240.0], n),
+        "rho_air_abs": rng.normal(1.17, 0.03, n),
+    })
+
+
+def timed(fn, *args):
+    t0 = time.perf_counter()
+    out = fn(*args)
+    return out, time.perf_counter() - t0
+
+
+def main(n=200_000):
+    df = make_frame(n)
+
+    # the apply path is slow, so time it on a slice and scale
+    n_apply = min(n, 20_000)
+    ref, t_apply = timed(lambda d: d.apply(neutral_time, axis=1), df.head(n_apply))
+    vec, t_vec = timed(correct_frame, df)
+    assert np.allclose(ref.to_numpy(), vec["t_neutral"].to_numpy()[:n_apply])
+
+    with tempfile.TemporaryDirectory() as tmp:
+        src, dst = Path(tmp) / "in.parquet", Path(tmp) / "out.parquet"
+        df.to_parquet(src, index=False, row_group_size=50_000)
+        _, t_chunk = timed(correct_parquet, src, dst)
+
+    print(f"rows: {n:,}")
+    print(f"df.apply          : {n_apply / t_apply:>14,.0f} rows/s")
+    print(f"correct_frame     : {n / t_vec:>14,.0f} rows/s")
+    print(f"correct_parquet   : {n / t_chunk:>14,.0f} rows/s  (incl. Parquet I/O)")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000)
@@ -0,0 +1,45 @@
+# benchmarks/bench_sprint_sim.py
+"""
+Scenarios/s of the batched sprint simulator.
+
+Run from the repo root:  python benchmarks/bench_sprint_sim.py [n_scenarios]
+"""
+
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src" / "features"))
+from sprint_sim import simulate, simulate_frame  # noqa: E402
+
+
+def main(n=20_000):
+    rng = np.random.default_rng(0)
+
+    t0 = time.perf_counter()
+    res = simulate(
+        f0=rng.normal(8.3, 0.3, n),
+        v0=rng.normal(13.2, 0.3, n),
+        wind=rng.uniform(-2.0, 2.0, n),
+        rho=rng.normal(1.17, 0.03, n),
+    )
+    t_raw = time.perf_counter() - t0
+
+    # archive-like: 0.1 m/s wind readings, weather repeating per venue-day
+    archive = pd.DataFrame({
+        "wind": rng.integers(-20, 21, n * 10) / 10,
+        "rho_air_abs": rng.choice(rng.normal(1.17, 0.03, 500), n * 10),
+    })
+    t0 = time.perf_counter()
+    simulate_frame(archive)
+    t_frame = time.perf_counter() - t0
+
+    print(f"simulate         : {n / t_raw:>12,.0f} scenarios/s  ({n:,} distinct, mean {np.nanmean(res.race_time):.3f} s)")
+    print(f"simulate_frame   : {len(archive) / t_frame:>12,.0f} rows/s       ({len(archive):,} archive rows, deduplicated)")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20_000)
@@ -0,0 +1,323 @@
+# benchmarks/run_suite.py
+"""
+Benchmark suite over synthetic data at fixed scale tiers, with regression gates.
+
+Times the hot paths on data from synthetic.py:
+    clean        clean_results on scraper-shaped strings
+    density      frame_air_density
+    correction   correct_frame
+    regression   streaming OLS (update + fit)
+    aggregation  dashboard aggregates, scatter downsampling and density binning
+    enrich       add_weather_altitude end to end: gazetteer learn-on-miss,
+                 geocoding and ERA5 through the FetchExecutor, served by
+                 stub_network.py
+    archive      race-time join against a memory-mapped hourly weather archive
+                 (half the rows timed, half falling back to daily means)
+    elevation    bilinear DEM sampling for every row's venue coordinates
+    uncertainty  Monte Carlo quantiles of t_neutral (UNCERTAINTY_DRAWS per result)
+    ranking      NeutralRanking: index build over 99% of the rows, append of
+                 the rest, RANKING_QUERIES filtered top/best/rank queries
+    athletes     per-athlete aggregate store: build over 99% of the rows, then
+                 fold in the rest
+
+Each case reports the best of --repeat runs. The result is compared with
+baselines/<tier>.json: a case fails when it is slower than its baseline by
+more than its threshold (and by more than the MIN_DELTA_S noise floor). Any
+failure makes the exit status 1.
+
+Run from the repo root:
+    python benchmarks/run_suite.py                      # 10k tier, compare to baseline
+    python benchmarks/run_suite.py --tier 1m --cases clean correction
+    python benchmarks/run_suite.py --tier 1m --update-baseline
+
+The 10m tier needs several GB of RAM (clean and enrich hold a few copies of
+the frame). It has no committed baseline and is not a regression gate: it
+is for one-off scaling checks, and all its cases report as "new" unless a
+baseline is recorded locally with --update-baseline. Baselines are
+machine-specific: refresh them with --update-baseline when the hardware
+changes, not to hide a regression.
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "src" / "features"))
+sys.path.insert(0, str(ROOT / "app"))
+import synthetic  # noqa: E402
+from atmosphere import frame_air_density  # noqa: E402
+from clean_results import clean_results  # noqa: E402
+from correction_engine import INPUT_COLUMNS, correct_frame  # noqa: E402
+from dashboard_data import aggregates, downsample  # noqa: E402
+from streaming_ols import OLSAccumulator  # noqa: E402
+
+BASELINE_DIR = Path(__file__).resolve().parent / "baselines"
+TIERS = {"10k": 10_000, "1m": 1_000_000, "10m": 10_000_000}
+REPEATS = {"10k": 5, "1m": 3, "10m": 1}
+THRESHOLD = 0.25                          # allowed slowdown vs baseline (fraction)
+THRESHOLDS = {"enrich": 0.5}              # network-bound cases are noisier
+MIN_DELTA_S = 0.01                        # ignore slowdowns smaller than this
+NETWORK_VENUES, NETWORK_YEARS = 40, (2015, 2024)  # keeps enrich at a few hundred requests
+UNCERTAINTY_DRAWS = 200                   # the stage default (2000) would dominate the suite
+RANKING_QUERIES = 100                     # per query kind
+
+
+# --- cases: (data needed, function of that data) ---
+
+def run_clean(raw):
+    return clean_results(raw)
+
+
+def run_density(df):
+    return frame_air_density(df)
+
+
+def run_correction(df):
+    return correct_frame(df[INPUT_COLUMNS])
+
+
+def run_regression(df):
+    return OLSAccumulator(["wind", "rho_air_abs", "altitude_m"], "delta").update(df).fit()
+
+
+def run_aggregation(df):
+    aggregates(df, "venue")
+    aggregates(df, "competitor")
+    downsample(df, "wind", "delta")
+    ok = df[["perf", "t_neutral"]].dropna().to_numpy()
+    return np.histogram2d(ok[:, 0], ok[:, 1], bins=120)
+
+
+def run_uncertainty(df):
+    from neutral_uncertainty import neutral_uncertainty
+    return neutral_uncertainty(df, draws=UNCERTAINTY_DRAWS)
+
+
+def run_ranking(df):
+    from ranking_service import NeutralRanking
+    cut = len(df) - len(df) // 100
+    ranking = NeutralRanking(df.iloc[:cut])
+    ranking.append(df.iloc[cut:])
+    years = df["year"].dropna().unique()
+    for i in range(RANKING_QUERIES):
+        year = int(years[i % len(years)])
+        ranking.top(10, as_frame=False, year=year, wind_band="tail")
+        ranking.best_per_athlete(10, as_frame=False, altitude_band="low")
+        ranking.rank_of(9.9, year=(year, year + 4))
+    return ranking
+
+
+def run_athletes(df):
+    from athlete_aggregates import AthleteAggregates
+    cut = len(df) - len(df) // 100
+    store = AthleteAggregates()
+    store.update(df.iloc[:cut])
+    store.update(df.iloc[cut:])
+    return store
+
+
+def run_enrich(clean):
+    import elevation_raster
+    import weather_archive
+    from add_weather_altitude import add_weather_altitude
+    from fetch_executor import FetchExecutor
+    from gazetteer import Gazetteer
+    from stub_network import StubNetwork
+
+    saved = weather_archive.ARCHIVE_DIR, elevation_raster.DEM_DIR
+    with tempfile.TemporaryDirectory() as tmp, StubNetwork(), \
+            FetchExecutor(cache=None, max_workers=8, rate=1000.0) as fetch:
+        # no local weather archive or DEM: always the network path
+        weather_archive.ARCHIVE_DIR = elevation_raster.DEM_DIR = Path(tmp) / "none"
+        try:
+            gaz = Gazetteer(Path(tmp) / "venues.parquet")  # cold: every venue is learned
+            return add_weather_altitude(clean, fetch=fetch, gazetteer=gaz)
+        finally:
+            weather_archive.ARCHIVE_DIR, elevation_raster.DEM_DIR = saved
+
+
+def run_archive(data):
+    from weather_archive import attach_hourly_weather
+    archive, df = data
+    return attach_hourly_weather(df, archive)
+
+
+def archive_data(n, seed=0):
+    """A temporary archive for NETWORK_VENUES locations × NETWORK_YEARS and n results to join onto it."""
+    import weather_archive
+    from stub_network import era5_hourly
+
+    rng = np.random.default_rng(seed)
+    lat, lon = rng.uniform(-40, 60, NETWORK_VENUES).round(2), rng.uniform(-180, 180, NETWORK_VENUES).round(2)
+    years = range(NETWORK_YEARS[0], NETWORK_YEARS[1] + 1)
+    tmp = tempfile.TemporaryDirectory()
+    for y in years:
+        hourly = weather_archive.hourly_frame(era5_hourly(f"{y}-01-01", f"{y}-12-31", list(weather_archive.HOURLY_VARS)))
+        frame = pd.concat([hourly.assign(lat=a, lon=b) for a, b in zip(lat, lon)], ignore_index=True)
+        weather_archive.import_frame(frame, tmp.name)
+    archive = weather_archive.WeatherArchive(tmp.name)
+    archive._tmp = tmp  # removed with the archive
+
+    v = rng.integers(0, NETWORK_VENUES, n)
+    days = pd.Timestamp(f"{NETWORK_YEARS[0]}-01-01") + pd.to_timedelta(
+        rng.integers(0, 365 * len(years), n), unit="D")
+    timed = rng.random(n) < 0.5
+    minutes = rng.integers(17 * 60, 22 * 60, n)
+    race_time = pd.Series([f"{m // 60:02d}:{m % 60:02d}" for m in range(24 * 60)], dtype="str").to_numpy()[minutes]
+    df = pd.DataFrame({"lat": lat[v], "lon": lon[v], "iso_date": days.strftime("%Y-%m-%d"),
+                       "race_time": np.where(timed, race_time, None)})
+    return archive, df
+
+
+def run_elevation(data):
+    raster, lat, lon = data
+    return raster.sample(lat, lon)
+
+
+def elevation_data(n, seed=0, n_tiles=16):
+    """A temporary raster of n_tiles synthetic 1201-post tiles and n points at NETWORK_VENUES venues on it."""
+    import elevation_raster
+
+    rng = np.random.default_rng(seed)
+    tmp = tempfile.TemporaryDirectory()
+    origins = [(45 + k // 4, 5 + k % 4) for k in range(n_tiles)]
+    elevation_raster.import_tiles({o: rng.integers(0, 2500, (1201, 1201), dtype=np.int16) for o in origins}, tmp.name)
+    raster = elevation_raster.ElevationRaster(tmp.name)
+    raster._tmp = tmp
+    vlat, vlon = rng.uniform(45, 49, NETWORK_VENUES), rng.uniform(5, 9, NETWORK_VENUES)
+    v = rng.integers(0, NETWORK_VENUES, n)
+    return raster, vlat[v], vlon[v]
+
+
+CASES = {
+    "clean": ("raw", run_clean),
+    "density": ("enriched", run_density),
+    "correction": ("enriched", run_correction),
+    "regression": ("enriched", run_regression),
+    "aggregation": ("enriched", run_aggregation),
+    "uncertainty": ("enriched", run_uncertainty),
+    "ranking": ("enriched", run_ranking),
+    "athletes": ("enriched", run_athletes),
+    "enrich": ("network", run_enrich),
+    "archive": ("archive", run_archive),
+    "elevation": ("dem", run_elevation),
+}
+
+DATA = {
+    "raw": lambda n: synthetic.raw_results(n),
+    "enriched": lambda n: synthetic.enriched_results(n),
+    "network": lambda n: clean_results(synthetic.raw_results(n, n_venues=NETWORK_VENUES, years=NETWORK_YEARS)),
+    "archive": archive_data,
+    "dem": elevation_data,
+}
+
+
+# --- running ---
+
+def time_case(fn, data, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn(data)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def run_suite(tier="10k", cases=None, repeat=None):
+    """Time the selected cases at one tier; returns the result document."""
+    n = TIERS[tier]
+    repeat = repeat or REPEATS[tier]
+    data, results = {}, {}
+    for name in cases or CASES:
+        kind, fn = CASES[name]
+        if kind not in data:
+            data[kind] = DATA[kind](n)
+        seconds = time_case(fn, data[kind], repeat)
+        results[name] = {"seconds": round(seconds, 6), "rows": n, "rows_per_s": round(n / seconds)}
+    return {
+        "tier": tier,
+        "rows": n,
+        "repeat": repeat,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "host": {"platform": platform.platform(), "python": platform.python_version(),
+                 "cpus": os.cpu_count()},
+        "cases": results,
+    }
+
+
+def compare(result, baseline, threshold=None):
+    """Rows of (case, seconds, baseline seconds, ratio, limit, status)."""
+    rows = []
+    for name, r in result["cases"].items():
+        base = baseline.get("cases", {}).get(name) if baseline else None
+        if base is None:
+            rows.append((name, r["seconds"], None, None, None, "new"))
+            continue
+        limit = threshold if threshold is not None else THRESHOLDS.get(name, THRESHOLD)
+        ratio = r["seconds"] / base["seconds"]
+        slower = ratio > 1 + limit and r["seconds"] - base["seconds"] > MIN_DELTA_S
+        rows.append((name, r["seconds"], base["seconds"], ratio, limit, "REGRESSION" if slower else "ok"))
+    return rows
+
+
+def baseline_path(tier):
+    return BASELINE_DIR / f"{tier}.json"
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Benchmark the hot paths on synthetic data.")
+    ap.add_argument("--tier", choices=list(TIERS), default="10k")
+    ap.add_argument("--cases", nargs="+", choices=list(CASES), default=None)
+    ap.add_argument("--repeat", type=int, default=None, help="best of N runs (default depends on tier)")
+    ap.add_argument("--threshold", type=float, default=None, help="override the allowed slowdown for all cases")
+    ap.add_argument("--update-baseline", action="store_true", help="store this run as the tier's baseline")
+    ap.add_argument("--json", default=None, help="also write this run's results to a file")
+    args = ap.parse_args(argv)
+
+    print(f"⏱️  tier {args.tier}: {TIERS[args.tier]:,} rows")
+    result = run_suite(args.tier, args.cases, args.repeat)
+    if args.json:
+        Path(args.json).write_text(json.dumps(result, indent=2))
+
+    path = baseline_path(args.tier)
+    if args.update_baseline:
+        baseline = json.loads(path.read_text()) if path.exists() else {"cases": {}}
+        baseline.update({k: v for k, v in result.items() if k != "cases"})
+        baseline["cases"].update(result["cases"])
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(baseline, indent=2) + "\n")
+        print(f"💾 baseline → {path}")
+
+    baseline = json.loads(path.read_text()) if path.exists() else None
+    if baseline is None:
+        print(f"ℹ️  no baseline for tier {args.tier} ({path.name}); nothing to gate against")
+    if baseline and baseline.get("host", {}).get("cpus") != result["host"]["cpus"]:
+        print(f"⚠️  baseline was recorded on a {baseline['host'].get('cpus')}-CPU host")
+
+    rows = compare(result, baseline, args.threshold)
+    print(f"{'case':12s} {'seconds':>9s} {'baseline':>9s} {'ratio':>6s} {'rows/s':>13s}  status")
+    for name, sec, base, ratio, limit, status in rows:
+        rate = result["cases"][name]["rows_per_s"]
+        print(f"{name:12s} {sec:9.4f} {f'{base:.4f}' if base is not None else '-':>9} "
+              f"{f'{ratio:.2f}' if ratio is not None else '-':>6} {rate:>13,}  {status}"
+              + (f" (> +{limit:.0%})" if status == "REGRESSION" else ""))
+
+    failed = [r[0] for r in rows if r[5] == "REGRESSION"]
+    if failed:
+        print(f"❌ regressions: {', '.join(failed)}")
+        return 1
+    print("✅ no regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
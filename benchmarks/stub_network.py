@@ -0,0 +1,152 @@
+# benchmarks/stub_network.py
+"""
+Local stand-in for the Open-Meteo geocoding, elevation and ERA5 endpoints.
+
+The answers are deterministic and depend only on the query. A venue always
+geocodes to the same point, and every day gets its own plausible weather.
+This lets the network stages run end to end, offline, with stable request
+counts. LATENCY_S adds a fixed delay per request so the concurrency of the
+fetch path shows up in the timings. With fail_first=N, the first N requests
+for each URL get a 503 before the real answer, to exercise retries.
+
+    with StubNetwork() as stub:
+        ...  # the endpoint URLs of the features modules point at the stub
+"""
+
+import hashlib
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src" / "features"))
+import bulk_weather  # noqa: E402
+import gazetteer  # noqa: E402
+import weather_archive  # noqa: E402
+
+LATENCY_S = 0.005
+
+
+def _unit(text):
+    """Stable pseudo-random number in [0, 1) for a string."""
+    return int.from_bytes(hashlib.blake2b(text.encode(), digest_size=8).digest(), "big") / 2**64
+
+
+def geocode(name):
+    return {"results": [{"latitude": round(-40 + 100 * _unit("lat" + name), 4),
+                         "longitude": round(-180 + 360 * _unit("lon" + name), 4)}]}
+
+
+def elevation(lat, lon):
+    return {"elevation": [round(2400 * _unit(f"{lat:.2f},{lon:.2f}") ** 3)]}
+
+
+def era5(start, end, variables):
+    days = pd.date_range(start, end)
+    doy = days.dayofyear.to_numpy()
+    season = np.sin(2 * np.pi * (doy - 110) / 365)
+    series = {
+        "temperature_2m_max": (22 + 8 * season).round(1),
+        "surface_pressure_mean": (1000 + 8 * np.cos(doy / 7)).round(1),
+        "relative_humidity_2m_max": (60 + 25 * np.sin(doy / 11)).round(),
+    }
+    daily = {"time": days.strftime("%Y-%m-%d").tolist()}
+    for v in variables:
+        daily[v] = series.get(v, np.zeros(len(days))).tolist()
+    return {"daily": daily}
+
+
+def era5_hourly(start, end, variables):
+    hours = pd.date_range(start, pd.Timestamp(end) + pd.Timedelta(hours=23), freq="h")
+    doy = hours.dayofyear.to_numpy() + hours.hour.to_numpy() / 24
+    diurnal = -np.cos(2 * np.pi * (hours.hour.to_numpy() - 3) / 24)  # coolest ~03:00, warmest ~15:00
+    series = {
+        "temperature_2m": (22 + 8 * np.sin(2 * np.pi * (doy - 110) / 365) + 5 * diurnal).round(1),
+        "surface_pressure": (1000 + 8 * np.cos(doy / 7)).round(1),
+        "relative_humidity_2m": (60 - 20 * diurnal).round(),
+    }
+    hourly = {"time": hours.strftime("%Y-%m-%dT%H:%M").tolist()}
+    for v in variables:
+        hourly[v] = series.get(v, np.zeros(len(hours))).tolist()
+    return {"hourly": hourly}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        url = urlparse(self.path)
+        q = {k: v if k in ("daily", "hourly") else v[0] for k, v in parse_qs(url.query).items()}
+        with self.server.lock:
+            self.server.requests += 1
+            attempt = self.server.attempts[self.path] = self.server.attempts.get(self.path, 0) + 1
+        if LATENCY_S:
+            time.sleep(LATENCY_S)
+        if attempt <= self.server.fail_first:
+            self.send_response(503)
+            self.end_headers()
+            return
+        if url.path.endswith("/search"):
+            body = geocode(q.get("name", ""))
+        elif url.path.endswith("/elevation"):
+            lats, lons = q["latitude"].split(","), q["longitude"].split(",")
+            body = {"elevation": [elevation(float(a), float(b))["elevation"][0] for a, b in zip(lats, lons)]}
+        elif url.path.endswith("/era5") and "hourly" in q:
+            body = era5_hourly(q["start_date"], q["end_date"], q["hourly"])
+        elif url.path.endswith("/era5"):
+            body = era5(q["start_date"], q["end_date"], q.get("daily", []))
+        else:
+            self.send_response(404)
+            self.end_headers()
+            return
+        payload = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+class StubNetwork:
+    """Serves the stub on a free local port and points the features modules at it while active."""
+
+    TARGETS = [
+        (gazetteer, "GEOCODE_URL", "/v1/search"),
+        (gazetteer, "ELEVATION_URL", "/v1/elevation"),
+        (bulk_weather, "ERA5", "/v1/era5"),
+        (weather_archive, "ERA5", "/v1/era5"),
+    ]
+
+    def __init__(self, fail_first=0):
+        self.fail_first = fail_first
+
+    def __enter__(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        self.server.daemon_threads = True
+        self.server.requests = 0
+        self.server.attempts = {}
+        self.server.fail_first = self.fail_first
+        self.server.lock = threading.Lock()
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.base = base = f"http://127.0.0.1:{self.server.server_port}"
+        self._saved = [(mod, name, getattr(mod, name)) for mod, name, _ in self.TARGETS]
+        for mod, name, path in self.TARGETS:
+            setattr(mod, name, base + path)
+        return self
+
+    @property
+    def requests(self):
+        return self.server.requests
+
+    def __exit__(self, *exc):
+        for mod, name, value in self._saved:
+            setattr(mod, name, value)
+        self.server.shutdown()
+        self.server.server_close()
@@ -0,0 +1,164 @@
+# benchmarks/synthetic.py
+"""
+Synthetic 100 m results at any scale, shaped like data/processed/.
+
+raw_results(n) looks like the scraper output: strings such as '9.58A',
+'10.1h', '+2.4w', 'NWI' and '16 AUG 2009', with text columns as
+categoricals the way read_raw() decodes them from Parquet. enriched_results(n)
+is the numeric frame the later stages see: venue elevation, weather, air
+density, t_neutral and delta.
+
+Columns are drawn as integer codes into small pools and wrapped as
+categoricals, so 10M rows take seconds and no per-row Python strings.
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src" / "features"))
+from atmosphere import air_density, hpa_to_pa  # noqa: E402
+from correction_engine import neutral_times  # noqa: E402
+
+MONTHS = np.array(["JAN", "FEB", "MAR", "APR", "MAY", "JUN", "JUL", "AUG", "SEP", "OCT", "NOV", "DEC"])
+COUNTRIES = np.array(["USA", "JAM", "GBR", "FRA", "GER", "ITA", "NGR", "RSA", "CAN", "JPN",
+                      "CHN", "BRA", "KEN", "QAT", "SUI", "MEX", "ESP", "AUS", "TTO", "BAH"])
+SYLLABLES = ["ka", "lo", "ri", "ven", "mar", "to", "sa", "bel", "or", "gan", "di", "ne", "pu", "zo",
+             "lem", "an", "ti", "rus", "hal", "me", "quo", "ber", "fi", "na"]
+STADIUM_KINDS = ["Stadium", "Stade", "Arena", "Field", "Olympic Stadium", "Sports Centre"]
+SEED_VENUES = [  # the real venues, so gazetteer exact matches are exercised too
+    ("Olympiastadion, Berlin (GER)", 94.0),
+    ("Shanghai (CHN)", 5.0),
+    ("Stade Olympique de la Pontaise, Lausanne (SUI)", 506.0),
+    ("Suhaim bin Hamad Stadium, Doha (QAT)", 2.0),
+]
+
+
+def _word(rng, k=(2, 4)):
+    return "".join(rng.choice(SYLLABLES, rng.integers(*k))).capitalize()
+
+
+def venue_pool(n_venues, seed=0):
+    """(venue strings, elevation_m) — mostly low-lying, a tail of altitude venues up to ~2400 m."""
+    rng = np.random.default_rng(seed)
+    names, seen = [v for v, _ in SEED_VENUES], set()
+    while len(names) < n_venues:
+        city = _word(rng)
+        if city in seen:
+            continue
+        seen.add(city)
+        names.append(f"{_word(rng)} {rng.choice(STADIUM_KINDS)}, {city} ({rng.choice(COUNTRIES)})")
+    elev = np.where(rng.random(n_venues) < 0.08, rng.uniform(1000, 2400, n_venues),
+                    rng.lognormal(4.5, 1.2, n_venues).clip(0, 900)).round()
+    elev[:len(SEED_VENUES)] = [e for _, e in SEED_VENUES]
+    return np.array(names[:n_venues], dtype=object), elev
+
+
+def _draws(n, seed, n_venues, n_athletes, years):
+    rng = np.random.default_rng(seed)
+    venues, elev = venue_pool(n_venues, seed)
+    # a few venues host most meets
+    popularity = rng.pareto(1.2, n_venues) + 1
+    v = rng.choice(n_venues, n, p=popularity / popularity.sum())
+    athlete = rng.choice(n_athletes, n, p=_zipf(n_athletes))
+    year = rng.integers(years[0], years[1] + 1, n)
+    month = rng.choice(12, n, p=[.01, .02, .04, .06, .14, .2, .2, .17, .1, .03, .02, .01])
+    day = rng.integers(1, 29, n)
+    # marks: a right-skewed field above a hard floor
+    perf = (9.58 + rng.gamma(3.0, 0.2, n)).round(2)
+    wind = rng.normal(0.6, 1.1, n).clip(-4.0, 5.0).round(1)
+    return rng, venues, elev, v, athlete, year, month, day, perf, wind
+
+
+def _names(rng, k):
+    """k distinct 'Given FAMILY' names built from syllables."""
+    syl = np.array(SYLLABLES, dtype=object)
+    names = pd.Index([], dtype="str")
+    while len(names) < k:
+        m = 2 * (k - len(names))
+        given = syl[rng.integers(0, len(syl), m)] + np.where(rng.random(m) < 0.5, syl[rng.integers(0, len(syl), m)], "")
+        family = syl[rng.integers(0, len(syl), m)] + syl[rng.integers(0, len(syl), m)] + syl[rng.integers(0, len(syl), m)]
+        batch = pd.Series(given).str.capitalize() + " " + pd.Series(family).str.upper()
+        names = names.append(pd.Index(batch, dtype="str")).unique()
+    return names[:k]
+
+
+def _zipf(k, s=0.8):
+    w = 1.0 / np.arange(1, k + 1) ** s
+    return w / w.sum()
+
+
+def _categorical(codes, pool):
+    return pd.Categorical.from_codes(codes, categories=pd.Index(pool, dtype="str"))
+
+
+def raw_results(n, seed=0, n_venues=400, n_athletes=None, years=(1990, 2024)):
+    """Scraper-shaped raw frame (text columns categorical, as read_raw() returns them)."""
+    n_athletes = n_athletes or max(50, min(n // 20, 200_000))
+    rng, venues, _, v, athlete, year, month, day, perf, wind = _draws(n, seed, n_venues, n_athletes, years)
+
+    # perf strings with flags: 3 % altitude-assisted 'A', 2 % hand-timed 'h' (one decimal)
+    flag = rng.choice(3, n, p=[0.95, 0.03, 0.02])
+    perf = np.where(flag == 2, perf.round(1), perf)
+    perf_code = np.rint(perf * 100).astype(np.int64) - 958
+    perf_pool_vals = (np.arange(perf_code.max() + 1) + 958) / 100
+    perf_strings = np.array([[f"{p:.2f}", f"{p:.2f}A", f"{p:.1f}h" if c % 10 == 0 else f"{p:.2f}h"]
+                             for c, p in enumerate(perf_pool_vals, 958)]).ravel()
+
+    # wind strings: '+0.9', '-1.2', '+2.4w' for some illegal winds, 'NWI' when no reading
+    wind_idx = np.rint(wind * 10).astype(np.int64) + 40
+    wind_vals = (np.arange(91) - 40) / 10
+    wind_strings = np.array([f"{w:+.1f}" for w in wind_vals] + [f"{w:+.1f}w" for w in wind_vals] + ["NWI"])
+    wind_code = np.where((wind > 2.0) & (rng.random(n) < 0.5), wind_idx + 91, wind_idx)
+    wind_code = np.where(rng.random(n) < 0.02, 182, wind_code)
+
+    date_code = ((year - years[0]) * 12 + month) * 28 + (day - 1)
+    date_pool = [f"{d:02d} {m} {y}" for y in range(years[0], years[1] + 1) for m in MONTHS for d in range(1, 29)]
+
+    people = _names(rng, n_athletes)
+    births = (pd.Series(rng.integers(1, 29, n_athletes)).astype(str).str.zfill(2) + " "
+              + MONTHS[rng.integers(0, 12, n_athletes)] + " "
+              + pd.Series(rng.integers(1965, 2006, n_athletes)).astype(str)).to_numpy(dtype=object)
+    nat = rng.choice(len(COUNTRIES), n_athletes)
+
+    return pd.DataFrame({
+        "rank": _categorical(np.minimum(np.arange(n) // 3, 9999), [str(i + 1) for i in range(10_000)]),
+        "perf": _categorical(perf_code * 3 + flag, perf_strings),
+        "wind": _categorical(wind_code, wind_strings),
+        "competitor": _categorical(athlete, people),
+        "dob": pd.Series(births[athlete], dtype="str"),
+        "nat": _categorical(nat[athlete], COUNTRIES),
+        "pos": _categorical(rng.choice(8, n, p=[.3, .2, .15, .1, .1, .06, .05, .04]), list("12345678")),
+        "venue": _categorical(v, venues),
+        "date": _categorical(date_code, date_pool),
+        "resultscore": _categorical(rng.integers(0, 400, n), [str(1000 + i) for i in range(400)]),
+        "competition": pd.Series(None, index=range(n), dtype="str"),
+    })
+
+
+def enriched_results(n, seed=0, n_venues=400, n_athletes=None, years=(1990, 2024)):
+    """Numeric frame after enrichment and correction (what density/correction/regression/plots read)."""
+    n_athletes = n_athletes or max(50, min(n // 20, 200_000))
+    rng, venues, elev, v, athlete, year, month, day, perf, wind = _draws(n, seed, n_venues, n_athletes, years)
+    altitude = elev[v]
+    temp = rng.normal(24.0, 5.0, n).clip(5, 40).round(1)
+    pressure = 1013.25 * (1 - 2.25577e-5 * altitude) ** 5.25588 + rng.normal(0, 6, n)
+    rh = rng.uniform(20, 95, n).round()
+    rho = air_density(temp, hpa_to_pa(pressure), rh)
+    t_neutral = neutral_times(perf, wind, altitude, rho)
+    return pd.DataFrame({
+        "competitor": _categorical(athlete, [f"athlete {i}" for i in range(n_athletes)]),
+        "venue": _categorical(v, venues),
+        "year": year.astype(np.int16),
+        "perf": perf,
+        "wind": wind,
+        "altitude_m": altitude,
+        "temp_c": temp,
+        "pressure_hpa": pressure,
+        "rh_pct": rh,
+        "rho_air_abs": rho,
+        "t_neutral": t_neutral,
+        "delta": t_neutral - perf,
+    })
@@ -2,37 +2,62 @@
 """
 Basic exploratory analysis of corrected 100 m data.
 Plots distributions and relationships between perf, wind, rho_air, altitude, t_neutral.
+
+Importing this module does no work; run it as a script. matplotlib is only
+imported when plots are drawn (skip them with --no-plots).
 """
 
-import pandas as pd
-import matplotlib.pyplot as plt
-from pathlib import Path
-
-df = pd.read_parquet("data/processed/results_physics.parquet")
-
-# --- sanity ---
-print(df.describe()[["perf","wind","rho_air","t_neutral"]])
-
-# --- scatterplots ---
-plt.scatter(df["wind"], df["perf"] - df["t_neutral"], alpha=0.7)
-plt.xlabel("Wind (m/s)")
-plt.ylabel("Raw – Neutral time (s)")
-plt.title("Wind effect on performance")
-plt.grid(True)
-plt.show()
-
-plt.scatter(df["rho_air"], df["t_neutral"], alpha=0.7)
-plt.xlabel("Air density (kg/m³)")
-plt.ylabel("Neutral time (s)")
-plt.title("Air-density vs corrected performance")
-plt.grid(True)
-plt.show()
-
-# --- simple regression ---
-import statsmodels.api as sm
-X = df[["wind","rho_air"]].copy()
-X["const"] = 1
-y = df["perf"]
-model = sm.OLS(y, X, missing='drop').fit()
-print(model.summary())
+import argparse
+import sys
+sys.path.insert(0, "src/features")
+
+PATH = "data/processed/results_physics.parquet"
+COLUMNS = ["perf", "wind", "rho_air", "t_neutral"]
+
+
+def load(path=PATH):
+    from results_dataset import load_results
+    return load_results(COLUMNS, path=path)
+
+
+def wind_density_fit(df):
+    """OLS of perf on wind and rho_air (rows with missing values dropped)."""
+    from streaming_ols import OLSAccumulator
+    return OLSAccumulator(["wind", "rho_air"], "perf").update(df).fit()
+
+
+def plot(df):
+    import matplotlib.pyplot as plt
+
+    plt.scatter(df["wind"], df["perf"] - df["t_neutral"], alpha=0.7)
+    plt.xlabel("Wind (m/s)")
+    plt.ylabel("Raw – Neutral time (s)")
+    plt.title("Wind effect on performance")
+    plt.grid(True)
+    plt.show()
+
+    plt.scatter(df["rho_air"], df["t_neutral"], alpha=0.7)
+    plt.xlabel("Air density (kg/m³)")
+    plt.ylabel("Neutral time (s)")
+    plt.title("Air-density vs corrected performance")
+    plt.grid(True)
+    plt.show()
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--data", default=PATH)
+    ap.add_argument("--no-plots", action="store_true", help="text output only")
+    args = ap.parse_args(argv)
+
+    df = load(args.data)
+    print(df.describe()[COLUMNS])
+    fit = wind_density_fit(df)
+    print(fit.to_string(index=False))
+    print(f"R² = {fit.attrs['r_squared']:.4f}, n = {fit.attrs['n']}")
+    if not args.no_plots:
+        plot(df)
+
 
+if __name__ == "__main__":
+    main()
@@ -1,46 +1,69 @@
 # notebooks/model_diagnostics.py
 """
 Model diagnostics: check multicollinearity and residual patterns.
+
+Importing this module does no work; run it as a script. statsmodels,
+seaborn and matplotlib are only imported for the residual plots
+(skip them with --no-plots).
 """
 
-import pandas as pd
-import statsmodels.api as sm
-from statsmodels.stats.outliers_influence import variance_inflation_factor
-import matplotlib.pyplot as plt
-import seaborn as sns
-
-# Load data
-df = pd.read_parquet("data/processed/results_physics_refined.parquet")
-df["delta"] = df["t_neutral"] - df["perf"]
-df = df.dropna(subset=["wind", "rho_air_abs", "altitude_m", "delta"])
-
-# Prepare variables
-X = df[["wind", "rho_air_abs", "altitude_m"]]
-X = sm.add_constant(X)
-y = df["delta"]
-
-# Fit model
-model = sm.OLS(y, X).fit()
-print(model.summary())
-
-# --- Variance Inflation Factor (VIF) ---
-vif_data = pd.DataFrame()
-vif_data["feature"] = X.columns
-vif_data["VIF"] = [variance_inflation_factor(X.values, i) for i in range(X.shape[1])]
-
-print("\n🔍 Variance Inflation Factors:")
-print(vif_data)
-
-# --- Residual plot ---
-sns.residplot(x=model.fittedvalues, y=model.resid, lowess=True, color="blue")
-plt.xlabel("Fitted Values")
-plt.ylabel("Residuals")
-plt.title("Residuals vs Fitted Values")
-plt.grid(True)
-plt.show()
-
-# --- Normality check ---
-sm.qqplot(model.resid, line='s')
-plt.title("Normal Q-Q Plot of Residuals")
-plt.show()
+import argparse
+import sys
+sys.path.insert(0, "src/features")
+
+REGRESSORS = ["wind", "rho_air_abs", "altitude_m"]
+TARGET = "delta"
+
+
+def load(path=None):
+    from results_dataset import DEFAULT_PATH, load_results
+    return load_results(REGRESSORS + [TARGET], path=path or DEFAULT_PATH, dropna=True)
+
+
+def diagnostics(df):
+    """Coefficient table, VIF table and residuals of the delta model."""
+    from streaming_ols import OLSAccumulator, predict
+    acc = OLSAccumulator(REGRESSORS, TARGET).update(df)
+    fit = acc.fit()
+    fitted = predict(fit, df)
+    return fit, acc.vif(), fitted, df[TARGET].to_numpy() - fitted
+
+
+def plot(fitted, resid):
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+    import statsmodels.api as sm
+
+    # --- Residual plot ---
+    sns.residplot(x=fitted, y=resid, lowess=True, color="blue")
+    plt.xlabel("Fitted Values")
+    plt.ylabel("Residuals")
+    plt.title("Residuals vs Fitted Values")
+    plt.grid(True)
+    plt.show()
+
+    # --- Normality check ---
+    sm.qqplot(resid, line='s')
+    plt.title("Normal Q-Q Plot of Residuals")
+    plt.show()
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--data", default=None)
+    ap.add_argument("--no-plots", action="store_true", help="text output only")
+    args = ap.parse_args(argv)
+
+    fit, vif, fitted, resid = diagnostics(load(args.data))
+    print(fit.to_string(index=False))
+    print(f"R² = {fit.attrs['r_squared']:.4f}, n = {fit.attrs['n']}")
+
+    print("\n🔍 Variance Inflation Factors:")
+    print(vif)
+
+    if not args.no_plots:
+        plot(fitted, resid)
+
 
+if __name__ == "__main__":
+    main()
@@ -1,31 +1,63 @@
 # notebooks/model_fit.py
 """
 Fit multiple regression models to quantify physical sensitivities.
+
+Importing this module does no work; run it as a script. matplotlib is only
+imported for the residual plot (skip it with --no-plots).
 """
 
-import pandas as pd
-import statsmodels.api as sm
-import matplotlib.pyplot as plt
+import argparse
+import sys
+sys.path.insert(0, "src/features")
+
+PATH = "data/processed/results_physics.parquet"
+REGRESSORS = ["wind", "rho_air", "altitude_m"]
+TARGET = "perf"
+
+
+def load(path=PATH):
+    import pandas as pd
+    from results_dataset import load_results
+
+    df = load_results([TARGET] + REGRESSORS, path=path)
+    # ensure numeric
+    for c in [TARGET] + REGRESSORS:
+        df[c] = pd.to_numeric(df[c], errors="coerce")
+    return df
+
+
+def fit_model(df):
+    """OLS of perf on wind, rho_air and altitude (rows with missing values dropped)."""
+    from streaming_ols import OLSAccumulator, predict
+    fit = OLSAccumulator(REGRESSORS, TARGET).update(df).fit()
+    fitted = predict(fit, df)
+    return fit, fitted, df[TARGET].to_numpy() - fitted
+
+
+def plot(fitted, resid):
+    import matplotlib.pyplot as plt
+
+    plt.scatter(fitted, resid)
+    plt.axhline(0, color="k", linestyle="--")
+    plt.xlabel("Fitted times")
+    plt.ylabel("Residuals (s)")
+    plt.title("Model residuals vs fitted values")
+    plt.grid(True)
+    plt.show()
 
-df = pd.read_parquet("data/processed/results_physics.parquet")
 
-# ensure numeric
-for c in ["perf", "wind", "altitude_m", "rho_air"]:
-    df[c] = pd.to_numeric(df[c], errors="coerce")
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--data", default=PATH)
+    ap.add_argument("--no-plots", action="store_true", help="text output only")
+    args = ap.parse_args(argv)
 
-# --- simple linear model ---
-X = df[["wind", "rho_air", "altitude_m"]]
-X = sm.add_constant(X)
-y = df["perf"]
-model = sm.OLS(y, X, missing="drop").fit()
-print(model.summary())
+    fit, fitted, resid = fit_model(load(args.data))
+    print(fit.to_string(index=False))
+    print(f"R² = {fit.attrs['r_squared']:.4f}, n = {fit.attrs['n']}")
+    if not args.no_plots:
+        plot(fitted, resid)
 
-# --- visualize residuals ---
-plt.scatter(model.fittedvalues, model.resid)
-plt.axhline(0, color="k", linestyle="--")
-plt.xlabel("Fitted times")
-plt.ylabel("Residuals (s)")
-plt.title("Model residuals vs fitted values")
-plt.grid(True)
-plt.show()
 
+if __name__ == "__main__":
+    main()
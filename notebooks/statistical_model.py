@@ -3,47 +3,62 @@
 Statistical modeling of environmental effects on sprint performance.
 Cleans data and fits multiple linear regression to estimate contributions
 from wind, air density, and altitude to ΔTime (neutral - raw).
+
+Importing this module does no work; run it as a script. seaborn and
+matplotlib are only imported when plots are drawn (skip them with --no-plots).
 """
 
-import pandas as pd
-import statsmodels.api as sm
-import matplotlib.pyplot as plt
-import seaborn as sns
+import argparse
+import sys
+sys.path.insert(0, "src/features")
+
+REGRESSORS = ["wind", "rho_air_abs", "altitude_m"]
+TARGET = "delta"
+
+
+def load(path=None):
+    """Results with missing or infinite values dropped."""
+    from results_dataset import DEFAULT_PATH, load_results
+    return load_results(REGRESSORS + [TARGET], path=path or DEFAULT_PATH, dropna=True)
+
+
+def fit_model(df):
+    from streaming_ols import OLSAccumulator
+    return OLSAccumulator(REGRESSORS, TARGET).update(df).fit()
 
-# Load data
-df = pd.read_parquet("data/processed/results_physics_refined.parquet")
-df["delta"] = df["t_neutral"] - df["perf"]
 
-# --- Clean missing or infinite values ---
-df = df.replace([float("inf"), float("-inf")], pd.NA)
-df = df.dropna(subset=["wind", "rho_air_abs", "altitude_m", "delta"])
+def plot(df, fit):
+    import matplotlib.pyplot as plt
+    import seaborn as sns
 
-print(f"✅ Data cleaned: {len(df)} rows remaining")
+    # --- Visualization: feature correlations ---
+    sns.pairplot(df[REGRESSORS + [TARGET]], diag_kind="kde")
+    plt.suptitle("Relationships Between Environmental Variables and ΔTime", y=1.02)
+    plt.show()
 
-# Prepare variables
-X = df[["wind", "rho_air_abs", "altitude_m"]]
-X = sm.add_constant(X)
-y = df["delta"]
+    # --- Coefficients bar chart ---
+    coef_df = fit.set_index("Variable")[["Coefficient"]].drop("const")
+    coef_df.plot(kind="bar", legend=False)
+    plt.ylabel("ΔTime contribution (s per unit)")
+    plt.title("Estimated Effect of Each Environmental Factor")
+    plt.grid(True)
+    plt.show()
 
-# Fit model
-model = sm.OLS(y, X).fit()
-print(model.summary())
 
-# --- Visualization: feature correlations ---
-sns.pairplot(df[["wind", "rho_air_abs", "altitude_m", "delta"]], diag_kind="kde")
-plt.suptitle("Relationships Between Environmental Variables and ΔTime", y=1.02)
-plt.show()
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--data", default=None)
+    ap.add_argument("--no-plots", action="store_true", help="text output only")
+    args = ap.parse_args(argv)
 
-# --- Coefficients bar chart ---
-coef_df = pd.DataFrame({
-    "Variable": model.params.index,
-    "Coefficient": model.params.values
-}).set_index("Variable")
+    df = load(args.data)
+    print(f"✅ Data cleaned: {len(df)} rows remaining")
+    fit = fit_model(df)
+    print(fit.to_string(index=False))
+    print(f"R² = {fit.attrs['r_squared']:.4f}, n = {fit.attrs['n']}")
+    if not args.no_plots:
+        plot(df, fit)
 
-coef_df.drop("const", inplace=True)
-coef_df.plot(kind="bar", legend=False)
-plt.ylabel("ΔTime contribution (s per unit)")
-plt.title("Estimated Effect of Each Environmental Factor")
-plt.grid(True)
-plt.show()
 
+if __name__ == "__main__":
+    main()
@@ -5,69 +5,43 @@ absolute air density (kg/m³) using the ideal gas law.
 """
 
 import pandas as pd
-import requests
 from pathlib import Path
-import math
-import time
 
-def get_altitude(lat, lon):
-    try:
-        url = "https://api.open-meteo.com/v1/elevation"
-        r = requests.get(url, params={"latitude": lat, "longitude": lon}, timeout=10)
-        js = r.json()
-        return js.get("elevation", [None])[0]
-    except Exception:
-        return None
+from atmosphere import frame_air_density
+from fetch_executor import open_fetcher
+from gazetteer import attach_venues
 
-def air_density(temp_c, pressure_hpa, rh_pct):
-    """Compute absolute air density (kg/m³)."""
-    T = temp_c + 273.15  # K
-    P = pressure_hpa * 100  # Pa
-    e = 6.112 * math.exp((17.67 * temp_c) / (temp_c + 243.5)) * (rh_pct / 100.0) * 100
-    pdry = P - e
-    Rd, Rv = 287.058, 461.495
-    rho = (pdry / (Rd * T)) + (e / (Rv * T))
-    return rho
+INPUT_PATH = Path("data/processed/results_clean.parquet")
+OUTPUT_PATH = Path("data/processed/results_altitude_density.parquet")
 
-print("🔍 Loading cleaned results...")
-df = pd.read_parquet("data/processed/results_clean.parquet")
+def add_altitude_density(df, fetch=None, gazetteer=None):
+    """Attach lat/lon + altitude from the venue gazetteer and a baseline rho_air_abs.
 
-# Dummy values for weather if missing
-df["temp_c"] = 25.0
-df["pressure_hpa"] = 1013.25
-df["rh_pct"] = 50.0
+    Venues the gazetteer doesn't know are geocoded once and learned; rows
+    whose venue still can't be located are reported and dropped.
+    """
+    own_fetch = fetch is None
+    fetch = fetch or open_fetcher()
 
-# Lookup coords manually (quick static fallback for small dataset)
-venues = {
-    "Olympiastadion, Berlin (GER)": (52.5145, 13.2395),
-    "Shanghai (CHN)": (31.2304, 121.4737),
-    "Stade Olympique de la Pontaise, Lausanne (SUI)": (46.5197, 6.6336),
-    "Suhaim bin Hamad Stadium, Doha (QAT)": (25.2854, 51.5310),
-}
+    df = attach_venues(df, gazetteer, fetch)
 
-records = []
-for i, row in df.iterrows():
-    venue = row["venue"]
-    if venue not in venues:
-        continue
+    # Dummy values for weather if missing
+    df["temp_c"] = 25.0
+    df["pressure_hpa"] = 1013.25
+    df["rh_pct"] = 50.0
+    df["rho_air_abs"] = frame_air_density(df)
 
-    lat, lon = venues[venue]
-    alt = get_altitude(lat, lon)
-    rho = air_density(row["temp_c"], row["pressure_hpa"], row["rh_pct"])
+    print(f"🌐 Fetch: {fetch.stats()}")
+    if own_fetch:
+        fetch.close()
+    return df.reset_index(drop=True)
 
-    record = row.to_dict()
-    record["lat"] = lat
-    record["lon"] = lon
-    record["altitude_m"] = alt
-    record["rho_air_abs"] = rho
-    records.append(record)
-
-    if i % 2 == 0:
-        print(f"✅ {venue} done (alt={alt:.0f} m, rho={rho:.2f} kg/m³)")
-    time.sleep(0.5)
-
-out = pd.DataFrame(records)
-out_path = Path("data/processed/results_altitude_density.parquet")
-out.to_parquet(out_path, index=False)
-print(f"✅ Saved absolute density file → {out_path.resolve()}")
+def main(input_path=INPUT_PATH, output_path=OUTPUT_PATH):
+    print("🔍 Loading cleaned results...")
+    df = pd.read_parquet(input_path)
+    out = add_altitude_density(df)
+    out.to_parquet(output_path, index=False)
+    print(f"✅ Saved absolute density file → {Path(output_path).resolve()}")
 
+if __name__ == "__main__":
+    main()
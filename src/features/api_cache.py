@@ -0,0 +1,169 @@
+# src/features/api_cache.py
+"""
+Persistent SQLite cache for Open-Meteo responses (geocoding, elevation, ERA5).
+
+Entries are keyed by a normalized query so the same venue / grid cell / date
+is only downloaded once. Supports a TTL, size-bounded LRU eviction, hit/miss
+counters and an offline mode that never touches the network. HTTP, rate
+limiting and retries live in fetch_executor; this module only stores.
+
+Reads don't write: the access times that drive LRU eviction are kept in
+memory and written in one batch before the next eviction check, every
+ACCESS_BATCH hits, and on close.
+
+Environment overrides (read by open_cache):
+    KINETICGEN_CACHE        path of the SQLite file
+    KINETICGEN_CACHE_TTL    seconds before an entry expires (unset = never)
+    KINETICGEN_CACHE_MAX    max number of entries kept
+    KINETICGEN_OFFLINE      "1" to serve from cache only
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+DEFAULT_PATH = Path("data/cache/open_meteo.sqlite")
+DEFAULT_MAX_ENTRIES = 200_000
+GRID_DECIMALS = 2  # ~1 km; nearby queries share an entry
+ACCESS_BATCH = 1000  # pending access times written in one statement
+
+
+def _norm_text(s):
+    return " ".join(str(s).lower().split())
+
+
+def _norm_coord(x, decimals=GRID_DECIMALS):
+    return f"{round(float(x), decimals):.{decimals}f}"
+
+
+def geocode_key(name):
+    return f"geocode|{_norm_text(name)}"
+
+
+def elevation_key(lat, lon, decimals=GRID_DECIMALS):
+    return f"elevation|{_norm_coord(lat, decimals)}|{_norm_coord(lon, decimals)}"
+
+
+def weather_key(lat, lon, start_date, end_date, variables, decimals=GRID_DECIMALS):
+    vars_ = ",".join(sorted(variables))
+    return (f"era5|{_norm_coord(lat, decimals)}|{_norm_coord(lon, decimals)}"
+            f"|{start_date}|{end_date}|{vars_}")
+
+
+class ResponseCache:
+    """SQLite-backed JSON response cache with hit/miss counters."""
+
+    def __init__(self, path=DEFAULT_PATH, ttl=None, max_entries=DEFAULT_MAX_ENTRIES, offline=False):
+        self.path = Path(path)
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.offline = offline
+        self.hits = 0
+        self.misses = 0
+        self._accessed = {}  # key → last hit time, not yet written
+        self._lock = threading.Lock()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY,"
+            " body TEXT NOT NULL,"
+            " created REAL NOT NULL,"
+            " accessed REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses(accessed)")
+        self._db.commit()
+
+    # --- raw key/value access ---
+
+    def get(self, key):
+        """Cached value for key, or None if missing / expired."""
+        now = time.time()
+        with self._lock:
+            row = self._db.execute("SELECT body, created FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is not None and self.ttl is not None and now - row[1] > self.ttl:
+                self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._db.commit()
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            self._accessed[key] = now
+            if len(self._accessed) >= ACCESS_BATCH:
+                self._write_accessed()
+                self._db.commit()
+            self.hits += 1
+        return json.loads(row[0])
+
+    def set(self, key, value):
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses (key, body, created, accessed) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value), now, now),
+            )
+            self._accessed.pop(key, None)
+            self._write_accessed()
+            self._evict()
+            self._db.commit()
+
+    def _write_accessed(self):
+        if self._accessed:
+            self._db.executemany("UPDATE responses SET accessed = ? WHERE key = ?",
+                                 [(t, k) for k, t in self._accessed.items()])
+            self._accessed.clear()
+
+    def _evict(self):
+        (n,) = self._db.execute("SELECT COUNT(*) FROM responses").fetchone()
+        excess = n - self.max_entries
+        if excess > 0:
+            self._db.execute(
+                "DELETE FROM responses WHERE key IN"
+                " (SELECT key FROM responses ORDER BY accessed ASC LIMIT ?)",
+                (excess,),
+            )
+
+    # --- bookkeeping ---
+
+    def __len__(self):
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "entries": len(self),
+            "offline": self.offline,
+        }
+
+    def clear(self):
+        with self._lock:
+            self._accessed.clear()
+            self._db.execute("DELETE FROM responses")
+            self._db.commit()
+
+    def close(self):
+        with self._lock:
+            self._write_accessed()
+            self._db.commit()
+        self._db.close()
+
+
+def open_cache(**overrides):
+    """ResponseCache configured from KINETICGEN_* environment variables."""
+    ttl = os.environ.get("KINETICGEN_CACHE_TTL")
+    opts = {
+        "path": os.environ.get("KINETICGEN_CACHE", DEFAULT_PATH),
+        "ttl": float(ttl) if ttl else None,
+        "max_entries": int(os.environ.get("KINETICGEN_CACHE_MAX", DEFAULT_MAX_ENTRIES)),
+        "offline": os.environ.get("KINETICGEN_OFFLINE", "0") == "1",
+    }
+    opts.update(overrides)
+    return ResponseCache(**opts)
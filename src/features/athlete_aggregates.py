@@ -0,0 +1,319 @@
+# src/features/athlete_aggregates.py
+"""
+Materialized per-athlete aggregates, updated incrementally.
+
+An athlete is (competitor, dob, nat); dob and nat tell namesakes apart.
+The store holds two tables:
+- seasons: one row per athlete and year;
+- athletes: one row per athlete, rolled up from seasons.
+
+Each row has:
+- the result count;
+- bests with their date, venue and wind (fastest raw mark, fastest
+  wind-legal mark, fastest neutral time);
+- count, mean and centred sum of squares (m2) of perf, t_neutral, delta
+  and wind.
+
+Moments are merged with the parallel form of Welford's update (Chan et
+al.):
+    mean = Σ n·mean / N,   m2 = Σ [m2 + n·(mean − Mean)²]
+A batch of new results is just more parts (n = 1, m2 = 0) folded into the
+stored season rows. Nothing is re-read.
+
+refresh() compares row hashes of results_physics_refined.parquet with the
+hashes it has already folded in, and adds only the new rows. It rebuilds
+from scratch if a seen row was removed or changed, because a minimum
+cannot be un-merged. The tables are Parquet (zstd, dictionary-encoded
+keys) in data/processed/athlete_aggregates/, next to state.json and the
+seen hashes.
+
+    python src/features/athlete_aggregates.py [--top 20] [--athlete "Usain BOLT"]
+"""
+
+import argparse
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from clean_results import WIND_LIMIT
+from correction_engine import group_codes
+from ranking_service import result_years
+from results_dataset import DERIVED
+
+DEFAULT_PATH = Path("data/processed/results_physics_refined.parquet")
+STORE_DIR = Path("data/processed/athlete_aggregates")
+KEY = ["competitor", "dob", "nat"]
+SEASON_KEY = ["athlete_id", "year"]      # athlete_id: 64-bit hash of KEY, so merges don't compare strings
+MOMENTS = {"perf": "perf", "neutral": "t_neutral", "delta": "delta", "wind": "wind"}
+BESTS = ["perf", "legal", "neutral"]     # fastest raw, wind-legal raw and neutral time
+DETAILS = ["date", "venue", "wind"]      # kept with each best
+SOURCE_COLUMNS = KEY + ["year", "date", "venue", "perf", "wind", "t_neutral", "delta"]  # delta: derived if absent
+TEXT = KEY + [f"best_{b}_{d}" for b in BESTS for d in ("date", "venue")]  # stored dictionary-encoded
+VERSION = 1                              # bump when the stored columns change; old stores are rebuilt
+
+
+def _fingerprint(path):
+    st = Path(path).stat()
+    return f"{st.st_size}:{st.st_mtime_ns}"
+
+
+def row_hashes(df):
+    """Content hash per result (the columns aggregated), to spot appended rows."""
+    cols = [c for c in SOURCE_COLUMNS if c in df.columns]
+    return pd.util.hash_pandas_object(df[cols], index=False).to_numpy(dtype=np.uint64)
+
+
+def read_source(path=DEFAULT_PATH):
+    import pyarrow.parquet as pq
+    names = pq.read_schema(path).names
+    return pd.read_parquet(path, columns=[c for c in SOURCE_COLUMNS if c in names])
+
+
+def _float(df, col):
+    if col not in df.columns and col in DERIVED and set(DERIVED[col][0]) <= set(df.columns):
+        return DERIVED[col][1]({c: _float(df, c) for c in DERIVED[col][0]})
+    if col not in df.columns:
+        return np.full(len(df), np.nan)
+    return pd.to_numeric(df[col], errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+def _text(df, col):
+    if col not in df.columns:
+        return pd.Series(None, index=df.index, dtype="str")
+    return df[col].astype("str")
+
+
+def _parts(df):
+    """One part per result: n = 1 (0 where the value is missing), m2 = 0, each best its own mark."""
+    out = pd.DataFrame({c: _text(df, c) for c in KEY}).reset_index(drop=True)
+    out.insert(0, "athlete_id", pd.util.hash_pandas_object(out, index=False).to_numpy(dtype=np.uint64))
+    year = result_years(df) if {"year", "date"} & set(df.columns) else np.full(len(df), np.nan)
+    out["year"] = pd.array(year, dtype="Float64").astype("Int16")
+    out["results"] = np.ones(len(df), dtype=np.int64)
+    for name, col in MOMENTS.items():
+        x = _float(df, col)
+        ok = np.isfinite(x)
+        out[f"n_{name}"] = ok.astype(np.int64)
+        out[f"mean_{name}"] = np.where(ok, x, 0.0)
+        out[f"m2_{name}"] = 0.0
+    perf, wind = _float(df, "perf"), _float(df, "wind")
+    marks = {"perf": perf, "legal": np.where(wind <= WIND_LIMIT, perf, np.nan), "neutral": _float(df, "t_neutral")}
+    details = {"date": _text(df, "date").to_numpy(), "venue": _text(df, "venue").to_numpy(), "wind": wind}
+    for b in BESTS:
+        out[f"best_{b}"] = marks[b]
+        for d in DETAILS:
+            out[f"best_{b}_{d}"] = details[d]
+    return out
+
+
+def _season_ids(table):
+    """One uint64 per (athlete, year)."""
+    year = table["year"].astype("Float64").fillna(-1).to_numpy(dtype=np.int64).astype(np.uint64)
+    return table["athlete_id"].to_numpy(dtype=np.uint64) ^ ((year + np.uint64(1)) * np.uint64(0x9E3779B97F4A7C15))
+
+
+def _rollup(parts, keys):
+    """Merge parts (rows of the table layout) that share keys into one row each."""
+    gid, first = group_codes(parts, keys)
+    out = parts[keys + [c for c in KEY if c not in keys]].iloc[first].reset_index(drop=True)
+    out["results"] = np.bincount(gid, parts["results"].to_numpy(), len(first)).astype(np.int64)
+
+    for name in MOMENTS:
+        n = parts[f"n_{name}"].to_numpy(dtype=np.float64)
+        mean = np.where(n > 0, parts[f"mean_{name}"].to_numpy(dtype=np.float64), 0.0)  # empty parts hold NaN
+        total = np.bincount(gid, n, len(first))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            merged = np.bincount(gid, n * mean, len(first)) / total
+        dev = np.where(n > 0, mean - merged[gid], 0.0)
+        out[f"n_{name}"] = total.astype(np.int64)
+        out[f"mean_{name}"] = merged
+        out[f"m2_{name}"] = np.bincount(gid, parts[f"m2_{name}"].to_numpy() + n * dev * dev, len(first))
+
+    for b in BESTS:
+        cols = [f"best_{b}"] + [f"best_{b}_{d}" for d in DETAILS]
+        # per group, the fastest mark (NaN sorts last); ties keep the earliest part
+        order = np.lexsort((parts[f"best_{b}"].to_numpy(), gid))
+        take = order[np.searchsorted(gid[order], np.arange(len(first)))]
+        for c in cols:
+            out[c] = parts[c].to_numpy()[take]
+    return out
+
+
+def _athletes(seasons):
+    """Athlete rows from season rows, with the span of seasons."""
+    out = _rollup(seasons, ["athlete_id"])
+    gid = group_codes(seasons, ["athlete_id"])[0]
+    year = seasons["year"].astype("Float64").to_numpy(dtype=np.float64, na_value=np.nan)
+    span = pd.DataFrame({"g": gid, "year": year}).groupby("g")["year"].agg(["count", "min", "max"])
+    at = len(KEY) + 1
+    out.insert(at, "seasons", span["count"].to_numpy(dtype=np.int64))
+    out.insert(at + 1, "first_year", pd.array(span["min"].to_numpy(), dtype="Float64").astype("Int16"))
+    out.insert(at + 2, "last_year", pd.array(span["max"].to_numpy(), dtype="Float64").astype("Int16"))
+    return out
+
+
+def readable(table):
+    """A stored table with m2 turned into standard deviations (sample, ddof=1)."""
+    out = table.copy()
+    for name in MOMENTS:
+        n = out[f"n_{name}"].to_numpy(dtype=np.float64)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            out[f"sd_{name}"] = np.where(n > 1, np.sqrt(out.pop(f"m2_{name}").to_numpy() / (n - 1)), np.nan)
+        out.loc[n == 0, f"mean_{name}"] = np.nan
+    return out
+
+
+class AthleteAggregates:
+    """Season and athlete tables of running statistics (see module docstring)."""
+
+    def __init__(self):
+        self.seasons = _parts(pd.DataFrame())
+        self.athletes = _athletes(self.seasons)
+        self.seen = np.empty(0, dtype=np.uint64)
+        self.source = None
+
+    def __len__(self):
+        return len(self.athletes)
+
+    # --- updates ---
+
+    def update(self, df, hashes=None):
+        """Fold in new results; returns how many."""
+        if len(df) == 0:
+            return 0
+        batch = _rollup(_parts(df), SEASON_KEY)
+        if len(self.seasons):
+            # only the season rows the batch touches are merged; the rest are kept as they are
+            at = pd.Index(_season_ids(self.seasons)).get_indexer(_season_ids(batch))
+            hit = at[at >= 0]
+            keep = np.ones(len(self.seasons), dtype=bool)
+            keep[hit] = False
+            merged = _rollup(pd.concat([self.seasons.iloc[hit], batch], ignore_index=True), SEASON_KEY)
+            self.seasons = pd.concat([self.seasons[keep], merged], ignore_index=True)
+        else:
+            self.seasons = batch
+
+        ids = batch["athlete_id"].unique()
+        touched = _athletes(self.seasons[np.isin(self.seasons["athlete_id"].to_numpy(), ids)])
+        stale = np.isin(self.athletes["athlete_id"].to_numpy(), ids)
+        self.athletes = pd.concat([self.athletes[~stale], touched], ignore_index=True) \
+            if len(self.athletes) else touched
+        self.seen = np.concatenate([self.seen, row_hashes(df) if hashes is None else hashes])
+        return len(df)
+
+    def sync(self, df):
+        """Bring the store up to date with df, the full results frame. Returns (mode, rows)."""
+        hashes = row_hashes(df)
+        if not np.isin(self.seen, hashes).all():
+            fresh = AthleteAggregates()
+            fresh.update(df, hashes)
+            self.seasons, self.athletes, self.seen = fresh.seasons, fresh.athletes, fresh.seen
+            return "rebuilt", len(df)
+        new = ~np.isin(hashes, self.seen)
+        return "updated", self.update(df[new], hashes[new]) if new.any() else 0
+
+    def refresh(self, path=DEFAULT_PATH):
+        """sync() with a Parquet file, skipped when the file is unchanged since the last refresh."""
+        fingerprint = _fingerprint(path)
+        if fingerprint == self.source:
+            return "unchanged", 0
+        result = self.sync(read_source(path))
+        self.source = fingerprint
+        return result
+
+    # --- persistence ---
+
+    def save(self, store_dir=STORE_DIR):
+        store_dir = Path(store_dir)
+        store_dir.mkdir(parents=True, exist_ok=True)
+        for name, table in (("seasons", self.seasons), ("athletes", self.athletes)):
+            compact = table.astype({c: "category" for c in TEXT})
+            compact.to_parquet(store_dir / f"{name}.parquet", index=False, compression="zstd")
+        np.save(store_dir / "seen.npy", self.seen)
+        (store_dir / "state.json").write_text(json.dumps(
+            {"version": VERSION, "source": self.source, "results": len(self.seen)}, indent=2))
+
+    @classmethod
+    def load(cls, store_dir=STORE_DIR):
+        """The saved store, or an empty one if there is none (or it has an older layout)."""
+        store, store_dir = cls(), Path(store_dir)
+        state_path = store_dir / "state.json"
+        if not state_path.exists():
+            return store
+        state = json.loads(state_path.read_text())
+        if state.get("version") != VERSION:
+            return store
+
+        def table(name):
+            df = pd.read_parquet(store_dir / f"{name}.parquet")
+            return df.astype({c: "str" for c in TEXT})
+
+        store.seasons, store.athletes = table("seasons"), table("athletes")
+        store.seen = np.load(store_dir / "seen.npy")
+        store.source = state["source"]
+        return store
+
+    # --- queries ---
+
+    def _select(self, table, competitor, dob=None, nat=None):
+        mask = table["competitor"].eq(competitor).to_numpy(dtype=bool, na_value=False)
+        for col, value in (("dob", dob), ("nat", nat)):
+            if value is not None:
+                mask &= table[col].eq(value).to_numpy(dtype=bool, na_value=False)
+        return table[mask]
+
+    def athlete(self, competitor, dob=None, nat=None):
+        """Season-by-season progression of the athletes matching competitor (and dob / nat)."""
+        rows = self._select(self.seasons, competitor, dob, nat)
+        return readable(rows.sort_values(KEY + ["year"])).reset_index(drop=True)
+
+    def top(self, k=20, by="best_neutral"):
+        """The k athletes with the lowest `by` (a best or mean column)."""
+        return readable(self.athletes.nsmallest(k, by)).reset_index(drop=True)
+
+    def season_bests(self, year, k=20, by="best_neutral"):
+        """The k best athletes of one season by their season best."""
+        season = self.seasons[self.seasons["year"].eq(year).to_numpy(dtype=bool, na_value=False)]
+        return readable(season.nsmallest(k, by)).reset_index(drop=True)
+
+
+def refresh_store(path=DEFAULT_PATH, store_dir=STORE_DIR):
+    """Load the store, fold in what changed in path and save it if anything did. Returns (store, mode, rows)."""
+    store = AthleteAggregates.load(store_dir)
+    mode, rows = store.refresh(path)
+    if mode != "unchanged":
+        store.save(store_dir)
+    return store, mode, rows
+
+
+def aggregate_stage(df, store=str(STORE_DIR)):
+    """Pipeline stage: sync the store with the refined results; returns the athlete table."""
+    agg = AthleteAggregates.load(store)
+    mode, rows = agg.sync(df)
+    agg.save(store)
+    print(f"👤 athlete aggregates {mode}: {rows} results folded in, {len(agg)} athletes")
+    return agg.athletes
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Per-athlete bests, counts and running statistics.")
+    ap.add_argument("--input", default=str(DEFAULT_PATH))
+    ap.add_argument("--store", default=str(STORE_DIR))
+    ap.add_argument("--top", type=int, default=20)
+    ap.add_argument("--athlete", default=None, help="print this competitor's season progression")
+    args = ap.parse_args(argv)
+
+    store, mode, rows = refresh_store(args.input, args.store)
+    print(f"👤 {mode}: {rows} results folded in; {len(store)} athletes, {len(store.seasons)} seasons")
+    cols = KEY + ["results", "best_perf", "best_legal", "best_neutral", "sd_perf", "sd_neutral"]
+    if args.athlete:
+        print(store.athlete(args.athlete)[["year"] + cols].to_string(index=False))
+    else:
+        print(store.top(args.top)[cols].to_string(index=False))
+    print(f"✅ Store → {Path(args.store).resolve()}")
+
+
+if __name__ == "__main__":
+    main()
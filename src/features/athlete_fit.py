@@ -0,0 +1,208 @@
+# src/features/athlete_fit.py
+"""
+Inverse fitting of propulsive parameters from observed times.
+
+For each result, find the propulsive scale s such that the sprint model
+(sprint_sim.py) with f0 = s·f0_ref and v0 = s·v0_ref, under that day's wind
+and air density, reproduces `perf` (altitude enters through rho_air_abs).
+All rows are solved together with a vectorized Illinois (regula falsi)
+root-finder; every iteration is one batched simulation of the rows that
+haven't converged yet.
+
+Rows are sharded across a process pool in contiguous blocks, so output
+order is deterministic, and each athlete's previous fit (athlete_fits.parquet)
+is used as a tight starting bracket.
+
+In the pipeline, "fit" writes the per-result fits and the "athlete_fits"
+stage summarizes them into athlete_fits.parquet. The fit stage only reads
+that file for warm starts, which move the starting bracket but not the root.
+"""
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from sprint_sim import DEFAULT_ATHLETE, simulate
+
+INPUT_PATH = Path("data/processed/results_weather_real.parquet")
+OUTPUT_PATH = Path("data/processed/results_fitted.parquet")
+FITS_PATH = Path("data/processed/athlete_fits.parquet")
+ATHLETE_KEY = ["competitor", "dob"]
+
+REACTION_TIME = 0.15  # s, added to the simulated run to compare with `perf`
+COLD_BRACKET = (0.6, 1.6)
+WARM_WIDTH = 0.03     # ± relative bracket around an athlete's previous scale
+
+
+def model_times(scale, wind, rho, template=DEFAULT_ATHLETE, reaction_time=REACTION_TIME, dt=0.01):
+    """Race time for each propulsive scale (inf if the runner never finishes)."""
+    res = simulate(
+        f0=scale * template.f0, v0=scale * template.v0, tau=template.tau,
+        mass_kg=template.mass_kg, cd_a=template.cd_a,
+        wind=wind, rho=rho, reaction_time=reaction_time, dt=dt, t_max=30.0, curve_dt=30.0,
+    )
+    return np.nan_to_num(res.race_time, nan=np.inf)
+
+
+def solve_scale(perf, wind, rho, lo=None, hi=None, template=DEFAULT_ATHLETE,
+                reaction_time=REACTION_TIME, tol=1e-4, max_iter=40, dt=0.01):
+    """Vectorized root-finding of model_times(s) == perf.
+
+    lo / hi are per-row starting brackets (widened automatically when they
+    don't contain the root). Returns (scale, residual_s, converged).
+    """
+    perf, wind, rho = (np.asarray(a, dtype=np.float64) for a in (perf, wind, rho))
+    n = perf.shape[0]
+    lo = np.full(n, COLD_BRACKET[0]) if lo is None else np.asarray(lo, dtype=np.float64).copy()
+    hi = np.full(n, COLD_BRACKET[1]) if hi is None else np.asarray(hi, dtype=np.float64).copy()
+
+    def f(s, idx):
+        # model time is decreasing in s: f > 0 means too slow, the root lies above s
+        return model_times(s, wind[idx], rho[idx], template, reaction_time, dt) - perf[idx]
+
+    all_idx = np.arange(n)
+    flo, fhi = f(lo, all_idx), f(hi, all_idx)
+    for _ in range(20):  # widen brackets that miss the root
+        bad_lo, bad_hi = flo <= 0, fhi >= 0
+        if not (bad_lo.any() or bad_hi.any()):
+            break
+        if bad_lo.any():
+            lo[bad_lo] /= 1.25
+            flo[bad_lo] = f(lo[bad_lo], all_idx[bad_lo])
+        if bad_hi.any():
+            hi[bad_hi] *= 1.25
+            fhi[bad_hi] = f(hi[bad_hi], all_idx[bad_hi])
+
+    flo = np.where(np.isinf(flo), 1e3, flo)  # keep the secant finite
+    scale = np.full(n, np.nan)
+    resid = np.full(n, np.nan)
+    side = np.zeros(n, dtype=np.int8)
+    active = np.isfinite(perf) & np.isfinite(wind) & np.isfinite(rho) & (flo > 0) & (fhi < 0)
+
+    for _ in range(max_iter):
+        idx = np.flatnonzero(active)
+        if idx.size == 0:
+            break
+        s = (lo[idx] * fhi[idx] - hi[idx] * flo[idx]) / (fhi[idx] - flo[idx])
+        fs = f(s, idx)
+        scale[idx], resid[idx] = s, fs
+
+        slow = fs > 0
+        i_lo, i_hi = idx[slow], idx[~slow]
+        lo[i_lo], flo[i_lo] = s[slow], fs[slow]
+        fhi[i_lo[side[i_lo] == 1]] /= 2       # Illinois: same end twice → halve the other
+        side[i_lo] = 1
+        hi[i_hi], fhi[i_hi] = s[~slow], fs[~slow]
+        flo[i_hi[side[i_hi] == -1]] /= 2
+        side[i_hi] = -1
+
+        active[idx[np.abs(fs) < tol]] = False
+
+    converged = np.abs(resid) < tol
+    return scale, resid, converged
+
+
+def warm_brackets(df, fits):
+    """Per-row (lo, hi) from each athlete's previous scale, cold bracket otherwise."""
+    n = len(df)
+    lo, hi = np.full(n, COLD_BRACKET[0]), np.full(n, COLD_BRACKET[1])
+    if fits is None or fits.empty:
+        return lo, hi
+    prev = df[ATHLETE_KEY].merge(fits[ATHLETE_KEY + ["scale"]], on=ATHLETE_KEY, how="left")["scale"].to_numpy()
+    warm = np.isfinite(prev)
+    lo[warm] = prev[warm] * (1 - WARM_WIDTH)
+    hi[warm] = prev[warm] * (1 + WARM_WIDTH)
+    return lo, hi
+
+
+def _fit_shard(args):
+    perf, wind, rho, lo, hi, template, reaction_time = args
+    return solve_scale(perf, wind, rho, lo, hi, template, reaction_time)
+
+
+def fit_results(df, workers=None, shard_size=2000, template=DEFAULT_ATHLETE,
+                reaction_time=REACTION_TIME, fits=None):
+    """Add fit_scale / fit_f0 / fit_v0 / fit_residual / fit_converged columns to df.
+
+    fits is the previous per-athlete table used for warm starts.
+    """
+    df = df.copy()
+    perf = pd.to_numeric(df["perf"], errors="coerce").to_numpy(dtype=np.float64)
+    wind = pd.to_numeric(df["wind"], errors="coerce").to_numpy(dtype=np.float64)
+    rho = pd.to_numeric(df["rho_air_abs"], errors="coerce").to_numpy(dtype=np.float64)
+    lo, hi = warm_brackets(df, fits)
+
+    bounds = list(range(0, len(df), shard_size)) + [len(df)]
+    shards = [(perf[a:b], wind[a:b], rho[a:b], lo[a:b], hi[a:b], template, reaction_time)
+              for a, b in zip(bounds[:-1], bounds[1:])]
+    workers = workers or os.cpu_count() or 1
+    if workers > 1 and len(shards) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(shards))) as pool:
+            parts = list(pool.map(_fit_shard, shards))  # map keeps shard order
+    else:
+        parts = [_fit_shard(s) for s in shards]
+
+    if parts:
+        scale, resid, conv = (np.concatenate(p) for p in zip(*parts))
+    else:
+        scale = resid = np.empty(0)
+        conv = np.empty(0, dtype=bool)
+    df["fit_scale"] = scale
+    df["fit_f0"] = scale * template.f0
+    df["fit_v0"] = scale * template.v0
+    df["fit_residual"] = resid
+    df["fit_converged"] = conv
+    return df
+
+
+def athlete_fits(fitted, previous=None):
+    """Per-athlete summary (median scale over converged results), merged over previous fits."""
+    ok = fitted[fitted["fit_converged"]]
+    fits = (ok.groupby(ATHLETE_KEY, dropna=False, observed=True)
+              .agg(scale=("fit_scale", "median"), n_results=("fit_scale", "size"))
+              .reset_index())
+    if previous is not None and not previous.empty:
+        keep = previous.merge(fits[ATHLETE_KEY], on=ATHLETE_KEY, how="left", indicator=True)
+        keep = keep[keep["_merge"] == "left_only"].drop(columns="_merge")
+        fits = pd.concat([keep, fits], ignore_index=True)
+    return fits
+
+
+def read_fits(fits_path=FITS_PATH):
+    """Previous per-athlete fits, or None if there are none yet."""
+    return pd.read_parquet(fits_path) if Path(fits_path).exists() else None
+
+
+def fit_stage(df, reaction_time=REACTION_TIME, fits_path=FITS_PATH, workers=None):
+    """Pipeline stage: per-result fits, warm-started from fits_path."""
+    return fit_results(df, workers=workers, reaction_time=reaction_time, fits=read_fits(fits_path))
+
+
+def fits_stage(fitted):
+    """Pipeline stage: per-athlete fits from all fitted results."""
+    return athlete_fits(fitted)
+
+
+def main(input_path=INPUT_PATH, output_path=OUTPUT_PATH, fits_path=FITS_PATH, workers=None):
+    print("🔍 Loading weather-enriched results...")
+    df = pd.read_parquet(input_path)
+    previous = read_fits(fits_path)
+
+    t0 = time.perf_counter()
+    fitted = fit_results(df, workers=workers, fits=previous)
+    dt = time.perf_counter() - t0
+    print(f"🧮 Fitted {len(fitted)} results in {dt:.2f} s "
+          f"({fitted['fit_converged'].mean():.1%} converged)")
+    print(fitted[["competitor", "perf", "wind", "rho_air_abs", "fit_scale", "fit_residual"]].head())
+
+    fitted.to_parquet(output_path, index=False)
+    athlete_fits(fitted, previous).to_parquet(fits_path, index=False)
+    print(f"✅ Saved → {Path(output_path).resolve()}")
+
+
+if __name__ == "__main__":
+    main()
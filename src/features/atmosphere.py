@@ -0,0 +1,76 @@
+# src/features/atmosphere.py
+"""
+Shared atmospheric physics: saturation vapour pressure, partial pressures and
+moist-air density as NumPy kernels.
+
+Every function takes scalars or arrays (broadcast like ufuncs) and states its
+units in the argument names. Pressures are in Pa unless a name says hPa.
+"""
+
+import numpy as np
+
+RD = 287.058   # specific gas constant of dry air (J/(kg·K))
+RV = 461.495   # specific gas constant of water vapour (J/(kg·K))
+T0 = 273.15    # 0 °C in K
+
+# saturation vapour pressure formulations: es = a * exp(b * T / (T + c)) in hPa
+FORMULATIONS = {
+    # Tetens 6.1078 * 10 ** (7.5 T / (237.3 + T)), rewritten in base e
+    "tetens": (6.1078, 7.5 * np.log(10.0), 237.3),
+    # Magnus / Bolton (1980)
+    "magnus": (6.112, 17.67, 243.5),
+}
+DEFAULT_FORMULATION = "tetens"
+
+
+def hpa_to_pa(p_hpa):
+    return np.asarray(p_hpa, dtype=np.float64) * 100.0
+
+
+def pa_to_hpa(p_pa):
+    return np.asarray(p_pa, dtype=np.float64) / 100.0
+
+
+def saturation_vapour_pressure(temp_c, formulation=DEFAULT_FORMULATION):
+    """Saturation vapour pressure over water (Pa)."""
+    try:
+        a, b, c = FORMULATIONS[formulation]
+    except KeyError:
+        raise ValueError(f"unknown formulation {formulation!r}, expected one of {sorted(FORMULATIONS)}")
+    t = np.asarray(temp_c, dtype=np.float64)
+    return a * np.exp(b * t / (t + c)) * 100.0
+
+
+def vapour_pressure(temp_c, rh_pct, formulation=DEFAULT_FORMULATION):
+    """Partial pressure of water vapour (Pa) from temperature and relative humidity."""
+    rh = np.asarray(rh_pct, dtype=np.float64) / 100.0
+    return rh * saturation_vapour_pressure(temp_c, formulation)
+
+
+def dry_air_pressure(pressure_pa, vapour_pa):
+    """Partial pressure of dry air (Pa)."""
+    return np.asarray(pressure_pa, dtype=np.float64) - vapour_pa
+
+
+def air_density(temp_c, pressure_pa, rh_pct, formulation=DEFAULT_FORMULATION):
+    """Absolute density of moist air (kg/m³), treating dry air and vapour as ideal gases."""
+    T = np.asarray(temp_c, dtype=np.float64) + T0
+    e = vapour_pressure(temp_c, rh_pct, formulation)
+    pdry = dry_air_pressure(pressure_pa, e)
+    return pdry / (RD * T) + e / (RV * T)
+
+
+def frame_air_density(df, temp_col="temp_c", pressure_col="pressure_hpa", rh_col="rh_pct",
+                      pressure_unit="hPa", formulation=DEFAULT_FORMULATION):
+    """Air density for every row of a DataFrame in one call."""
+    p = df[pressure_col].to_numpy(dtype=np.float64)
+    if pressure_unit == "hPa":
+        p = hpa_to_pa(p)
+    elif pressure_unit != "Pa":
+        raise ValueError(f"pressure_unit must be 'hPa' or 'Pa', got {pressure_unit!r}")
+    return air_density(
+        df[temp_col].to_numpy(dtype=np.float64),
+        p,
+        df[rh_col].to_numpy(dtype=np.float64),
+        formulation,
+    )
@@ -0,0 +1,109 @@
+# src/features/bulk_weather.py
+"""
+Venue-grouped bulk ERA5 fetching.
+
+Instead of one request per result row (start_date == end_date), rows are
+grouped by (lat, lon) and each location gets one request per date span,
+chunked to MAX_SPAN_DAYS. All span requests go through the shared
+FetchExecutor concurrently, and the daily series are then merged back onto
+the rows in a single join.
+"""
+
+import numpy as np
+import pandas as pd
+
+from api_cache import weather_key
+
+ERA5 = "https://archive-api.open-meteo.com/v1/era5"
+MAX_SPAN_DAYS = 366  # keep each archive request to about a year of daily data
+
+
+def to_iso_dates(values):
+    """Vectorized '16 AUG 2009' -> '2009-08-16' (None where unparseable).
+
+    'mixed' parsing is per element, so only the distinct strings are parsed.
+    """
+    values = pd.Series(values)
+    codes, uniq = pd.factorize(values)
+    dt = pd.to_datetime(pd.Series(uniq, dtype=object), format="mixed", dayfirst=True, errors="coerce")
+    iso = dt.dt.strftime("%Y-%m-%d").to_numpy(dtype=object)
+    iso[pd.isna(iso)] = None
+    out = np.full(len(codes), None, dtype=object)
+    out[codes >= 0] = iso[codes[codes >= 0]]
+    return pd.Series(out, index=values.index, dtype=object)
+
+
+def date_spans(iso_dates, max_days=MAX_SPAN_DAYS):
+    """Cover the needed dates with as few [start, end] spans as possible.
+
+    A span starts at the first uncovered date and reaches at most max_days,
+    so sparse dates across many years don't pull down every day in between.
+    """
+    days = sorted(pd.to_datetime(pd.Series(iso_dates).dropna().unique()))
+    spans = []
+    for d in days:
+        if spans and d <= spans[-1][0] + pd.Timedelta(days=max_days - 1):
+            spans[-1][1] = d
+        else:
+            spans.append([d, d])
+    return [(s.date().isoformat(), e.date().isoformat()) for s, e in spans]
+
+
+def span_request(lat, lon, start_date, end_date, variables):
+    """(url, params, cache key) for one location and date span."""
+    params = {
+        "latitude": lat,
+        "longitude": lon,
+        "start_date": start_date,
+        "end_date": end_date,
+        "daily": list(variables),
+        "timezone": "UTC",
+    }
+    return ERA5, params, weather_key(lat, lon, start_date, end_date, variables)
+
+
+def daily_frame(js, variables):
+    """ERA5 JSON response → DataFrame with one row per day (None if empty)."""
+    daily = (js or {}).get("daily", {})
+    if not daily:
+        return None
+    series = pd.DataFrame({v: daily.get(v) for v in variables})
+    series["iso_date"] = daily["time"]
+    return series
+
+
+def attach_daily_weather(df, fetcher, variables, lat_col="lat", lon_col="lon",
+                         date_col="iso_date", max_days=MAX_SPAN_DAYS, verbose=True):
+    """Left-join daily ERA5 variables onto df, one request batch per location.
+
+    fetcher is a FetchExecutor. Rows whose location or date is missing (or
+    whose weather could not be fetched) get NaN in the weather columns.
+    """
+    needed = df[[lat_col, lon_col, date_col]].dropna()
+    groups = needed.groupby([lat_col, lon_col], sort=False)[date_col]
+
+    locs, jobs = [], []
+    for (lat, lon), dates in groups:
+        for start, end in date_spans(dates, max_days):
+            locs.append((lat, lon))
+            jobs.append(span_request(lat, lon, start, end, variables))
+
+    frames = []
+    for (lat, lon), js in zip(locs, fetcher.map(jobs)):
+        s = daily_frame(js, variables)
+        if s is None:
+            if verbose:
+                print(f"⚠️  No weather for ({lat:.3f}, {lon:.3f})")
+            continue
+        s[lat_col], s[lon_col] = lat, lon
+        frames.append(s)
+    if verbose:
+        print(f"🌦️  {len(jobs)} ERA5 requests for {groups.ngroups} locations ({len(needed)} rows)")
+
+    if not frames:
+        return df.assign(**{v: float("nan") for v in variables})
+
+    wx = pd.concat(frames, ignore_index=True)
+    wx = wx.rename(columns={"iso_date": date_col})
+    wx = wx.drop_duplicates([lat_col, lon_col, date_col])
+    return df.merge(wx, on=[lat_col, lon_col, date_col], how="left")
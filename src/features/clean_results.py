@@ -1,55 +1,176 @@
 # src/features/clean_results.py
 """
 Cleans and normalizes the raw 100 m results dataset.
+
+Parsing is vectorized: Arrow regex kernels run once per distinct string and
+are broadcast back. The flags on a mark are kept instead of discarding it:
+    '9.58A'  → perf 9.58, altitude_assisted
+    '10.0h'  → perf 10.0, hand_timed
+    '+2.4w'  → wind 2.4,  wind_assisted (also set for any wind above +2.0)
+'1:44.5' style marks become seconds. The output follows an explicit Arrow
+schema. Repetitive text columns are dictionary-encoded (pandas categoricals)
+and integer columns are narrowed.
 """
 
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
 from pathlib import Path
 
 input_path = Path("data/processed/results.parquet")
 output_path = Path("data/processed/results_clean.parquet")
 
-print("🔍 Loading raw results...")
-df = pd.read_parquet(input_path)
+WIND_LIMIT = 2.0  # m/s, above which a mark is wind-assisted
+
+PERF_RE = r"^\s*(?:(?P<min>\d+):)?(?P<sec>\d+(?:\.\d+)?)\s*(?P<flags>[A-Za-z]*)\s*$"
+WIND_RE = r"^\s*(?P<wind>[+-]?\d+(?:\.\d+)?)\s*(?P<w>[wW]?)\s*$"
+
+DICT = pa.dictionary(pa.int32(), pa.string())
+SCHEMA = pa.schema([
+    ("rank", pa.int16()),
+    ("perf", pa.float64()),   # kept at float64: float32 would turn 9.58 into 9.5799999
+    ("wind", pa.float64()),
+    ("competitor", DICT),
+    ("dob", pa.string()),
+    ("nat", DICT),
+    ("pos", DICT),
+    ("venue", DICT),
+    ("date", pa.string()),
+    ("resultscore", pa.int16()),
+    ("competition", DICT),
+    ("year", pa.int16()),
+    ("altitude_assisted", pa.bool_()),
+    ("hand_timed", pa.bool_()),
+    ("wind_assisted", pa.bool_()),
+])
+# scraper columns that may also be present
+OPTIONAL = {
+    "event": DICT, "sex": DICT, "age_group": DICT, "environment": DICT,
+    "season": pa.int16(), "result_id": pa.string(),
+}
+
+
+def _per_unique(values, fn):
+    """Run fn on the distinct strings of a column and broadcast the results back to every row.
+
+    Marks, winds and dates repeat heavily, so the regex kernels see only a
+    few thousand distinct strings even for a multi-million-row archive.
+    Categorical input is used as is (its categories are already distinct).
+    """
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        uniq = pa.array(values.cat.categories.astype("string"), type=pa.string(), from_pandas=True)
+        codes = values.cat.codes.to_numpy()
+        indices = pa.array(codes, mask=codes < 0)
+    else:
+        arr = pa.array(values.astype("string"), type=pa.string(), from_pandas=True)
+        if isinstance(arr, pa.ChunkedArray):
+            arr = arr.combine_chunks()
+        enc = pc.dictionary_encode(arr)
+        uniq, indices = enc.dictionary, enc.indices
+    return {name: pc.take(out, indices).to_numpy(zero_copy_only=False)
+            for name, out in fn(uniq).items()}
+
+
+def _number(strings):
+    """float64 from digit strings; empty or missing → null."""
+    return pc.cast(pc.if_else(pc.equal(strings, ""), pa.scalar(None, pa.string()), strings), pa.float64())
+
+
+def _perf_kernel(uniq):
+    m = pc.extract_regex(uniq, PERF_RE)
+    minutes = pc.fill_null(_number(pc.struct_field(m, "min")), 0.0)
+    flags = pc.fill_null(pc.struct_field(m, "flags"), "")
+    return {
+        "perf": pc.add(_number(pc.struct_field(m, "sec")), pc.multiply(minutes, 60.0)),
+        "altitude_assisted": pc.match_substring(flags, "A"),
+        "hand_timed": pc.match_substring(flags, "h"),
+    }
+
+
+def _wind_kernel(uniq):
+    m = pc.extract_regex(uniq, WIND_RE)
+    value = _number(pc.struct_field(m, "wind"))
+    marked = pc.fill_null(pc.not_equal(pc.struct_field(m, "w"), ""), False)
+    return {"wind": value, "wind_assisted": pc.or_(marked, pc.fill_null(pc.greater(value, WIND_LIMIT), False))}
+
+
+def parse_perf(perf):
+    """Vectorized mark parsing → DataFrame(perf, altitude_assisted, hand_timed)."""
+    out = pd.DataFrame(_per_unique(perf, _perf_kernel), index=perf.index)
+    return out.astype({"perf": "float64", "altitude_assisted": bool, "hand_timed": bool})
+
+
+def parse_wind(wind):
+    """Vectorized wind parsing ('+0.9', '-1.2', '+2.4w', 'NWI') → DataFrame(wind, wind_assisted)."""
+    out = pd.DataFrame(_per_unique(wind, _wind_kernel), index=wind.index)
+    return out.astype({"wind": "float64", "wind_assisted": bool})
+
+
+def parse_int(values, pattern=r"(?P<n>\d+)"):
+    """First digit run of each string as nullable Int16 (e.g. rank '12=' → 12, year from a date)."""
+    def kernel(uniq):
+        return {"n": _number(pc.struct_field(pc.extract_regex(uniq, pattern), "n"))}
+    return pd.Series(_per_unique(values, kernel)["n"], index=values.index).astype("Int16")
+
+
+def types_of(name):
+    return (dict(zip(SCHEMA.names, SCHEMA.types)) | OPTIONAL).get(name)
+
+
+def to_arrow(df):
+    """Arrow table with the clean schema; extra columns (e.g. _src_hash) keep their own types."""
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    schema = pa.schema([pa.field(f.name, types_of(f.name) or f.type) for f in table.schema])
+    return table.cast(schema.with_metadata(table.schema.metadata))  # pandas metadata keeps Int16 etc.
+
+
+def read_raw(path):
+    """Raw results with the dictionary columns decoded straight from Parquet's own dictionary pages."""
+    names = pq.read_schema(path).names
+    wanted = [c for c in SCHEMA.names + list(OPTIONAL) if c in names and types_of(c) == DICT]
+    return pq.read_table(path, read_dictionary=wanted).to_pandas()
 
-# Fix misaligned columns from scraping (venue/date/resultscore swapped)
-if "venue" in df.columns and df["venue"].astype(str).str.strip().eq("").any():
-    print("🩺 Fixing column alignment...")
-    df["venue"] = df["date"]            # real venues were stored under 'date'
-    df["date"] = df["resultscore"]      # real dates under 'resultscore'
-    df["resultscore"] = df["competition"]  # shift resultscore
-    df["competition"] = None            # clear unused
 
+def clean_results(df):
+    df = df.copy()
 
-# Drop rows with missing performance
-df = df[df["perf"].notna() & (df["perf"] != "")]
+    # Fix misaligned columns from scraping (venue/date/resultscore swapped)
+    if "venue" in df.columns and df["venue"].astype(str).str.strip().eq("").any():
+        print("🩺 Fixing column alignment...")
+        df["venue"] = df["date"]            # real venues were stored under 'date'
+        df["date"] = df["resultscore"]      # real dates under 'resultscore'
+        df["resultscore"] = df["competition"]  # shift resultscore
+        df["competition"] = None            # clear unused
 
-# Convert performance to seconds (float)
-def parse_perf(p):
-    try:
-        return float(p)
-    except ValueError:
-        return None
+    perf = parse_perf(df["perf"])
+    df[perf.columns] = perf
+    wind = parse_wind(df["wind"] if "wind" in df.columns else pd.Series(None, index=df.index, dtype="string"))
+    df[wind.columns] = wind
 
-df["perf"] = df["perf"].apply(parse_perf)
+    # Drop rows missing perf
+    df = df[df["perf"].notna()]
 
-# Clean wind column (e.g., "+0.9" → 0.9)
-def parse_wind(w):
-    if not isinstance(w, str) or w.strip() == "":
-        return None
-    try:
-        return float(w.replace("+", ""))
-    except ValueError:
-        return None
+    for c in ["rank", "resultscore"]:
+        df[c] = parse_int(df[c])
+    df["year"] = parse_int(df["date"], r"(?P<n>\d{4})\s*$")
+    for c in SCHEMA.names:
+        if c not in df.columns:
+            df[c] = None
+    df = df[SCHEMA.names + [c for c in df.columns if c not in SCHEMA.names]]
 
-if "wind" in df.columns:
-    df["wind"] = df["wind"].apply(parse_wind)
+    # round-trip through the schema so dtypes match what downstream stages read back
+    return to_arrow(df.reset_index(drop=True)).to_pandas()
 
-# Drop rows missing perf or wind
-df = df.dropna(subset=["perf"])
-df = df.reset_index(drop=True)
+def main(input_path=input_path, output_path=output_path):
+    print("🔍 Loading raw results...")
+    df = clean_results(read_raw(input_path))
 
-print(f"✅ Cleaned dataset: {len(df)} rows remaining.")
-df.to_parquet(output_path, index=False)
-print(f"💾 Saved to {output_path.resolve()}")
+    print(f"✅ Cleaned dataset: {len(df)} rows remaining "
+          f"({int(df['altitude_assisted'].sum())} A, {int(df['hand_timed'].sum())} h, "
+          f"{int(df['wind_assisted'].sum())} wind-assisted).")
+    pq.write_table(to_arrow(df), output_path)
+    print(f"💾 Saved to {Path(output_path).resolve()}")
 
+if __name__ == "__main__":
+    main()
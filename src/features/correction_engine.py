@@ -0,0 +1,127 @@
+# src/features/correction_engine.py
+"""
+Vectorized neutral-time correction engine.
+
+Works on whole columns (NumPy arrays, pandas Series or Arrow arrays) instead
+of calling a Python function per row, and can stream a Parquet file row group
+by row group so memory stays bounded on multi-season archives.
+"""
+
+from dataclasses import dataclass, asdict
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+INPUT_COLUMNS = ["perf", "wind", "altitude_m", "rho_air_abs"]
+
+
+@dataclass(frozen=True)
+class CorrectionParams:
+    """Linear correction constants used by neutral_time."""
+    rho_ref: float = 1.225      # sea-level air density (kg/m³)
+    alt_scale: float = 0.00012  # time improvement per meter altitude (s/m)
+    wind_coeff: float = 0.045   # time improvement per m/s tailwind
+    rho_coeff: float = 0.25     # correction factor for density deviation
+
+    def to_dict(self):
+        return asdict(self)
+
+
+DEFAULT_PARAMS = CorrectionParams()
+
+
+def as_float_array(values):
+    """Turn a NumPy / pandas / Arrow column into a float64 array (NaN for missing)."""
+    if isinstance(values, (pa.Array, pa.ChunkedArray)):
+        if pa.types.is_floating(values.type) or pa.types.is_integer(values.type):
+            values = values.cast(pa.float64()).to_numpy(zero_copy_only=False)
+        else:
+            values = values.to_pandas()
+    if isinstance(values, pd.Series) and not pd.api.types.is_numeric_dtype(values):
+        values = pd.to_numeric(values, errors="coerce")
+    return np.asarray(values, dtype=np.float64)
+
+
+def group_codes(df, columns):
+    """Dense group code per row for the distinct combinations of columns, and the first row of each group.
+
+    Columns missing from df are skipped (all rows form one group if none is
+    present); missing values are a value of their own. Codes are re-factorized
+    after every column, so they stay below len(df) and can't overflow int64
+    however many columns are combined.
+    """
+    codes = np.zeros(len(df), dtype=np.int64)
+    for c in columns:
+        if c in df.columns:
+            k, uniq = pd.factorize(df[c], use_na_sentinel=False)
+            codes = pd.factorize(codes * len(uniq) + k)[0]
+    first = np.empty(int(codes.max()) + 1 if len(codes) else 0, dtype=np.int64)
+    first[codes[::-1]] = np.arange(len(codes))[::-1]  # reversed writes: earliest row wins
+    return codes, first
+
+
+def neutral_times(perf, wind, altitude_m, rho_air_abs, params=DEFAULT_PARAMS):
+    """Corrected (neutral) times for whole columns in one batched pass.
+
+    Rows with any missing input come back as NaN.
+    """
+    perf = as_float_array(perf)
+    wind = as_float_array(wind)
+    alt = as_float_array(altitude_m)
+    rho = as_float_array(rho_air_abs)
+
+    out = perf + params.wind_coeff * wind
+    out -= params.alt_scale * alt
+    out += params.rho_coeff * (params.rho_ref - rho)
+    return out
+
+
+def correct_frame(df, params=DEFAULT_PARAMS, dropna=True):
+    """Add a t_neutral column to a DataFrame (drops rows with missing inputs by default)."""
+    df = df.copy()
+    for c in INPUT_COLUMNS:
+        df[c] = as_float_array(df[c])
+    if dropna:
+        df = df.dropna(subset=INPUT_COLUMNS)
+    df["t_neutral"] = neutral_times(df["perf"], df["wind"], df["altitude_m"], df["rho_air_abs"], params)
+    return df
+
+
+def correct_table(table, params=DEFAULT_PARAMS, dropna=True):
+    """Arrow version of correct_frame; keeps every other column untouched."""
+    cols = {c: as_float_array(table.column(c)) for c in INPUT_COLUMNS}
+    for c in INPUT_COLUMNS:
+        table = table.set_column(table.schema.get_field_index(c), c, pa.array(cols[c]))
+
+    t_neutral = neutral_times(cols["perf"], cols["wind"], cols["altitude_m"], cols["rho_air_abs"], params)
+    if dropna:
+        keep = ~np.isnan(t_neutral)
+        table = table.filter(pa.array(keep))
+        t_neutral = t_neutral[keep]
+
+    if "t_neutral" in table.column_names:
+        table = table.drop(["t_neutral"])
+    return table.append_column("t_neutral", pa.array(t_neutral))
+
+
+def correct_parquet(in_path, out_path, params=DEFAULT_PARAMS, dropna=True):
+    """Chunked mode: correct a Parquet file one row group at a time.
+
+    Only one row group is held in memory at once. Returns the number of rows written.
+    """
+    src = pq.ParquetFile(in_path)
+    writer = None
+    n_out = 0
+    try:
+        for i in range(src.num_row_groups):
+            chunk = correct_table(src.read_row_group(i), params, dropna)
+            if writer is None:
+                writer = pq.ParquetWriter(out_path, chunk.schema)
+            writer.write_table(chunk)
+            n_out += chunk.num_rows
+    finally:
+        if writer is not None:
+            writer.close()
+    return n_out
@@ -0,0 +1,151 @@
+# src/features/correction_surface.py
+"""
+Precomputed physics correction surface with fast interpolated lookups.
+
+The drag-based sprint model (sprint_sim.py) is expensive per result, so it
+is evaluated once on a regular grid over (wind, air density, base
+performance). At every node the runner's propulsive scale is fitted to the
+observed time (athlete_fit.solve_scale) and re-run under neutral conditions
+(no wind, RHO_REF). The grid stores delta = t_neutral − perf.
+
+In this model altitude acts only through air density, so altitude is not a
+separate grid axis: rho_air_abs already carries it.
+
+The surface is saved as surface.npy (float32 values, memory-mapped on load)
+plus surface.json (axes and validation error). Lookups are vectorized
+multilinear interpolation, clipped to the grid.
+
+    python src/features/correction_surface.py     # build + validate + save
+"""
+
+import json
+import time
+from pathlib import Path
+
+import numpy as np
+
+from athlete_fit import REACTION_TIME, model_times, solve_scale
+from correction_engine import DEFAULT_PARAMS
+from sprint_sim import DEFAULT_ATHLETE
+
+SURFACE_DIR = Path("data/processed/correction_surface")
+AXES = ("wind", "rho", "perf")
+DEFAULT_AXES = {
+    "wind": np.round(np.arange(-4.0, 4.0001, 0.25), 4),
+    "rho": np.round(np.arange(0.85, 1.35001, 0.025), 4),
+    "perf": np.round(np.arange(9.3, 11.5001, 0.1), 4),
+}
+
+
+def model_delta(wind, rho, perf, template=DEFAULT_ATHLETE, reaction_time=REACTION_TIME,
+                rho_ref=DEFAULT_PARAMS.rho_ref):
+    """Exact model correction t_neutral − perf for arrays of conditions."""
+    wind, rho, perf = np.broadcast_arrays(*(np.asarray(a, dtype=np.float64) for a in (wind, rho, perf)))
+    shape = wind.shape
+    wind, rho, perf = wind.ravel(), rho.ravel(), perf.ravel()
+    scale, _, _ = solve_scale(perf, wind, rho, template=template, reaction_time=reaction_time, tol=1e-5)
+    neutral = model_times(scale, np.zeros_like(wind), np.full_like(rho, rho_ref), template, reaction_time)
+    return (neutral - perf).reshape(shape)
+
+
+class CorrectionSurface:
+    """Gridded delta(wind, rho, perf) with multilinear interpolation."""
+
+    def __init__(self, axes, values, meta=None):
+        self.axes = [np.asarray(axes[name], dtype=np.float64) for name in AXES]
+        self.values = values
+        self.meta = meta or {}
+
+    # --- persistence ---
+
+    def save(self, directory=SURFACE_DIR):
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        np.save(directory / "surface.npy", np.asarray(self.values, dtype=np.float32))
+        meta = dict(self.meta, axes={n: a.tolist() for n, a in zip(AXES, self.axes)})
+        (directory / "surface.json").write_text(json.dumps(meta, indent=2))
+
+    @classmethod
+    def load(cls, directory=SURFACE_DIR, mmap=True):
+        directory = Path(directory)
+        meta = json.loads((directory / "surface.json").read_text())
+        values = np.load(directory / "surface.npy", mmap_mode="r" if mmap else None)
+        return cls(meta.pop("axes"), values, meta)
+
+    # --- lookups ---
+
+    def delta(self, wind, rho, perf):
+        """Interpolated t_neutral − perf; inputs outside the grid are clamped to its edge."""
+        pts = [np.asarray(a, dtype=np.float64) for a in np.broadcast_arrays(wind, rho, perf)]
+        shape = pts[0].shape
+        lower, frac = [], []
+        for axis, p in zip(self.axes, pts):
+            p = np.clip(p.ravel(), axis[0], axis[-1])
+            i = np.clip(np.searchsorted(axis, p, side="right") - 1, 0, len(axis) - 2)
+            lower.append(i)
+            frac.append((p - axis[i]) / (axis[i + 1] - axis[i]))
+
+        out = np.zeros(lower[0].shape)
+        for corner in range(1 << len(AXES)):
+            w = np.ones_like(out)
+            idx = []
+            for d in range(len(AXES)):
+                bit = (corner >> d) & 1
+                w *= frac[d] if bit else 1.0 - frac[d]
+                idx.append(lower[d] + bit)
+            out += w * self.values[tuple(idx)]
+        return out.reshape(shape)
+
+    def neutral_times(self, perf, wind, rho):
+        perf = np.asarray(perf, dtype=np.float64)
+        return perf + self.delta(wind, rho, perf)
+
+    def in_range(self, wind, rho, perf):
+        """True where a point lies inside the grid (no clamping needed)."""
+        ok = np.ones(np.broadcast(wind, rho, perf).shape, dtype=bool)
+        for axis, p in zip(self.axes, (wind, rho, perf)):
+            p = np.asarray(p)
+            ok &= (p >= axis[0]) & (p <= axis[-1])
+        return ok
+
+
+def build_surface(axes=None, template=DEFAULT_ATHLETE, reaction_time=REACTION_TIME,
+                  n_validate=2000, seed=0):
+    """Evaluate the model on the grid and measure interpolation error at random off-grid points."""
+    axes = {n: np.asarray((axes or DEFAULT_AXES)[n], dtype=np.float64) for n in AXES}
+    grid = np.meshgrid(*(axes[n] for n in AXES), indexing="ij")
+    values = model_delta(*grid, template=template, reaction_time=reaction_time)
+
+    surface = CorrectionSurface(axes, values.astype(np.float32), {
+        "template": template.to_dict(),
+        "reaction_time": reaction_time,
+        "rho_ref": DEFAULT_PARAMS.rho_ref,
+    })
+
+    rng = np.random.default_rng(seed)
+    pts = [rng.uniform(axes[n][0], axes[n][-1], n_validate) for n in AXES]
+    exact = model_delta(*pts, template=template, reaction_time=reaction_time)
+    err = np.abs(surface.delta(*pts) - exact)
+    surface.meta["max_abs_error_s"] = float(np.nanmax(err))
+    surface.meta["p99_abs_error_s"] = float(np.nanpercentile(err, 99))
+    return surface
+
+
+def main(directory=SURFACE_DIR):
+    t0 = time.perf_counter()
+    surface = build_surface()
+    print(f"🧮 Built {surface.values.shape} surface in {time.perf_counter() - t0:.1f} s "
+          f"(max interpolation error {surface.meta['max_abs_error_s'] * 1000:.2f} ms)")
+    surface.save(directory)
+
+    surface = CorrectionSurface.load(directory)
+    n = 1_000_000
+    rng = np.random.default_rng(1)
+    t0 = time.perf_counter()
+    surface.neutral_times(rng.normal(10.1, 0.2, n), rng.uniform(-2, 2, n), rng.normal(1.17, 0.03, n))
+    print(f"⚡ {n / (time.perf_counter() - t0):,.0f} lookups/s")
+    print(f"✅ Saved → {Path(directory).resolve()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+# src/features/elevation_raster.py
+"""
+Offline elevation from DEM tiles: (lat, lon) arrays → metres.
+
+SRTM-style 1°×1° tiles (.hgt: big-endian int16 and square, rows north to
+south, void = -32768) are imported once into
+
+    data/processed/dem/
+        tiles.npy    (n_tiles, S, S) int16, opened with mmap_mode="r"
+        index.npy    (180, 360) int32: tile row per 1° cell, -1 where none
+
+Tiles are resampled to the store's size S on import (3601 → 1201 by taking
+every third sample). Lookups need no network.
+- The tile is found by array indexing on floor(lat), floor(lon).
+- The four surrounding posts are gathered from the memory map.
+- They are blended bilinearly. Void posts are left out and the remaining
+  weights renormalized.
+Points are deduplicated first. A million result rows at a few hundred
+venues cost a few hundred samples.
+
+    python src/features/elevation_raster.py import N52E013.hgt N46E006.hgt ...
+    python src/features/elevation_raster.py sample 52.5145 13.2395
+"""
+
+import argparse
+import re
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from npy_store import append_rows
+
+DEM_DIR = Path("data/processed/dem")
+TILE_SIZE = 1201  # posts per side (3 arc-seconds, ~90 m)
+VOID = -32768
+HGT_NAME = re.compile(r"([NS])(\d{2})([EW])(\d{3})", re.I)
+
+
+def hgt_origin(name):
+    """(lat, lon) of a tile's south-west corner from an SRTM name like 'N52E013.hgt'."""
+    m = HGT_NAME.search(Path(name).name)
+    if not m:
+        raise ValueError(f"not an SRTM tile name: {name!r}")
+    lat = int(m.group(2)) * (1 if m.group(1).upper() == "N" else -1)
+    lon = int(m.group(4)) * (1 if m.group(3).upper() == "E" else -1)
+    return lat, lon
+
+
+def read_hgt(path):
+    """Raw .hgt file → square int16 array (north row first)."""
+    data = np.fromfile(path, dtype=">i2")
+    side = int(round(np.sqrt(data.size)))
+    if side * side != data.size:
+        raise ValueError(f"{path}: {data.size} samples is not a square tile")
+    return data.reshape(side, side).astype(np.int16)
+
+
+def resample(tile, size=TILE_SIZE):
+    """Fit a tile to size × size posts by striding (finer tiles only)."""
+    side = tile.shape[0]
+    if side == size:
+        return tile
+    step = (side - 1) / (size - 1)
+    if step != int(step) or step < 1:
+        raise ValueError(f"can't resample a {side}-post tile to {size} posts")
+    return tile[::int(step), ::int(step)]
+
+
+class ElevationRaster:
+    def __init__(self, path=DEM_DIR):
+        self.path = Path(path)
+        self.index = np.load(self.path / "index.npy")
+        self.tiles = np.load(self.path / "tiles.npy", mmap_mode="r")
+        self.size = self.tiles.shape[1]
+
+    @staticmethod
+    def exists(path=DEM_DIR):
+        return (Path(path) / "index.npy").exists()
+
+    def __len__(self):
+        return self.tiles.shape[0]
+
+    def _sample_points(self, lat, lon):
+        """Bilinear elevation for distinct points (NaN outside the imported tiles or over voids)."""
+        ok = np.isfinite(lat) & np.isfinite(lon) & (lat >= -90) & (lat < 90) & (lon >= -180) & (lon < 180)
+        lat0, lon0 = np.floor(np.where(ok, lat, 0)), np.floor(np.where(ok, lon, 0))
+        tile = self.index[(lat0 + 90).astype(np.int64), (lon0 + 180).astype(np.int64)]
+        ok &= tile >= 0
+
+        n = self.size - 1
+        row = (lat0 + 1 - lat) * n  # row 0 is the northern edge
+        col = (lon - lon0) * n
+        i = np.clip(np.floor(row), 0, n - 1).astype(np.int64)
+        j = np.clip(np.floor(col), 0, n - 1).astype(np.int64)
+        fy, fx = row - i, col - j
+
+        t, i, j, fy, fx = tile[ok], i[ok], j[ok], fy[ok], fx[ok]
+        posts = np.stack([self.tiles[t, i, j], self.tiles[t, i, j + 1],
+                          self.tiles[t, i + 1, j], self.tiles[t, i + 1, j + 1]]).astype(np.float64)
+        w = np.stack([(1 - fy) * (1 - fx), (1 - fy) * fx, fy * (1 - fx), fy * fx])
+        w = np.where(posts == VOID, 0.0, w)
+        total = w.sum(axis=0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            value = np.where(total > 0, (w * posts).sum(axis=0) / total, np.nan)
+
+        out = np.full(len(lat), np.nan)
+        out[ok] = value
+        return out
+
+    def sample(self, lat, lon):
+        """Elevation (m) for arrays of lat / lon; NaN where the raster has no data."""
+        lat, lon = np.asarray(lat, dtype=np.float64), np.asarray(lon, dtype=np.float64)
+        codes, uniq = pd.factorize(lat + 1j * lon)  # complex keys: exact (lat, lon) pairs, fast to hash
+        value = self._sample_points(uniq.real, uniq.imag)
+        return np.where(codes >= 0, value[np.maximum(codes, 0)] if len(value) else np.nan, np.nan)
+
+    def coverage(self):
+        lat, lon = np.nonzero(self.index >= 0)
+        return pd.DataFrame({"lat": lat - 90, "lon": lon - 180, "tile": self.index[lat, lon]})
+
+
+def open_raster(path=None):
+    """The raster at path (default DEM_DIR), or None if no tiles have been imported."""
+    path = DEM_DIR if path is None else path
+    return ElevationRaster(path) if ElevationRaster.exists(path) else None
+
+
+def fill_altitude(df, raster=None, lat_col="lat", lon_col="lon", col="altitude_m"):
+    """Fill missing df[col] from the raster in place; returns the number of rows filled."""
+    raster = raster if raster is not None else open_raster()
+    if raster is None:
+        return 0
+    if col not in df.columns:
+        df[col] = np.nan
+    missing = df[col].isna().to_numpy()
+    if not missing.any():
+        return 0
+    elev = raster.sample(df.loc[missing, lat_col].to_numpy(dtype=np.float64, na_value=np.nan),
+                         df.loc[missing, lon_col].to_numpy(dtype=np.float64, na_value=np.nan))
+    df.loc[missing, col] = elev
+    return int(np.isfinite(elev).sum())
+
+
+# ---------- import ----------
+
+def import_tiles(tiles, path=DEM_DIR, size=None):
+    """Add or replace tiles given as {(lat0, lon0): 2-D int16 array}. Returns the tile count.
+
+    The stored stack is never loaded: replaced tiles are written through a
+    writable memory map and new ones appended to tiles.npy (npy_store).
+    index.npy is saved last, so tiles left by an interrupted import are
+    overwritten by the next one.
+    """
+    path = Path(path)
+    if ElevationRaster.exists(path):
+        index = np.load(path / "index.npy")
+        stack = np.load(path / "tiles.npy", mmap_mode="r+")
+        size = stack.shape[1]
+    else:
+        size = size or TILE_SIZE
+        index = np.full((180, 360), -1, dtype=np.int32)
+        stack = None
+    stored = int(index.max()) + 1
+
+    new = []
+    for (lat0, lon0), tile in tiles.items():
+        tile = resample(np.asarray(tile, dtype=np.int16), size)
+        r, c = int(lat0) + 90, int(lon0) + 180
+        if index[r, c] >= 0:
+            stack[index[r, c]] = tile
+        else:
+            index[r, c] = stored + len(new)
+            new.append(tile)
+    if stack is not None:
+        stack.flush()
+        del stack
+
+    path.mkdir(parents=True, exist_ok=True)
+    if new:
+        append_rows(path / "tiles.npy", np.stack(new), at=stored)
+    np.save(path / "index.npy", index)
+    return stored + len(new)
+
+
+def import_hgt(paths, path=DEM_DIR):
+    return import_tiles({hgt_origin(p): read_hgt(p) for p in paths}, path)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Import or query the offline elevation raster.")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    imp = sub.add_parser("import", help="import SRTM .hgt tiles")
+    imp.add_argument("files", nargs="+")
+    smp = sub.add_parser("sample", help="elevation at one point")
+    smp.add_argument("lat", type=float)
+    smp.add_argument("lon", type=float)
+    sub.add_parser("info", help="list imported tiles")
+    args = ap.parse_args(argv)
+
+    if args.cmd == "import":
+        n = import_hgt(args.files)
+        print(f"🗻 {n} tiles in {DEM_DIR.resolve()}")
+        return
+    raster = open_raster()
+    if raster is None:
+        print("📭 No elevation tiles yet; run the import command first.")
+        return
+    if args.cmd == "sample":
+        print(f"{raster.sample([args.lat], [args.lon])[0]:.1f} m")
+    else:
+        print(f"🗺️  {len(raster)} tiles of {raster.size}×{raster.size} posts")
+        print(raster.coverage().to_string(index=False))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
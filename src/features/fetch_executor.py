@@ -0,0 +1,211 @@
+# src/features/fetch_executor.py
+"""
+Concurrent, rate-limited HTTP fetching for the enrichment stages.
+
+A thread pool over one pooled requests.Session that
+- enforces a token-bucket rate limit shared by all workers,
+- caps concurrency at max_workers,
+- retries 429 / 5xx / connection errors with exponential backoff (tenacity),
+- deduplicates identical in-flight requests,
+- reads and writes through an optional ResponseCache.
+
+Base URLs are always passed in, so the executor can be pointed at a local
+stub server.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+from tenacity import Retrying, retry_if_exception_type, stop_after_attempt, wait_exponential
+
+from api_cache import open_cache
+
+RETRY_STATUS = {429, 500, 502, 503, 504}
+LATENCY_BUCKETS_MS = (10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)  # upper bounds; last bucket is open
+
+
+class RetryableStatus(Exception):
+    """Raised internally for responses worth retrying (429 / 5xx)."""
+
+    def __init__(self, status_code):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+class TokenBucket:
+    """Blocking token bucket: `rate` tokens per second, at most `burst` stored."""
+
+    def __init__(self, rate, burst=1):
+        self.rate = float(rate)
+        self.capacity = float(max(burst, 1))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        if self.rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+def request_key(url, params):
+    """Default dedup/cache key: URL plus sorted query parameters."""
+    items = []
+    for k in sorted(params or {}):
+        v = params[k]
+        items.append(f"{k}={','.join(map(str, v)) if isinstance(v, (list, tuple)) else v}")
+    return url + "?" + "&".join(items)
+
+
+class FetchExecutor:
+    """Thread-pool JSON fetcher with rate limiting, retries and in-flight dedup."""
+
+    def __init__(self, cache=None, max_workers=8, rate=5.0, burst=None,
+                 max_attempts=5, backoff=0.5, max_backoff=30.0, timeout=15, own_cache=False):
+        self.cache = cache
+        self.own_cache = own_cache  # close() also closes the cache (flushing its pending access times)
+        self.max_workers = max_workers
+        self.bucket = TokenBucket(rate, burst or max_workers)
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers["User-Agent"] = "KineticGen/1.0"
+
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="fetch")
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self.counters = {"requests": 0, "retries": 0, "failures": 0, "deduplicated": 0}
+        self.latency_hist = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.latency_total_ms = 0.0
+
+    # --- single request ---
+
+    def _count(self, name, n=1):
+        with self._lock:
+            self.counters[name] += n
+
+    def _observe(self, ms):
+        i = sum(ms > b for b in LATENCY_BUCKETS_MS)
+        with self._lock:
+            self.latency_hist[i] += 1
+            self.latency_total_ms += ms
+
+    def _attempt(self, url, params, timeout, text):
+        self.bucket.acquire()
+        self._count("requests")
+        t0 = time.perf_counter()
+        try:
+            r = self.session.get(url, params=params, timeout=timeout)
+        finally:
+            self._observe((time.perf_counter() - t0) * 1000)
+        if r.status_code in RETRY_STATUS:
+            raise RetryableStatus(r.status_code)
+        if r.status_code != 200:
+            return None
+        return r.text if text else r.json()
+
+    def _fetch(self, url, params, key, timeout, text=False):
+        if self.cache is not None:
+            cached = self.cache.get(key)
+            if cached is not None or self.cache.offline:
+                return cached
+
+        retrying = Retrying(
+            stop=stop_after_attempt(self.max_attempts),
+            wait=wait_exponential(multiplier=self.backoff, max=self.max_backoff),
+            retry=retry_if_exception_type((RetryableStatus, requests.ConnectionError, requests.Timeout)),
+            before_sleep=lambda _: self._count("retries"),
+            reraise=True,
+        )
+        try:
+            js = retrying(self._attempt, url, params, timeout or self.timeout, text)
+        except (RetryableStatus, requests.RequestException, ValueError):
+            self._count("failures")
+            return None
+
+        if js is not None and self.cache is not None:
+            self.cache.set(key, js)
+        return js
+
+    # --- public API ---
+
+    def submit(self, url, params=None, key=None, timeout=None, text=False):
+        """Schedule a GET; identical in-flight requests share one Future.
+
+        The result is parsed JSON, or the response body as str with text=True.
+        """
+        key = key or request_key(url, params) + ("#text" if text else "")
+        with self._lock:
+            fut = self._inflight.get(key)
+            if fut is not None:
+                self.counters["deduplicated"] += 1
+                return fut
+            fut = self._pool.submit(self._fetch, url, params, key, timeout, text)
+            self._inflight[key] = fut
+        fut.add_done_callback(lambda _f, k=key: self._forget(k))
+        return fut
+
+    def _forget(self, key):
+        with self._lock:
+            self._inflight.pop(key, None)
+
+    def get_json(self, url, params=None, key=None, timeout=None):
+        """Blocking GET returning parsed JSON, or None on failure / offline miss."""
+        return self.submit(url, params, key, timeout).result()
+
+    def get_text(self, url, params=None, key=None, timeout=None):
+        """Blocking GET returning the response body as str, or None on failure."""
+        return self.submit(url, params, key, timeout, text=True).result()
+
+    def map(self, jobs, text=False):
+        """Run (url, params, key) jobs concurrently; results come back in job order."""
+        futures = [self.submit(url, params, key, text=text) for url, params, key in jobs]
+        return [f.result() for f in futures]
+
+    def latency(self):
+        """Histogram of per-attempt HTTP latency: counts per LATENCY_BUCKETS_MS upper bound (+ overflow)."""
+        with self._lock:
+            return {"buckets_ms": list(LATENCY_BUCKETS_MS), "counts": list(self.latency_hist),
+                    "total_ms": round(self.latency_total_ms, 3)}
+
+    def stats(self):
+        out = dict(self.counters)
+        if self.cache is not None:
+            out["cache"] = self.cache.stats()
+        return out
+
+    def close(self):
+        self._pool.shutdown(wait=True)
+        self.session.close()
+        if self.own_cache and self.cache is not None:
+            self.cache.close()
+            self.cache = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def open_fetcher(max_workers=4, rate=2.0, **kwargs):
+    """FetchExecutor over the shared on-disk response cache (see api_cache.open_cache)."""
+    return FetchExecutor(cache=open_cache(), max_workers=max_workers, rate=rate, own_cache=True, **kwargs)
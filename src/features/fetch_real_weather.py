@@ -1,100 +1,66 @@
 # src/features/fetch_real_weather.py
 """
-Fetch REAL daily weather (T, P, RH) from Open-Meteo ERA5,
-compute true air density (kg/m³), and save.
+Fetch REAL weather (T, P, RH), compute true air density (kg/m³), and save.
+Weather comes from the local hourly archive (weather_archive.py) when it
+covers a row, otherwise from Open-Meteo ERA5 daily means.
 """
 
 import pandas as pd
-import requests
 from pathlib import Path
-import math
-import time
 
-ERA5 = "https://archive-api.open-meteo.com/v1/era5"
-ELEV = "https://api.open-meteo.com/v1/elevation"
+from atmosphere import frame_air_density
+from bulk_weather import to_iso_dates
+from elevation_raster import fill_altitude
+from fetch_executor import open_fetcher
+from gazetteer import fetch_elevations
+from weather_archive import attach_weather
 
-def to_iso_date(s):
-    try:
-        return pd.to_datetime(s, dayfirst=True).date().isoformat()
-    except Exception:
-        return None
+INPUT_PATH = Path("data/processed/results_altitude_density.parquet")
+OUTPUT_PATH = Path("data/processed/results_weather_real.parquet")
+DAILY_VARS = {
+    "temperature_2m_mean": "temp_c",
+    "surface_pressure_mean": "pressure_hpa",  # the API already reports hPa
+    "relative_humidity_2m_mean": "rh_pct",
+}
 
-def get_weather(lat, lon, iso_date):
-    params = {
-        "latitude": lat,
-        "longitude": lon,
-        "start_date": iso_date,
-        "end_date": iso_date,
-        "daily": [
-            "temperature_2m_mean",
-            "surface_pressure_mean",
-            "relative_humidity_2m_mean",
-        ],
-        "timezone": "UTC",
-    }
-    r = requests.get(ERA5, params=params, timeout=15)
-    if r.status_code != 200:
-        return None
-    js = r.json().get("daily", {})
-    if not js:
-        return None
-    t_c = js["temperature_2m_mean"][0]
-    # The API already gives pressure in hPa — multiply by 100 to convert to Pa
-    p_pa = js["surface_pressure_mean"][0] * 100.0
-    rh = js["relative_humidity_2m_mean"][0]
-    return {"temp_c": t_c, "pressure_pa": p_pa, "rh_pct": rh}
+def fetch_real_weather(df, fetch=None):
+    """Replace placeholder weather with archive / ERA5 weather and recompute rho_air_abs."""
+    own_fetch = fetch is None
+    fetch = fetch or open_fetcher()
 
-def air_density(temp_c, pressure_pa, rh_pct):
-    """Compute absolute air density (kg/m³)."""
-    T = temp_c + 273.15
-    P = pressure_pa
-    es = 6.1078 * 10 ** ((7.5 * temp_c) / (237.3 + temp_c)) * 100.0  # Pa
-    e = (rh_pct / 100.0) * es
-    pdry = P - e
-    Rd, Rv = 287.05, 461.495
-    return (pdry / (Rd * T)) + (e / (Rv * T))
+    df = df.drop(columns=[c for c in ["temp_c", "pressure_hpa", "rh_pct", "rho_air_abs"] if c in df.columns])
+    df["iso_date"] = to_iso_dates(df["date"])
+    df = df[df["iso_date"].notna()]
 
-def get_altitude(lat, lon):
-    r = requests.get(ELEV, params={"latitude": lat, "longitude": lon}, timeout=10)
-    if r.status_code != 200:
-        return None
-    js = r.json()
-    return js.get("elevation", [None])[0]
+    # archive join in memory; one ERA5 request batch per venue for the rest
+    df = attach_weather(df, fetch, DAILY_VARS)
+    has_wx = df[list(DAILY_VARS.values())].notna().all(axis=1)
+    for _, row in df[~has_wx].iterrows():
+        print(f"⚠️  No weather for {row['venue']} on {row['iso_date']}")
+    out = df[has_wx].drop(columns="iso_date").reset_index(drop=True)
 
-print("🔍 Loading altitude file...")
-df = pd.read_parquet("data/processed/results_altitude_density.parquet")
+    # fill missing altitudes from the offline DEM, then batched elevation requests for the rest
+    if "altitude_m" not in out.columns:
+        out["altitude_m"] = float("nan")
+    fill_altitude(out)
+    need = out.loc[out["altitude_m"].isna(), ["lat", "lon"]].dropna()
+    if len(need):
+        coords = list(need.itertuples(index=False, name=None))
+        elev = fetch_elevations(coords, fetch)
+        out.loc[need.index, "altitude_m"] = pd.array([elev[c] for c in coords], dtype="Float64")
 
-records = []
-for i, row in df.iterrows():
-    lat, lon = float(row["lat"]), float(row["lon"])
-    iso = to_iso_date(row["date"])
-    if not iso:
-        continue
+    out["rho_air_abs"] = frame_air_density(out)  # whole frame in one call
+    print(f"🌐 Fetch: {fetch.stats()}")
+    if own_fetch:
+        fetch.close()
+    return out
 
-    wx = get_weather(lat, lon, iso)
-    if not wx:
-        print(f"⚠️  No weather for {row['venue']} on {iso}")
-        continue
-
-    rho = air_density(wx["temp_c"], wx["pressure_pa"], wx["rh_pct"])
-    alt = row.get("altitude_m")
-    if pd.isna(alt):
-        alt = get_altitude(lat, lon)
-
-    out = row.to_dict()
-    out["temp_c"] = wx["temp_c"]
-    out["pressure_hpa"] = wx["pressure_pa"] / 100.0  # store readable hPa
-    out["rh_pct"] = wx["rh_pct"]
-    out["rho_air_abs"] = rho
-    out["altitude_m"] = alt
-    records.append(out)
-
-    if (i % 3) == 0:
-        print(f"✅ {i+1}/{len(df)} | {row['venue']} | rho={rho:.3f}")
-    time.sleep(0.4)
-
-out = pd.DataFrame(records)
-out_path = Path("data/processed/results_weather_real.parquet")
-out.to_parquet(out_path, index=False)
-print(f"✅ Saved → {out_path.resolve()} (rows={len(out)})")
+def main(input_path=INPUT_PATH, output_path=OUTPUT_PATH):
+    print("🔍 Loading altitude file...")
+    df = pd.read_parquet(input_path)
+    out = fetch_real_weather(df)
+    out.to_parquet(output_path, index=False)
+    print(f"✅ Saved → {Path(output_path).resolve()} (rows={len(out)})")
 
+if __name__ == "__main__":
+    main()
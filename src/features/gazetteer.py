@@ -0,0 +1,335 @@
+# src/features/gazetteer.py
+"""
+Offline venue gazetteer: venue string → lat / lon / elevation / country.
+
+Entries live in one small Parquet file keyed by a normalized venue string
+(lower case, accents and punctuation stripped). Lookups try, in order:
+1. the exact normalized key,
+2. a fuzzy match on character trigrams (Jaccard similarity over an
+   inverted index, restricted to the same country when it's known),
+3. the venue's city within the same country.
+
+resolve() works on unique venues only and returns a frame to merge onto the
+results. Missing elevations come from the offline DEM (elevation_raster.py)
+when its tiles cover the venue. In learn-on-miss mode, venues that can't be
+matched are geocoded (city query, concurrently through a FetchExecutor).
+Elevations the DEM can't supply are fetched up to ELEVATION_BATCH locations
+per request (fetch_elevations), and every answer is written back. Each venue
+costs at most one geocoder request and a share of one elevation request, ever.
+
+    python src/features/gazetteer.py "Olympiastadion, Berlin (GER)" "Stade de France, Paris (FRA)"
+"""
+
+import re
+import sys
+import unicodedata
+from collections import defaultdict
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from api_cache import elevation_key, geocode_key
+from elevation_raster import open_raster
+
+GAZETTEER_PATH = Path("data/processed/venues.parquet")
+GEOCODE_URL = "https://geocoding-api.open-meteo.com/v1/search"
+ELEVATION_URL = "https://api.open-meteo.com/v1/elevation"
+ELEVATION_BATCH = 100  # coordinates per elevation request (the API's limit)
+FUZZY_THRESHOLD = 0.6
+COLUMNS = ["key", "venue", "city", "country", "lat", "lon", "elevation_m", "source"]
+
+# hand-checked coordinates (elevations from the Open-Meteo DEM)
+SEED = {
+    "Olympiastadion, Berlin (GER)": (52.5145, 13.2395, 94.0),
+    "Shanghai (CHN)": (31.2304, 121.4737, 5.0),
+    "Stade Olympique de la Pontaise, Lausanne (SUI)": (46.5197, 6.6336, 506.0),
+    "Suhaim bin Hamad Stadium, Doha (QAT)": (25.2854, 51.5310, 2.0),
+}
+
+STADIUM_WORDS = r"\b(Stadium|Stade|Arena|Field|Centre|Center|International|Olympic|Olympiastadion)\b"
+
+
+# ---------- strings ----------
+
+def normalize(venue):
+    """Lookup key: accents folded, lower case, punctuation to spaces, single spaces."""
+    if not isinstance(venue, str):
+        return ""
+    s = unicodedata.normalize("NFKD", venue).encode("ascii", "ignore").decode()
+    s = re.sub(r"[^a-z0-9]+", " ", s.lower())
+    return s.strip()
+
+
+def country_of(venue):
+    """IOC country code from a trailing '(XXX)', or None."""
+    m = re.search(r"\(([A-Z]{3})\)\s*$", venue or "")
+    return m.group(1) if m else None
+
+
+def clean_place(venue):
+    """Extract a city-like query from venue strings such as:
+       'Stade ... , Lausanne (SUI)' -> 'Lausanne'
+       'Olympiastadion, Berlin (GER)' -> 'Berlin'
+       'Hayward Field, Eugene, OR (USA)' -> 'Eugene'
+    """
+    if not isinstance(venue, str) or not venue.strip():
+        return None
+
+    # drop country code part in parentheses
+    base = venue.split("(")[0].strip()
+    # last comma piece is usually the city; skip US-style state codes ('OR', 'TX')
+    parts = [p.strip() for p in base.split(",") if p.strip()]
+    parts = [p for p in parts if not re.fullmatch(r"[A-Z]{2}", p)] or parts
+    city = parts[-1] if parts else base
+
+    # remove common stadium words
+    city = re.sub(STADIUM_WORDS, "", city, flags=re.I).strip()
+
+    return city if city else None
+
+
+def trigrams(key):
+    s = f"  {key} "
+    return {s[i:i + 3] for i in range(len(s) - 2)}
+
+
+# ---------- HTTP requests (answers are learned, so these run once per venue) ----------
+
+def geocode_request(query):
+    return GEOCODE_URL, {"name": query, "count": 1}, geocode_key(query)
+
+
+def parse_geocode(js):
+    if js and "results" in js and js["results"]:
+        res = js["results"][0]
+        return res["latitude"], res["longitude"]
+    return None, None
+
+
+def parse_elevation(js):
+    if not js:
+        return None
+    return js.get("elevation", [None])[0]
+
+
+def fetch_elevations(coords, fetch):
+    """{(lat, lon): metres or None} for (lat, lon) pairs, ELEVATION_BATCH locations per request.
+
+    The elevation API takes comma-separated coordinate lists. Locations
+    already in the response cache are served from it, and every fetched
+    location is cached under its own elevation_key, so later runs hit the
+    cache whatever batches they form.
+    """
+    coords = list(dict.fromkeys(coords))
+    cache = fetch.cache
+    out, todo = {}, []
+    for lat, lon in coords:
+        js = cache.get(elevation_key(lat, lon)) if cache is not None else None
+        if js is not None:
+            out[(lat, lon)] = parse_elevation(js)
+        else:
+            todo.append((lat, lon))
+    if cache is not None and cache.offline:
+        return out | {c: None for c in todo}
+
+    batches = [todo[i:i + ELEVATION_BATCH] for i in range(0, len(todo), ELEVATION_BATCH)]
+    jobs = [(ELEVATION_URL, {"latitude": ",".join(str(lat) for lat, _ in b),
+                             "longitude": ",".join(str(lon) for _, lon in b)}, None) for b in batches]
+    for batch, js in zip(batches, fetch.map(jobs)):
+        elevs = (js or {}).get("elevation") or [None] * len(batch)
+        for (lat, lon), elev in zip(batch, elevs):
+            out[(lat, lon)] = elev
+            if elev is not None and cache is not None:
+                cache.set(elevation_key(lat, lon), {"elevation": [elev]})
+    return out
+
+
+# ---------- index ----------
+
+class Gazetteer:
+    def __init__(self, path=GAZETTEER_PATH, seed=True):
+        self.path = Path(path)
+        if self.path.exists():
+            entries = pd.read_parquet(self.path)
+        else:
+            entries = pd.DataFrame(columns=COLUMNS)
+        if seed:
+            entries = pd.concat([self._seed_frame(), entries], ignore_index=True)
+        self.entries = entries.drop_duplicates("key", keep="last").reset_index(drop=True)
+        self._dirty = False
+        self._pending = []
+        self._build()
+
+    @staticmethod
+    def _seed_frame():
+        rows = [_entry(v, lat, lon, elev, "seed") for v, (lat, lon, elev) in SEED.items()]
+        return pd.DataFrame(rows, columns=COLUMNS)
+
+    def _build(self):
+        e = self.entries
+        self._by_key = dict(zip(e["key"], range(len(e))))
+        self._by_city = {}
+        for i, (city, country) in enumerate(zip(e["city"], e["country"])):
+            self._by_city.setdefault((normalize(city), country), i)
+        self._grams = [trigrams(k) for k in e["key"]]
+        self._postings = defaultdict(list)
+        for i, grams in enumerate(self._grams):
+            for g in grams:
+                self._postings[g].append(i)
+
+    def _flush(self):
+        """Fold entries added since the last lookup into the table and rebuild the index once."""
+        if not self._pending:
+            return
+        new = pd.DataFrame(self._pending, columns=COLUMNS)
+        self.entries = (pd.concat([self.entries, new], ignore_index=True)
+                        .drop_duplicates("key", keep="last").reset_index(drop=True))
+        self._pending = []
+        self._build()
+
+    def __len__(self):
+        self._flush()
+        return len(self.entries)
+
+    # --- lookups ---
+
+    def fuzzy(self, venue, threshold=FUZZY_THRESHOLD):
+        """(row, score) of the most similar entry by trigram Jaccard, or (None, 0)."""
+        grams = trigrams(normalize(venue))
+        country = country_of(venue)
+        hits = defaultdict(int)
+        for g in grams:
+            for i in self._postings.get(g, ()):
+                hits[i] += 1
+        best, best_score = None, 0.0
+        countries = self.entries["country"]
+        for i, shared in hits.items():
+            if country and isinstance(countries.iat[i], str) and countries.iat[i] != country:
+                continue
+            score = shared / (len(grams) + len(self._grams[i]) - shared)
+            if score > best_score:
+                best, best_score = i, score
+        return (best, best_score) if best_score >= threshold else (None, 0.0)
+
+    def lookup(self, venue):
+        """(row, how, score) for one venue; row is None on a miss."""
+        self._flush()
+        i = self._by_key.get(normalize(venue))
+        if i is not None:
+            return i, "exact", 1.0
+        i, score = self.fuzzy(venue)
+        if i is not None:
+            return i, "fuzzy", score
+        i = self._by_city.get((normalize(clean_place(venue)), country_of(venue)))
+        if i is not None:
+            return i, "city", 1.0
+        return None, None, 0.0
+
+    def match(self, venues):
+        """One row per distinct venue with its coordinates and how it was matched."""
+        venues = pd.unique(pd.Series(venues, dtype="object").dropna())
+        self._flush()
+        rows = []
+        for v in venues:
+            i, how, score = self.lookup(v)
+            if i is None:
+                rows.append({"venue": v, "lat": np.nan, "lon": np.nan, "altitude_m": np.nan,
+                             "match": None, "score": 0.0})
+            else:
+                e = self.entries.iloc[i]
+                rows.append({"venue": v, "lat": e["lat"], "lon": e["lon"], "altitude_m": e["elevation_m"],
+                             "match": how, "score": score})
+        return pd.DataFrame(rows, columns=["venue", "lat", "lon", "altitude_m", "match", "score"])
+
+    # --- learning ---
+
+    def add(self, venue, lat, lon, elevation_m=None, source="geocoder"):
+        self._pending.append(_entry(venue, lat, lon, elevation_m, source))
+        self._dirty = True
+
+    def save(self):
+        if not self._dirty:
+            return
+        self._flush()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        learned = self.entries[self.entries["source"] != "seed"]
+        learned.astype({"lat": float, "lon": float, "elevation_m": float}).to_parquet(self.path, index=False)
+        self._dirty = False
+
+    def resolve(self, venues, fetch=None, learn=True):
+        """match() plus missing elevations from the offline DEM and, with learn and a fetcher,
+        geocoding of misses and network elevation backfill for what the DEM doesn't cover."""
+        online = fetch is not None and learn
+        found = self.match(venues)
+        if online:
+            miss = found[found["match"].isna()]
+            queries = [clean_place(v) for v in miss["venue"]]
+            jobs = [(v, q) for v, q in zip(miss["venue"], queries) if q]
+            if jobs:
+                print(f"📍 geocoding {len(jobs)} new venues")
+            for (venue, query), js in zip(jobs, fetch.map([geocode_request(q) for _, q in jobs])):
+                lat, lon = parse_geocode(js)
+                if lat is None:
+                    print(f"   ⚠️  Could not geocode '{query}' ({venue})")
+                    continue
+                self.add(venue, lat, lon)
+            found = self.match(venues)
+
+        found = self._dem_elevations(found, learn)
+        if online:
+            no_elev = found[found["match"].notna() & found["altitude_m"].isna()]
+            by_coord = fetch_elevations(no_elev[["lat", "lon"]].itertuples(index=False, name=None), fetch)
+            for venue, lat, lon in no_elev[["venue", "lat", "lon"]].itertuples(index=False):
+                elev = by_coord.get((lat, lon))
+                if elev is not None:
+                    self.add(venue, lat, lon, elev, source="geocoder")
+
+        if not learn:
+            return found
+        self.save()
+        return self.match(venues)
+
+    def _dem_elevations(self, found, learn):
+        """Fill matched venues' missing elevations from the local DEM (learned when learn is set)."""
+        raster = open_raster()
+        gap = (found["match"].notna() & found["altitude_m"].isna()).to_numpy()
+        if raster is None or not gap.any():
+            return found
+        found = found.copy()
+        elev = raster.sample(found.loc[gap, "lat"], found.loc[gap, "lon"])
+        found.loc[gap, "altitude_m"] = elev
+        if learn:
+            for venue, lat, lon, e in zip(found.loc[gap, "venue"], found.loc[gap, "lat"], found.loc[gap, "lon"], elev):
+                if np.isfinite(e):
+                    self.add(venue, lat, lon, e, source="dem")
+        return found
+
+
+def _entry(venue, lat, lon, elevation_m, source):
+    return {"key": normalize(venue), "venue": venue, "city": clean_place(venue),
+            "country": country_of(venue), "lat": lat, "lon": lon,
+            "elevation_m": np.nan if elevation_m is None else elevation_m, "source": source}
+
+
+def attach_venues(df, gazetteer=None, fetch=None, learn=True, how="inner"):
+    """Join lat / lon / altitude_m onto df by venue via one lookup per distinct venue."""
+    gazetteer = gazetteer or Gazetteer()
+    found = gazetteer.resolve(df["venue"], fetch=fetch, learn=learn)
+    for v in found.loc[found["match"].isna(), "venue"]:
+        print(f"   ⚠️  Unknown venue '{v}'")
+    drop = [c for c in ["lat", "lon", "altitude_m"] if c in df.columns]
+    cols = found[["venue", "lat", "lon", "altitude_m"]]
+    if how == "inner":
+        cols = cols[found["match"].notna()]
+    return df.drop(columns=drop).merge(cols, on="venue", how=how)
+
+
+def main(venues):
+    gaz = Gazetteer()
+    print(f"📚 {len(gaz)} venues in gazetteer")
+    print(gaz.match(venues).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,249 @@
+# src/features/instrumentation.py
+"""
+Per-stage instrumentation for pipeline runs.
+
+RunRecorder.stage() wraps one stage and records:
+- wall and CPU time (own process plus reaped worker processes),
+- rows in and out, and rows/s,
+- peak RSS and how much the stage raised it,
+- HTTP activity over the stage: requests, retries, failures, dedup hits,
+  cache hits and misses, and a latency histogram with p50 / p95.
+
+Optionally, a chosen stage runs under cProfile (a .prof file plus the top
+functions in the report). tracemalloc can capture peak Python heap and the
+top allocation sites.
+
+Peak RSS comes from the resource module (Unix). On Windows it comes from
+psutil if that is installed, and is reported as unavailable otherwise. CPU
+time falls back to time.process_time() (this process only).
+
+Each run writes <run_id>.json to the report directory. It also appends one
+row per stage to history.parquet, so regressions show up as a trend rather
+than an anecdote.
+"""
+
+import cProfile
+import json
+import os
+import platform
+import pstats
+import sys
+import time
+import tracemalloc
+import uuid
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+import pandas as pd
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+REPORT_DIR = Path("data/processed/.pipeline/runs")
+PROFILE_TOP = 25
+ALLOC_TOP = 10
+
+
+def _max_rss_mb():
+    """Peak resident memory of this process in MB, or None where it can't be read."""
+    if resource is not None:
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return rss / 2**20 if sys.platform == "darwin" else rss / 1024  # bytes on macOS, KiB elsewhere
+    if psutil is not None:
+        info = psutil.Process().memory_info()
+        return getattr(info, "peak_wset", info.rss) / 2**20  # peak working set on Windows
+    return None
+
+
+def _cpu_s():
+    if resource is None:
+        return time.process_time()
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    kids = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return own.ru_utime + own.ru_stime + kids.ru_utime + kids.ru_stime
+
+
+def histogram_quantile(buckets, counts, q):
+    """Approximate quantile (upper bucket bound) of a latency histogram; None when empty."""
+    total = sum(counts)
+    if not total:
+        return None
+    target = q * total
+    seen = 0
+    for bound, n in zip(list(buckets) + [float("inf")], counts):
+        seen += n
+        if seen >= target:
+            return bound
+    return float("inf")
+
+
+def http_snapshot(fetch):
+    """Cumulative HTTP counters of a FetchExecutor (empty when there is none)."""
+    if fetch is None:
+        return {}
+    stats = fetch.stats()
+    snap = {k: stats[k] for k in ("requests", "retries", "failures", "deduplicated")}
+    cache = stats.get("cache") or {}
+    snap["cache_hits"] = cache.get("hits", 0)
+    snap["cache_misses"] = cache.get("misses", 0)
+    lat = fetch.latency()
+    snap["latency_buckets_ms"] = lat["buckets_ms"]
+    snap["latency_counts"] = lat["counts"]
+    snap["latency_total_ms"] = lat["total_ms"]
+    return snap
+
+
+def http_delta(before, after):
+    if not after:
+        return {}
+    before = before or {}
+    out = {k: after[k] - before.get(k, 0)
+           for k in ("requests", "retries", "failures", "deduplicated", "cache_hits", "cache_misses")}
+    counts = [a - b for a, b in zip(after["latency_counts"],
+                                    before.get("latency_counts", [0] * len(after["latency_counts"])))]
+    lookups = out["cache_hits"] + out["cache_misses"]
+    out["cache_hit_rate"] = out["cache_hits"] / lookups if lookups else None
+    out["latency_buckets_ms"] = after["latency_buckets_ms"]
+    out["latency_counts"] = counts
+    n = sum(counts)
+    out["latency_mean_ms"] = (after["latency_total_ms"] - before.get("latency_total_ms", 0.0)) / n if n else None
+    out["latency_p50_ms"] = histogram_quantile(after["latency_buckets_ms"], counts, 0.5)
+    out["latency_p95_ms"] = histogram_quantile(after["latency_buckets_ms"], counts, 0.95)
+    return out
+
+
+@dataclass
+class StageMetrics:
+    stage: str
+    mode: str = "full"          # full | delta | skipped | failed
+    wall_s: float = 0.0
+    cpu_s: float = 0.0
+    rows_in: int = 0
+    rows_out: int = 0
+    rows_per_s: float = None
+    max_rss_mb: float = 0.0     # None where peak RSS can't be read (Windows without psutil)
+    rss_growth_mb: float = 0.0
+    py_peak_mb: float = None    # tracemalloc only
+    http: dict = field(default_factory=dict)
+    profile_path: str = None
+    profile_top: list = field(default_factory=list)
+    top_allocations: list = field(default_factory=list)
+    error: str = None
+
+
+class RunRecorder:
+    """Collects StageMetrics for one run and writes the run report."""
+
+    def __init__(self, fetcher=None, profile=None, trace_memory=False, report_dir=REPORT_DIR):
+        self.fetcher = fetcher or (lambda: None)  # callable returning the live FetchExecutor, if any
+        self.profile = profile
+        self.trace_memory = trace_memory
+        self.report_dir = Path(report_dir)
+        self.run_id = time.strftime("%Y%m%dT%H%M%S") + "-" + uuid.uuid4().hex[:6]
+        self.started = time.time()
+        self.stages = []
+
+    @contextmanager
+    def stage(self, name):
+        m = StageMetrics(name)
+        profiler = cProfile.Profile() if name == self.profile else None
+        tracing = (self.trace_memory or profiler is not None) and not tracemalloc.is_tracing()
+        if tracing:
+            tracemalloc.start()
+        http0 = http_snapshot(self.fetcher())
+        rss0, cpu0, t0 = _max_rss_mb(), _cpu_s(), time.perf_counter()
+        if profiler:
+            profiler.enable()
+        try:
+            yield m
+        except BaseException as exc:
+            m.mode = "failed"
+            m.error = f"{type(exc).__name__}: {exc}"
+            raise
+        finally:
+            if profiler:
+                profiler.disable()
+            m.wall_s = time.perf_counter() - t0
+            m.cpu_s = _cpu_s() - cpu0
+            m.max_rss_mb = _max_rss_mb()
+            m.rss_growth_mb = m.max_rss_mb - rss0 if rss0 is not None else None
+            if m.wall_s > 0 and m.mode != "skipped":
+                m.rows_per_s = m.rows_out / m.wall_s
+            m.http = http_delta(http0, http_snapshot(self.fetcher()))
+            if tracing:
+                m.py_peak_mb = tracemalloc.get_traced_memory()[1] / 2**20
+                stats = tracemalloc.take_snapshot().statistics("lineno")[:ALLOC_TOP]
+                m.top_allocations = [{"where": str(s.traceback), "mb": s.size / 2**20, "count": s.count}
+                                     for s in stats]
+                tracemalloc.stop()
+            if profiler:
+                self._save_profile(m, profiler)
+            self.stages.append(m)
+
+    def _save_profile(self, m, profiler):
+        self.report_dir.mkdir(parents=True, exist_ok=True)
+        path = self.report_dir / f"{self.run_id}.{m.stage}.prof"
+        profiler.dump_stats(path)
+        m.profile_path = str(path)
+        st = pstats.Stats(profiler).sort_stats("cumulative")
+        for func in st.fcn_list[:PROFILE_TOP]:
+            cc, nc, tt, ct, _ = st.stats[func]
+            m.profile_top.append({"func": f"{func[0]}:{func[1]}({func[2]})", "ncalls": nc,
+                                  "tottime_s": tt, "cumtime_s": ct})
+
+    # --- report ---
+
+    def report(self):
+        return {
+            "run_id": self.run_id,
+            "started": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.started)),
+            "wall_s": time.time() - self.started,
+            "argv": sys.argv,
+            "python": platform.python_version(),
+            "host": {"platform": platform.platform(), "cpus": os.cpu_count()},
+            "stages": [asdict(m) for m in self.stages],
+        }
+
+    def history_rows(self):
+        rows = []
+        for m in self.stages:
+            row = {k: v for k, v in asdict(m).items()
+                   if k not in ("http", "profile_top", "top_allocations")}
+            for k, v in m.http.items():
+                if not isinstance(v, list):
+                    row[f"http_{k}"] = v
+            row["run_id"] = self.run_id
+            row["started"] = pd.Timestamp(self.started, unit="s")
+            rows.append(row)
+        return pd.DataFrame(rows)
+
+    def save(self):
+        """Write <run_id>.json and append to history.parquet; returns the JSON path."""
+        self.report_dir.mkdir(parents=True, exist_ok=True)
+        path = self.report_dir / f"{self.run_id}.json"
+        path.write_text(json.dumps(self.report(), indent=2, default=str))
+
+        history = self.report_dir / "history.parquet"
+        rows = self.history_rows()
+        if history.exists():
+            rows = pd.concat([pd.read_parquet(history), rows], ignore_index=True)
+        rows.to_parquet(history, index=False)
+        return path
+
+    def summary(self):
+        lines = [f"{'stage':14s} {'mode':8s} {'wall s':>8s} {'cpu s':>8s} {'rows':>9s} {'rows/s':>10s} "
+                 f"{'rss MB':>8s} {'http':>6s} {'p95 ms':>7s}"]
+        for m in self.stages:
+            rate = f"{m.rows_per_s:,.0f}" if m.rows_per_s else "-"
+            p95 = m.http.get("latency_p95_ms")
+            rss = f"{m.max_rss_mb:.0f}" if m.max_rss_mb is not None else "-"
+            lines.append(f"{m.stage:14s} {m.mode:8s} {m.wall_s:8.2f} {m.cpu_s:8.2f} {m.rows_out:9,d} {rate:>10s} "
+                         f"{rss:>8s} {m.http.get('requests', 0):6d} {p95 if p95 is not None else '-':>7}")
+        return "\n".join(lines)
@@ -0,0 +1,57 @@
+# src/features/model_summary.py
+"""
+Regression summary of delta ~ wind + rho_air_abs + altitude_m as Parquet.
+
+model_summary.parquet holds one row per coefficient: estimate, standard
+error, p value and R². The statistics come from the streaming OLS
+accumulator (streaming_ols.py), so statsmodels isn't imported.
+model_inference.parquet adds bootstrap and permutation inference
+(regression_inference.py).
+
+    python src/features/model_summary.py
+"""
+
+import os
+from pathlib import Path
+
+from regression_inference import CLUSTER, N_RESAMPLES, REGRESSORS, TARGET, infer
+from results_dataset import DEFAULT_PATH, load_results
+from streaming_ols import OLSAccumulator
+
+SUMMARY_PATH = Path("data/processed/model_summary.parquet")
+INFERENCE_PATH = Path("data/processed/model_inference.parquet")
+
+
+def model_summary(df, regressors=REGRESSORS, target=TARGET):
+    """Coefficient table (Variable, Coefficient, P_value, Std_Error, R_squared)."""
+    fit = OLSAccumulator(regressors, target).update(df).fit()
+    out = fit[["Variable", "Coefficient", "P_value", "Std_Error"]].copy()
+    out["R_squared"] = fit.attrs["r_squared"]
+    return out
+
+
+def export_model_summary(path=DEFAULT_PATH, summary_path=SUMMARY_PATH, inference_path=INFERENCE_PATH,
+                         n_resamples=N_RESAMPLES, seed=0, workers=None):
+    """Write the summary and (unless n_resamples is 0) the inference table; returns both (inference may be None)."""
+    df = load_results(REGRESSORS + [TARGET, CLUSTER], path=path, dropna=REGRESSORS + [TARGET])
+    summary = model_summary(df)
+    Path(summary_path).parent.mkdir(parents=True, exist_ok=True)
+    summary.to_parquet(summary_path, index=False)
+
+    inference = None
+    if n_resamples:
+        inference = infer(df, n_resamples=n_resamples, seed=seed, workers=workers or os.cpu_count() or 1)
+        inference.to_parquet(inference_path, index=False)
+    return summary, inference
+
+
+def main(path=DEFAULT_PATH, summary_path=SUMMARY_PATH, inference_path=INFERENCE_PATH):
+    summary, inference = export_model_summary(path, summary_path, inference_path)
+    print(f"✅ Exported model summary → {summary_path}")
+    print(summary)
+    print(f"✅ Exported resampling inference → {inference_path}")
+    print(inference[["Variable", "Coefficient", "CI_low", "CI_high", "Cluster_SE", "Perm_p"]])
+
+
+if __name__ == "__main__":
+    main()
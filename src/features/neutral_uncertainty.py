@@ -0,0 +1,229 @@
+# src/features/neutral_uncertainty.py
+"""
+Monte Carlo uncertainty of neutral times.
+
+t_neutral is computed from uncertain inputs:
+- wind: the gauge reads in 0.1 m/s steps (uniform rounding error) and has
+  some error of its own;
+- weather: a daily ERA5 value, not conditions at race time (the spread is
+  scaled down where weather_source is 'hourly');
+- altitude: from a coarse elevation grid or a geocoded point.
+
+Each input is drawn DRAWS times per result. The draws go through
+correction_engine.neutral_times as (rows, draws) arrays: one broadcast
+computation per chunk of rows. Chunks hold at most MAX_CELLS values, so
+memory stays bounded. Each chunk has its own child seed (SeedSequence.spawn),
+so results are identical with or without the process pool.
+
+Errors that two results share are drawn once per group: weather per meet
+(venue and date) and altitude per venue. Wind is drawn per result. This
+matters for beat_matrix(): two runners in the same race share the same
+weather error, so it can't decide which of them was faster.
+
+    python src/features/neutral_uncertainty.py [--draws 2000] [--workers 4] [--top 20]
+"""
+
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from atmosphere import air_density, hpa_to_pa
+from correction_engine import DEFAULT_PARAMS, INPUT_COLUMNS, as_float_array, group_codes, neutral_times
+
+INPUT_PATH = Path("data/processed/results_physics_refined.parquet")
+OUTPUT_PATH = Path("data/processed/results_uncertainty.parquet")
+BEAT_PATH = Path("data/processed/results_beat_top.parquet")
+DRAWS = 2000
+QUANTILES = (0.05, 0.5, 0.95)
+MAX_CELLS = 2_000_000   # rows × draws held per chunk (~16 MB per float64 array)
+WEATHER = ["temp_c", "pressure_hpa", "rh_pct"]
+MEET = ["venue", "date"]
+
+
+@dataclass(frozen=True)
+class InputNoise:
+    """Spread of each uncertain input (standard deviations unless noted)."""
+    wind_resolution: float = 0.1   # gauge step (m/s): uniform error of ± half a step
+    wind_sd: float = 0.05          # gauge error on top of the rounding (m/s)
+    temp_sd: float = 3.0           # race time vs daily value (°C)
+    pressure_sd: float = 1.0       # hPa
+    rh_sd: float = 12.0            # percentage points
+    rho_sd: float = 0.02           # kg/m³, used when a frame has no weather columns
+    hourly_factor: float = 0.3     # weather spread multiplier where weather_source == 'hourly'
+    altitude_sd: float = 15.0      # m
+    family: str = "normal"         # 'normal' or 'uniform' (same sd) for the sd terms
+
+    def to_dict(self):
+        return asdict(self)
+
+
+DEFAULT_NOISE = InputNoise()
+
+
+def quantile_columns(quantiles=QUANTILES):
+    return [f"t_neutral_q{round(q * 100):02d}" for q in quantiles]
+
+
+def _standard(rng, shape, family):
+    """Zero-mean, unit-variance draws."""
+    if family == "normal":
+        return rng.standard_normal(shape)
+    if family == "uniform":
+        return rng.uniform(-np.sqrt(3.0), np.sqrt(3.0), shape)
+    raise ValueError(f"family must be 'normal' or 'uniform', got {family!r}")
+
+
+def _group_codes(df, columns):
+    """Dense codes for the distinct combinations of columns (one group per row if none are present)."""
+    if not any(c in df.columns for c in columns):
+        return np.arange(len(df))
+    return group_codes(df, columns)[0]
+
+
+def simulation_inputs(df):
+    """The arrays simulate() needs, taken from a results frame."""
+    cols = {c: as_float_array(df[c]) for c in INPUT_COLUMNS}
+    weather = [c for c in WEATHER if c in df.columns] == WEATHER
+    if weather:
+        cols.update({c: as_float_array(df[c]) for c in WEATHER})
+    source = df["weather_source"] if "weather_source" in df.columns else pd.Series(None, index=df.index)
+    cols["hourly"] = source.eq("hourly").to_numpy(dtype=bool, na_value=False)
+    cols["venue"] = _group_codes(df, MEET[:1])
+    cols["meet"] = _group_codes(df, MEET)
+    # rows of one meet with the same recorded weather share their density draw
+    cols["conditions"] = _group_codes(df.assign(_hourly=cols["hourly"]),
+                                      MEET + (WEATHER if weather else []) + ["_hourly"])
+    return cols
+
+
+def _take(cols, sl):
+    return {k: v[sl] for k, v in cols.items()}
+
+
+def _density_shift(cols, z, meet, noise):
+    """(groups, draws) change in air density for each distinct weather record, and each row's group."""
+    first, row_group = np.unique(cols["conditions"], return_index=True, return_inverse=True)[1:]
+    g = {c: cols[c][first] for c in WEATHER}
+    scale = (np.where(cols["hourly"][first], noise.hourly_factor, 1.0))[:, None]
+    zg = z[:, meet[first]]
+    temp = g["temp_c"][:, None] + scale * noise.temp_sd * zg[0]
+    pressure = g["pressure_hpa"][:, None] + scale * noise.pressure_sd * zg[1]
+    rh = np.clip(g["rh_pct"][:, None] + scale * noise.rh_sd * zg[2], 0.0, 100.0)
+    nominal = air_density(g["temp_c"], hpa_to_pa(g["pressure_hpa"]), g["rh_pct"])
+    return air_density(temp, hpa_to_pa(pressure), rh) - nominal[:, None], row_group
+
+
+def simulate(cols, draws, rng, noise=DEFAULT_NOISE, params=DEFAULT_PARAMS):
+    """(rows, draws) neutral times for the inputs in cols (see simulation_inputs)."""
+    shape = (len(cols["perf"]), draws)
+    meet = np.unique(cols["meet"], return_inverse=True)[1]      # groups renumbered within the chunk
+    venue = np.unique(cols["venue"], return_inverse=True)[1]
+    n_meet, n_venue = meet.max(initial=-1) + 1, venue.max(initial=-1) + 1
+
+    wind = cols["wind"][:, None] + noise.wind_resolution * rng.uniform(-0.5, 0.5, shape)
+    wind += noise.wind_sd * _standard(rng, shape, noise.family)
+    alt = cols["altitude_m"][:, None] + noise.altitude_sd * _standard(rng, (n_venue, draws), noise.family)[venue]
+
+    if "temp_c" in cols:
+        # the recorded density is shifted by the change the weather draw implies
+        shift, group = _density_shift(cols, _standard(rng, (3, n_meet, draws), noise.family), meet, noise)
+        rho = cols["rho_air_abs"][:, None] + shift[group]
+    else:
+        rho = cols["rho_air_abs"][:, None] + noise.rho_sd * _standard(rng, (n_meet, draws), noise.family)[meet]
+
+    return neutral_times(cols["perf"][:, None], wind, alt, rho, params)
+
+
+def _summary_chunk(task):
+    cols, draws, seed, quantiles, noise, params = task
+    t = simulate(cols, draws, np.random.default_rng(seed), noise, params)
+    return np.quantile(t, quantiles, axis=1).T, t.std(axis=1, ddof=1)
+
+
+def neutral_uncertainty(df, noise=DEFAULT_NOISE, draws=DRAWS, quantiles=QUANTILES, seed=0, workers=1,
+                        params=DEFAULT_PARAMS, max_cells=MAX_CELLS):
+    """df with t_neutral_sd and one t_neutral_qNN column per quantile added.
+
+    Rows with a missing input get NaN.
+    """
+    cols = simulation_inputs(df)
+    rows = max(1, max_cells // draws)
+    bounds = list(range(0, len(df), rows))
+    seeds = np.random.SeedSequence(seed).spawn(len(bounds))
+    tasks = [(_take(cols, slice(b, b + rows)), draws, s, tuple(quantiles), noise, params)
+             for b, s in zip(bounds, seeds)]
+
+    if workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as pool:
+            parts = list(pool.map(_summary_chunk, tasks))
+    else:
+        parts = [_summary_chunk(t) for t in tasks]
+
+    out = df.copy()
+    q = np.concatenate([p[0] for p in parts]) if parts else np.empty((0, len(quantiles)))
+    out["t_neutral_sd"] = np.concatenate([p[1] for p in parts]) if parts else np.empty(0)
+    for i, name in enumerate(quantile_columns(quantiles)):
+        out[name] = q[:, i]
+    return out
+
+
+def beat_matrix(df, noise=DEFAULT_NOISE, draws=DRAWS, seed=0, params=DEFAULT_PARAMS, max_cells=MAX_CELLS):
+    """P(row i's neutral time is truly faster than row j's) for every pair of rows in df.
+
+    All rows are simulated together, so results from the same meet or venue
+    share their weather and altitude draws. Meant for shortlists (a top-k,
+    a final), not whole archives: the result is k × k.
+    """
+    t = simulate(simulation_inputs(df), draws, np.random.default_rng(seed), noise, params)
+    k = len(t)
+    p = np.empty((k, k))
+    block = max(1, max_cells // max(k * draws, 1))
+    for i in range(0, k, block):
+        p[i:i + block] = (t[i:i + block, None, :] < t[None, :, :]).mean(axis=2)
+    return pd.DataFrame(p, index=df.index, columns=df.index)
+
+
+def beat_table(df, top=20, **kwargs):
+    """Long table (a, b, p_beat) over the `top` best t_neutral values; a and b are df index labels."""
+    best = df.dropna(subset=["t_neutral"]).nsmallest(top, "t_neutral")
+    p = beat_matrix(best, **kwargs)
+    long = p.stack().rename("p_beat").rename_axis(["a", "b"]).reset_index()
+    return long[long["a"] != long["b"]].reset_index(drop=True)
+
+
+def uncertainty_stage(df, draws=DRAWS, seed=0, workers=None, **noise):
+    """Pipeline stage: neutral_uncertainty with noise settings as keyword arguments."""
+    return neutral_uncertainty(df, InputNoise(**noise), draws=draws, seed=seed,
+                               workers=workers or os.cpu_count() or 1)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Monte Carlo uncertainty of neutral times.")
+    ap.add_argument("--input", default=str(INPUT_PATH))
+    ap.add_argument("--output", default=str(OUTPUT_PATH))
+    ap.add_argument("--draws", type=int, default=DRAWS)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--workers", type=int, default=None)
+    ap.add_argument("--top", type=int, default=0, help="also write P(beat) for the top N neutral times")
+    args = ap.parse_args(argv)
+
+    df = pd.read_parquet(args.input)
+    print(f"🎲 {args.draws} draws for each of {len(df)} results...")
+    out = uncertainty_stage(df, draws=args.draws, seed=args.seed, workers=args.workers)
+    out.to_parquet(args.output, index=False)
+    q = quantile_columns()
+    print(out[["competitor", "perf", "t_neutral", "t_neutral_sd", *q]].head().to_string(index=False))
+    print(f"✅ Saved → {Path(args.output).resolve()}")
+    if args.top:
+        beat = beat_table(df, args.top, draws=args.draws, seed=args.seed)
+        beat.to_parquet(BEAT_PATH, index=False)
+        print(f"🏁 P(beat) for the top {args.top} → {BEAT_PATH.resolve()}")
+
+
+if __name__ == "__main__":
+    main()
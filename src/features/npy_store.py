@@ -0,0 +1,76 @@
+# src/features/npy_store.py
+"""
+Growing .npy stores in place along the first axis.
+
+The offline stores (weather archive, DEM tiles) are stacks of fixed-size
+rows that are read through mmap_mode="r" and only ever gain rows. Adding
+rows must not load the whole stack or rewrite it:
+
+- append_rows() rewrites the header with the new length and writes the new
+  rows at the end of the file. numpy leaves room in the header for the
+  first dimension to grow, so the header length does not change. Files
+  written without that room are copied once into a new file through a
+  memory map, without being loaded.
+- Existing rows are updated through np.load(..., mmap_mode="r+").
+"""
+
+import io
+import os
+from pathlib import Path
+
+import numpy as np
+
+COPY_ROWS = 256  # rows per chunk when a file has to be copied
+
+
+def _header(shape, dtype):
+    buf = io.BytesIO()
+    np.lib.format.write_array_header_1_0(buf, {"descr": np.lib.format.dtype_to_descr(dtype),
+                                                "fortran_order": False, "shape": tuple(shape)})
+    return buf.getvalue()
+
+
+def append_rows(file, rows, at=None):
+    """Append rows (k, ...) to the C-ordered .npy at file, creating it if needed. Returns the new row count.
+
+    With at, the rows are written from row `at` on and anything stored past it
+    is dropped (left over by an import that died before its index was saved).
+    """
+    file = Path(file)
+    rows = np.ascontiguousarray(rows)
+    if not file.exists() or at == 0:
+        np.save(file, rows)
+        return len(rows)
+
+    with open(file, "r+b") as f:
+        version = np.lib.format.read_magic(f)
+        read = np.lib.format.read_array_header_1_0 if version == (1, 0) else np.lib.format.read_array_header_2_0
+        shape, fortran, dtype = read(f)
+        if fortran or shape[1:] != rows.shape[1:]:
+            raise ValueError(f"{file}: cannot append rows of shape {rows.shape[1:]} to {shape}")
+        if at is not None:
+            if at > shape[0]:
+                raise ValueError(f"{file}: has {shape[0]} rows, cannot write at row {at}")
+            shape = (at,) + tuple(shape[1:])
+        new_shape = (shape[0] + len(rows),) + tuple(shape[1:])
+        header = _header(new_shape, dtype)
+        if len(header) == f.tell():
+            f.truncate(f.tell() + shape[0] * int(np.prod(shape[1:], dtype=np.int64)) * dtype.itemsize)
+            f.seek(0, os.SEEK_END)
+            f.write(rows.astype(dtype, copy=False).tobytes())
+            f.seek(0)
+            f.write(header)
+            return new_shape[0]
+
+    # no room to grow the header: copy into a new file chunk by chunk
+    old = np.load(file, mmap_mode="r")[:shape[0]]
+    tmp = file.with_suffix(".tmp.npy")
+    out = np.lib.format.open_memmap(tmp, mode="w+", dtype=old.dtype, shape=new_shape)
+    for i in range(0, len(old), COPY_ROWS):
+        chunk = old[i:i + COPY_ROWS]
+        out[i:i + len(chunk)] = chunk
+    out[len(old):] = rows
+    out.flush()
+    del out, old
+    os.replace(tmp, file)
+    return new_shape[0]
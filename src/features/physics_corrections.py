@@ -1,42 +1,57 @@
 # src/features/physics_corrections.py
 """
 Compute physics-corrected (neutral) 100 m times using wind, altitude, and air density.
+
+The correction constants live in one place, CorrectionParams
+(correction_engine.py); the pipeline stage passes the same values.
 """
 
 import pandas as pd
-import numpy as np
 from pathlib import Path
 
-print("🔍 Loading altitude + density data...")
-df = pd.read_parquet("data/processed/results_altitude_density.parquet")
-
-# --- Constants ---
-RHO_REF = 1.225   # sea-level air density (kg/m³)
-ALT_SCALE = 0.00012  # time improvement per meter altitude (s/m)
-WIND_COEFF = 0.045   # time improvement per m/s tailwind
-RHO_COEFF = 0.25     # correction factor for density deviation
-
-# --- Clean data ---
-for c in ["perf", "wind", "altitude_m", "rho_air_abs"]:
-    df[c] = pd.to_numeric(df[c], errors="coerce")
-
-df = df.dropna(subset=["perf", "wind", "altitude_m", "rho_air_abs"]).copy()
-
-# --- Physics model ---
-def neutral_time(row):
-    base = row["perf"]
-    wind_corr = WIND_COEFF * row["wind"]
-    alt_corr = ALT_SCALE * row["altitude_m"]
-    rho_corr = RHO_COEFF * (RHO_REF - row["rho_air_abs"])
-    return base + wind_corr - alt_corr + rho_corr
-
-df["t_neutral"] = df.apply(neutral_time, axis=1)
-
-# --- Sanity check ---
-print(df[["venue", "perf", "wind", "altitude_m", "rho_air_abs", "t_neutral"]].head())
-
-# --- Save ---
-out_path = Path("data/processed/results_physics_refined.parquet")
-df.to_parquet(out_path, index=False)
-print(f"✅ Saved refined physics-corrected results → {out_path.resolve()}")
-
+from correction_engine import DEFAULT_PARAMS, CorrectionParams, correct_frame
+
+INPUT_PATH = Path("data/processed/results_altitude_density.parquet")
+OUTPUT_PATH = Path("data/processed/results_physics_refined.parquet")
+SURFACE_DIR = Path("data/processed/correction_surface")  # built by correction_surface.py
+
+
+def physics_corrections(df, rho_ref=DEFAULT_PARAMS.rho_ref, alt_scale=DEFAULT_PARAMS.alt_scale,
+                        wind_coeff=DEFAULT_PARAMS.wind_coeff, rho_coeff=DEFAULT_PARAMS.rho_coeff,
+                        surface_dir=None):
+    """Clean inputs and add t_neutral in one vectorized pass (see correction_engine.py).
+
+    With surface_dir, also add t_neutral_model from the precomputed
+    drag-model correction surface (see correction_surface.py). If no
+    surface has been built there yet, the column is left out with a warning.
+    """
+    params = CorrectionParams(
+        rho_ref=rho_ref,
+        alt_scale=alt_scale,
+        wind_coeff=wind_coeff,
+        rho_coeff=rho_coeff,
+    )
+    df = correct_frame(df, params)
+    if surface_dir is not None and not Path(surface_dir, "surface.npy").exists():
+        print(f"⚠️  No correction surface in {surface_dir}; t_neutral_model skipped "
+              "(build it with correction_surface.py)")
+    elif surface_dir is not None:
+        from correction_surface import CorrectionSurface
+        surface = CorrectionSurface.load(surface_dir)
+        df["t_neutral_model"] = surface.neutral_times(df["perf"], df["wind"], df["rho_air_abs"])
+    return df
+
+def main(input_path=INPUT_PATH, output_path=OUTPUT_PATH, surface_dir=SURFACE_DIR):
+    print("🔍 Loading altitude + density data...")
+    df = pd.read_parquet(input_path)
+    df = physics_corrections(df, surface_dir=surface_dir)
+
+    # --- Sanity check ---
+    print(df[["venue", "perf", "wind", "altitude_m", "rho_air_abs", "t_neutral"]].head())
+
+    # --- Save ---
+    df.to_parquet(output_path, index=False)
+    print(f"✅ Saved refined physics-corrected results → {Path(output_path).resolve()}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,490 @@
+# src/features/ranking_service.py
+"""
+Indexed all-time rankings by neutral time, in process or over HTTP.
+
+NeutralRanking keeps every result in t_neutral order as NumPy columns and
+keeps one index per filter dimension: athlete, venue, year, wind band and
+altitude band. An index is a single sorted int64 array of
+(key << 32 | position). A key's results are one contiguous slice, found by
+binary search, and are already in ranking order. Queries are therefore a
+few searchsorted calls plus a short slice:
+- top(k, **filters): the k best marks;
+- rank_of(mark, **filters): where a time would rank;
+- best_per_athlete(k, **filters): the k best athletes by their best mark.
+Filters combine: the most selective dimension supplies candidates in
+ranking order, and the others are checked on a prefix of it.
+
+Appended results are merged in. New rows are sorted among themselves and
+placed by searchsorted; existing positions shift by the number of rows
+inserted before them, which keeps every index sorted without a re-sort.
+refresh() appends the rows of a Parquet file it hasn't seen (by row hash)
+and rebuilds only if rows were removed or changed.
+
+rerank(params) recomputes neutral times under another CorrectionParams.
+It sorts starting from the current order, which is nearly sorted when the
+parameters move a little. The stable sort (Timsort) runs close to linear on
+such input.
+
+    python src/features/ranking_service.py top --k 10 --wind-band tail --year 2009
+    python src/features/ranking_service.py rank 9.80 --venue "Olympiastadion, Berlin (GER)"
+    python src/features/ranking_service.py serve --port 8765 --poll 30
+        GET /top?k=10&year=2008-2012   /rank?mark=9.8   /best?k=10&altitude_band=altitude
+"""
+
+import argparse
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+import pandas as pd
+
+from correction_engine import DEFAULT_PARAMS, INPUT_COLUMNS, as_float_array, group_codes, neutral_times
+
+DEFAULT_PATH = Path("data/processed/results_physics_refined.parquet")
+SOURCE_COLUMNS = ["competitor", "dob", "venue", "date", "year", *INPUT_COLUMNS]
+POS_BITS = 32
+POS_MASK = (1 << POS_BITS) - 1
+
+# bands: (upper edges, labels); the last label is for missing values
+WIND_BANDS = ([-2.0, 0.0, 2.0], ["strong_head", "head", "tail", "assisted", "unknown"])  # (lo, hi] in m/s
+ALTITUDE_BANDS = ([500.0, 1000.0], ["low", "mid", "altitude", "unknown"])             # [lo, hi) in m
+DIMENSIONS = ["athlete", "venue", "year", "wind_band", "altitude_band"]
+NO_MARK = np.iinfo(np.int64).max  # best position of an athlete without a ranked result
+
+
+def _band(values, bands, right):
+    edges, labels = bands
+    code = np.digitize(values, edges, right=right)
+    return np.where(np.isnan(values), len(labels) - 1, code)
+
+
+def athlete_labels(df):
+    """'Name (dob)' per row; dob tells namesakes apart."""
+    name = df["competitor"].astype("str").fillna("?")
+    dob = df["dob"].astype("str").fillna("?") if "dob" in df.columns else "?"
+    return name + " (" + dob + ")"
+
+
+def _distinct(df, columns, label):
+    """(per-row codes, labels of the distinct combinations of columns); label() runs on one row per combination."""
+    codes, first = group_codes(df, columns)
+    return codes, label(df.iloc[first]).to_numpy()
+
+
+def result_years(df):
+    if "year" in df.columns:
+        return pd.to_numeric(df["year"], errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
+    return pd.to_numeric(df["date"].astype("str").str[-4:], errors="coerce").to_numpy(dtype=np.float64,
+                                                                                     na_value=np.nan)
+
+
+def row_hashes(df):
+    """Content hash per result (the columns the ranking uses), to spot appended rows."""
+    cols = [c for c in SOURCE_COLUMNS if c in df.columns]
+    return pd.util.hash_pandas_object(df[cols], index=False).to_numpy(dtype=np.uint64)
+
+
+def _shift(pos, inserted_at):
+    """New positions of existing rows after rows were inserted before old positions inserted_at."""
+    return pos + np.searchsorted(inserted_at, pos, side="right")
+
+
+class NeutralRanking:
+    """All results ordered by neutral time, with per-dimension indexes (see module docstring)."""
+
+    def __init__(self, df=None, params=DEFAULT_PARAMS):
+        self.params = params
+        self.lock = threading.RLock()
+        self._clear()
+        if df is not None:
+            self.append(df)
+
+    def _clear(self):
+        # label sets: pd.Index to encode columns, object arrays to decode, dicts for filter lookups
+        self.labels = {d: pd.Index([], dtype="str") for d in ("athlete", "venue")}
+        self.names = {d: np.empty(0, dtype=object) for d in ("athlete", "venue")}
+        self.lookup = {d: {} for d in ("athlete", "venue")}
+        empty = np.empty(0)
+        self.t, self.perf, self.wind, self.altitude, self.rho = empty, empty, empty, empty, empty
+        self.row = np.empty(0, dtype=np.int64)
+        self.codes = {d: np.empty(0, dtype=np.int64) for d in DIMENSIONS}
+        self.index = {d: np.empty(0, dtype=np.int64) for d in DIMENSIONS}
+        self.best = np.empty(0, dtype=np.int64)      # athlete code -> position of their best mark
+        self.leaders = np.empty(0, dtype=np.int64)   # those positions, ascending
+        self.hashes = np.empty(0, dtype=np.uint64)   # sorted row hashes seen so far
+        self.next_row = 0
+
+    def __len__(self):
+        return len(self.t)
+
+    # --- building ---
+
+    def _encode(self, dim, local, values):
+        """Stable integer codes for rows given as codes into distinct values, growing the label set."""
+        labels = self.labels[dim]
+        codes = labels.get_indexer(values)
+        if (codes < 0).any():
+            fresh = pd.Index(values[codes < 0]).unique()
+            self.lookup[dim].update(zip(fresh, range(len(labels), len(labels) + len(fresh))))
+            self.labels[dim] = labels = labels.append(fresh)
+            self.names[dim] = labels.to_numpy(dtype=object)
+            codes = labels.get_indexer(values)
+        return codes.astype(np.int64)[local]
+
+    def _prepare(self, df, rows):
+        """Arrays for the rows of df that have a neutral time, sorted by it."""
+        cols = {c: as_float_array(df[c]) for c in INPUT_COLUMNS}
+        t = neutral_times(cols["perf"], cols["wind"], cols["altitude_m"], cols["rho_air_abs"], self.params)
+        ok = np.isfinite(t)
+        years = result_years(df)
+        new = {
+            "t": t, **cols,
+            "athlete": self._encode("athlete", *_distinct(df, ["competitor", "dob"], athlete_labels)),
+            "venue": self._encode("venue", *_distinct(df, ["venue"], lambda d: d["venue"].astype("str").fillna("?"))),
+            "year": np.nan_to_num(years, nan=0).astype(np.int64),
+            "wind_band": _band(cols["wind"], WIND_BANDS, right=True),
+            "altitude_band": _band(cols["altitude_m"], ALTITUDE_BANDS, right=False),
+        }
+        order = np.flatnonzero(ok)[np.argsort(t[ok], kind="stable")]
+        new = {k: v[order] for k, v in new.items()}
+        new["row"] = rows[order]
+        return new
+
+    def append(self, df, rows=None):
+        """Merge new results into the ranking; returns the number of ranked rows added.
+
+        rows are ids reported back by queries (default: arrival order).
+        """
+        with self.lock:
+            rows = np.arange(self.next_row, self.next_row + len(df)) if rows is None else np.asarray(rows)
+            self.next_row = max(self.next_row, int(rows.max(initial=-1)) + 1)
+            hashes = np.sort(row_hashes(df))
+            self.hashes = np.insert(self.hashes, np.searchsorted(self.hashes, hashes), hashes)
+            new = self._prepare(df, rows)
+            m = len(new["t"])
+            if not m:
+                return 0
+
+            at = np.searchsorted(self.t, new["t"], side="right")  # ties rank after earlier marks
+            final = at + np.arange(m)
+            for name, col in (("t", "t"), ("perf", "perf"), ("wind", "wind"),
+                              ("altitude", "altitude_m"), ("rho", "rho_air_abs"), ("row", "row")):
+                setattr(self, name, np.insert(getattr(self, name), at, new[col]))
+
+            for d in DIMENSIONS:
+                self.codes[d] = np.insert(self.codes[d], at, new[d])
+                index = self.index[d]
+                index = index + np.searchsorted(at, index & POS_MASK, side="right")  # keys untouched
+                fresh = np.sort((new[d] << POS_BITS) | final)
+                self.index[d] = np.insert(index, np.searchsorted(index, fresh), fresh)
+
+            best = np.concatenate([self.best, np.full(len(self.labels["athlete"]) - len(self.best), NO_MARK)])
+            ranked = best != NO_MARK
+            best[ranked] = _shift(best[ranked], at)
+            np.minimum.at(best, new["athlete"], final)
+            self.best = best
+            self.leaders = np.sort(best[best != NO_MARK])
+            return m
+
+    @classmethod
+    def from_parquet(cls, path=DEFAULT_PATH, params=DEFAULT_PARAMS):
+        return cls(read_source(path), params)
+
+    def refresh(self, path=DEFAULT_PATH):
+        """Apply rows of path not seen yet; rebuild if any seen row is gone. Returns (mode, rows)."""
+        df = read_source(path)
+        hashes = row_hashes(df)
+        with self.lock:
+            if not np.isin(self.hashes, hashes).all():
+                self._clear()
+                return "rebuilt", self.append(df)
+            new = ~np.isin(hashes, self.hashes)
+            return "appended", self.append(df[new], rows=np.flatnonzero(new)) if new.any() else 0
+
+    def rerank(self, params):
+        """A new ranking of the same results under other correction parameters."""
+        with self.lock:
+            t = neutral_times(self.perf, self.wind, self.altitude, self.rho, params)
+            order = np.argsort(t, kind="stable")  # current order is nearly sorted: Timsort ~ linear
+            inverse = np.empty_like(order)
+            inverse[order] = np.arange(len(order))
+
+            out = NeutralRanking(params=params)
+            out.labels, out.names = dict(self.labels), dict(self.names)
+            out.lookup = {d: dict(v) for d, v in self.lookup.items()}
+            out.t = t[order]
+            out.perf, out.wind, out.altitude, out.rho = (a[order] for a in (self.perf, self.wind,
+                                                                              self.altitude, self.rho))
+            out.row = self.row[order]
+            out.codes = {d: c[order] for d, c in self.codes.items()}
+            out.index = {d: np.sort((ix & ~POS_MASK) | inverse[ix & POS_MASK], kind="stable")
+                         for d, ix in self.index.items()}
+            ranked = np.arange(len(out.t))
+            best = np.full(len(self.best), NO_MARK)
+            np.minimum.at(best, out.codes["athlete"], ranked)
+            out.best, out.leaders = best, np.sort(best[best != NO_MARK])
+            out.hashes, out.next_row = self.hashes, self.next_row
+            return out
+
+    # --- candidates ---
+
+    def _keys(self, dim, value):
+        """Index keys selected by a filter value (label(s), year(s) or a (lo, hi) year range)."""
+        if value is None:
+            return None
+        if dim == "year":
+            if isinstance(value, tuple):
+                return np.arange(value[0], value[1] + 1)
+            return np.atleast_1d(np.asarray(value, dtype=np.int64))
+        values = [value] if isinstance(value, str) else list(value)
+        if dim in ("athlete", "venue"):
+            lookup = self.lookup[dim]
+            return np.array([lookup[v] for v in values if v in lookup], dtype=np.int64)
+        labels = (WIND_BANDS if dim == "wind_band" else ALTITUDE_BANDS)[1]
+        unknown = [v for v in values if v not in labels]
+        if unknown:
+            raise ValueError(f"unknown {dim} {unknown}; known: {', '.join(labels)}")
+        return np.array([labels.index(v) for v in values], dtype=np.int64)
+
+    def _slices(self, dim, keys):
+        index = keys.astype(np.int64) << POS_BITS
+        lo = np.searchsorted(self.index[dim], index)
+        hi = np.searchsorted(self.index[dim], index + (1 << POS_BITS))
+        return lo, hi
+
+    def _filters(self, filters):
+        """[(dim, keys, lo, hi)] ordered by candidate count, smallest first."""
+        unknown = set(filters) - set(DIMENSIONS)
+        if unknown:
+            raise TypeError(f"unknown filter(s) {sorted(unknown)}; use {', '.join(DIMENSIONS)}")
+        out = []
+        for dim in DIMENSIONS:
+            keys = self._keys(dim, filters.get(dim))
+            if keys is not None:
+                lo, hi = self._slices(dim, keys)
+                out.append((dim, keys, lo, hi))
+        return sorted(out, key=lambda f: int((f[3] - f[2]).sum()))
+
+    def _members(self, f, limit=None):
+        """Positions of one filter's results in ranking order, read `limit` per key at most.
+
+        Returns (positions, cutoff). Past cutoff (the last position read from
+        a truncated key) the list may have gaps; without truncation it is None.
+        """
+        dim, _, lo, hi = f
+        index, parts, cutoff = self.index[dim], [], None
+        for a, b in zip(lo, hi):
+            end = b if limit is None else min(b, a + limit)
+            parts.append(index[a:end] & POS_MASK)
+            if end < b:
+                last = int(index[end - 1] & POS_MASK)
+                cutoff = last if cutoff is None else min(cutoff, last)
+        pos = np.concatenate(parts) if parts else np.empty(0, dtype=np.int64)
+        pos = np.sort(pos) if len(parts) > 1 else pos
+        return (pos if cutoff is None else pos[pos <= cutoff]), cutoff
+
+    def _check(self, pos, rest):
+        keep = np.ones(len(pos), dtype=bool)
+        for dim, keys, _, _ in rest:
+            keep &= np.isin(self.codes[dim][pos], keys)
+        return pos[keep]
+
+    def _matching(self, k, filters, athletes=False):
+        """First positions (in ranking order) matching all filters: k results, or k athletes' bests."""
+        fs = self._filters(filters)
+        if not fs:
+            return self.leaders[:k] if athletes else np.arange(min(k, len(self.t)))
+        if any(len(f[1]) == 0 for f in fs):
+            return np.empty(0, dtype=np.int64)
+        lead, rest = fs[0], fs[1:]
+        limit = max(4 * k, 64)
+        while True:
+            pos, cutoff = self._members(lead, limit)
+            pos = self._check(pos, rest)
+            if athletes:
+                _, first = np.unique(self.codes["athlete"][pos], return_index=True)
+                pos = pos[np.sort(first)]
+            # the prefix already holds k matches, or every key was read to the end
+            if len(pos) >= k or cutoff is None:
+                return pos[:k]
+            limit *= 4
+
+    # --- queries ---
+
+    def _result(self, pos, as_frame):
+        """Rows at pos (ties share a rank) as a DataFrame, or as a list of dicts for lighter callers."""
+        t = self.t[pos]
+        cols = {
+            "rank": np.searchsorted(t, t, side="left") + 1,
+            "t_neutral": t,
+            "perf": self.perf[pos],
+            "wind": self.wind[pos],
+            "altitude_m": self.altitude[pos],
+            "athlete": self.names["athlete"][self.codes["athlete"][pos]],
+            "venue": self.names["venue"][self.codes["venue"][pos]],
+            "year": self.codes["year"][pos],
+            "row": self.row[pos],
+        }
+        if as_frame:
+            return pd.DataFrame(cols)
+        return [dict(zip(cols, values)) for values in zip(*(c.tolist() for c in cols.values()))]
+
+    def top(self, k=10, as_frame=True, **filters):
+        """The k best neutral marks matching the filters."""
+        with self.lock:
+            return self._result(self._matching(k, filters), as_frame)
+
+    def best_per_athlete(self, k=10, as_frame=True, **filters):
+        """Each athlete's best mark matching the filters, for the k best athletes."""
+        with self.lock:
+            return self._result(self._matching(k, filters, athletes=True), as_frame)
+
+    def rank_of(self, mark, **filters):
+        """Rank a neutral time of `mark` seconds would take among the matching results (1 = best)."""
+        with self.lock:
+            cut = int(np.searchsorted(self.t, mark, side="left"))   # results strictly faster overall
+            fs = self._filters(filters)
+            if not fs:
+                return cut + 1
+            if len(fs) == 1:
+                dim, keys, lo, _ = fs[0]
+                ahead = np.searchsorted(self.index[dim], (keys.astype(np.int64) << POS_BITS) | cut) - lo
+                return 1 + int(ahead.sum())
+            lead, _ = self._members(fs[0])
+            return 1 + len(self._check(lead[:np.searchsorted(lead, cut)], fs[1:]))
+
+    def summary(self):
+        return {"results": len(self.t), "athletes": len(self.leaders), "venues": len(self.labels["venue"]),
+                "params": self.params.to_dict()}
+
+
+def read_source(path=DEFAULT_PATH):
+    import pyarrow.parquet as pq
+    names = pq.read_schema(path).names
+    return pd.read_parquet(path, columns=[c for c in SOURCE_COLUMNS if c in names])
+
+
+# --- HTTP endpoint ---
+
+def _query_filters(q):
+    filters = {}
+    for dim in DIMENSIONS:
+        if dim not in q:
+            continue
+        values = q[dim]
+        if dim == "year":
+            if len(values) == 1 and "-" in values[0]:
+                lo, hi = values[0].split("-")
+                filters[dim] = (int(lo), int(hi))
+            else:
+                filters[dim] = [int(v) for v in values]
+        else:
+            filters[dim] = values
+    return filters
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        url = urlparse(self.path)
+        q = parse_qs(url.query)
+        ranking = self.server.ranking
+        try:
+            filters = _query_filters(q)
+            k = int(q.get("k", ["10"])[0])
+            if url.path == "/top":
+                body = ranking.top(k, as_frame=False, **filters)
+            elif url.path == "/best":
+                body = ranking.best_per_athlete(k, as_frame=False, **filters)
+            elif url.path == "/rank":
+                body = {"mark": float(q["mark"][0]), "rank": ranking.rank_of(float(q["mark"][0]), **filters)}
+            elif url.path == "/summary":
+                body = ranking.summary()
+            else:
+                self._send(404, {"error": f"unknown path {url.path}"})
+                return
+        except (KeyError, ValueError, TypeError) as e:
+            self._send(400, {"error": str(e)})
+            return
+        self._send(200, body)
+
+    def _send(self, status, body):
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+def serve(ranking, host="127.0.0.1", port=8765, source=None, poll=None):
+    """Serve ranking over HTTP until interrupted; with poll, refresh from source when it changes."""
+    server = ThreadingHTTPServer((host, port), _Handler)
+    server.daemon_threads = True
+    server.ranking = ranking
+
+    if source and poll:
+        def watch():
+            stamp = Path(source).stat().st_mtime
+            while True:
+                time.sleep(poll)
+                now = Path(source).stat().st_mtime
+                if now != stamp:
+                    stamp = now
+                    mode, n = ranking.refresh(source)
+                    print(f"🔁 {mode}: {n} rows ({len(ranking)} ranked)")
+        threading.Thread(target=watch, daemon=True).start()
+
+    print(f"🏆 {len(ranking)} results on http://{host}:{server.server_port}  (/top /rank /best /summary)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Query or serve the all-time neutral rankings.")
+    ap.add_argument("--data", default=str(DEFAULT_PATH))
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    queries = {name: sub.add_parser(name, help=h) for name, h in
+               (("top", "best marks"), ("best", "best mark per athlete"), ("rank", "rank of a time"))}
+    queries["rank"].add_argument("mark", type=float)
+    for p in queries.values():
+        p.add_argument("--k", type=int, default=10)
+        p.add_argument("--athlete", nargs="+")
+        p.add_argument("--venue", nargs="+")
+        p.add_argument("--year", nargs="+", type=int)
+        p.add_argument("--wind-band", nargs="+", choices=WIND_BANDS[1])
+        p.add_argument("--altitude-band", nargs="+", choices=ALTITUDE_BANDS[1])
+    srv = sub.add_parser("serve", help="HTTP endpoint")
+    srv.add_argument("--host", default="127.0.0.1")
+    srv.add_argument("--port", type=int, default=8765)
+    srv.add_argument("--poll", type=float, default=None, help="seconds between checks for new results")
+    args = ap.parse_args(argv)
+
+    t0 = time.perf_counter()
+    ranking = NeutralRanking.from_parquet(args.data)
+    print(f"📇 indexed {len(ranking)} results in {time.perf_counter() - t0:.2f} s")
+    if args.cmd == "serve":
+        serve(ranking, args.host, args.port, source=args.data, poll=args.poll)
+        return
+
+    filters = {d: getattr(args, d) for d in DIMENSIONS if getattr(args, d) is not None}
+    if args.cmd == "rank":
+        print(f"🏅 {args.mark:.2f} s would rank #{ranking.rank_of(args.mark, **filters)}")
+        return
+    query = ranking.top if args.cmd == "top" else ranking.best_per_athlete
+    print(query(args.k, **filters).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,218 @@
+# src/features/regression_inference.py
+"""
+Resampling inference for the environmental regression delta ~ wind + rho_air_abs + altitude_m.
+
+Thousands of resamples are solved as batched least squares rather than
+separate statsmodels fits:
+- bootstrap (case or cluster-by-venue): a resample is a weight vector over
+  rows, so X'WX and X'Wy for a whole batch of resamples come from one matrix
+  product with the stacked per-row cross products x_i x_iᵀ and x_i y_i;
+- permutation (Freedman–Lane): permuted responses are the columns of one
+  right-hand side, solved against a single pseudo-inverse.
+
+Resamples run in fixed-size chunks, each with its own child seed
+(SeedSequence.spawn). Results are therefore identical with or without the
+process pool.
+
+    python src/features/regression_inference.py
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from results_dataset import load_results
+
+REGRESSORS = ["wind", "rho_air_abs", "altitude_m"]
+TARGET = "delta"
+CLUSTER = "venue"
+N_RESAMPLES = 2000
+CHUNK = 250
+MAX_CELLS = 20_000_000   # cap on resamples × rows held in memory per chunk
+OUTPUT_PATH = Path("data/processed/model_inference.parquet")
+
+
+def design(df, regressors=REGRESSORS, target=TARGET):
+    """(X with intercept, y, names) as float arrays."""
+    X = np.column_stack([np.ones(len(df))] + [df[c].to_numpy(dtype=np.float64) for c in regressors])
+    return X, df[target].to_numpy(dtype=np.float64), ["const"] + list(regressors)
+
+
+def cross_products(X, y):
+    """Per-row upper-triangle entries of x xᵀ (n, q) and x·y (n, p)."""
+    iu = np.triu_indices(X.shape[1])
+    return X[:, iu[0]] * X[:, iu[1]], X * y[:, None]
+
+
+def solve_weighted(W, XX, Xy, p):
+    """Coefficients (B, p) for each weight row of W (B, m) from stacked cross products.
+
+    Resamples whose X'WX is rank-deficient (e.g. a cluster draw with a single
+    venue) come back as NaN.
+    """
+    flat = W @ XX
+    iu = np.triu_indices(p)
+    A = np.zeros((W.shape[0], p, p))
+    A[:, iu[0], iu[1]] = flat
+    A[:, iu[1], iu[0]] = flat
+    b = W @ Xy
+    ok = np.linalg.matrix_rank(A) == p
+    beta = np.full((W.shape[0], p), np.nan)
+    if ok.any():
+        beta[ok] = np.linalg.solve(A[ok], b[ok][..., None])[..., 0]
+    return beta
+
+
+# --- worker side: data is shipped once per process via the initializer ---
+
+_DATA = {}
+
+
+def _init(X, y, groups):
+    XX, Xy = cross_products(X, y)
+    _DATA.update(X=X, y=y, XX=XX, Xy=Xy, p=X.shape[1])
+    if groups is not None:
+        codes, _ = pd.factorize(groups, sort=True)
+        G = codes.max() + 1
+        # cluster bootstrap works on per-venue sums of the cross products
+        _DATA["gXX"] = np.stack([np.bincount(codes, XX[:, k], G) for k in range(XX.shape[1])], axis=1)
+        _DATA["gXy"] = np.stack([np.bincount(codes, Xy[:, k], G) for k in range(Xy.shape[1])], axis=1)
+        _DATA["G"] = G
+
+
+def _bootstrap_chunk(task):
+    seed, size, cluster = task
+    rng = np.random.default_rng(seed)
+    if cluster:
+        m, XX, Xy = _DATA["G"], _DATA["gXX"], _DATA["gXy"]
+    else:
+        m, XX, Xy = len(_DATA["y"]), _DATA["XX"], _DATA["Xy"]
+    W = rng.multinomial(m, np.full(m, 1.0 / m), size=size).astype(np.float64)
+    return solve_weighted(W, XX, Xy, _DATA["p"])
+
+
+def _diag_inv(X):
+    """diag of (X'X)⁺; the pseudo-inverse keeps a rank-deficient design from raising."""
+    return np.diag(np.linalg.pinv(X.T @ X))
+
+
+def _t_stats(X, pinv, diag_inv, Y):
+    """OLS t-statistics for every column of responses Y (n, B)."""
+    beta = pinv @ Y
+    resid = Y - X @ beta
+    dof = X.shape[0] - X.shape[1]
+    sigma2 = np.einsum("nb,nb->b", resid, resid) / dof
+    return beta / np.sqrt(sigma2[None, :] * diag_inv[:, None])
+
+
+def _permutation_chunk(task):
+    """|t_j| under Freedman–Lane permutation for every coefficient j ≥ 1, shape (size, p−1)."""
+    seed, size, _ = task
+    X, y, p = _DATA["X"], _DATA["y"], _DATA["p"]
+    rng = np.random.default_rng(seed)
+    n = len(y)
+    pinv = np.linalg.pinv(X)
+    diag_inv = _diag_inv(X)
+    perm = rng.permuted(np.tile(np.arange(n), (size, 1)), axis=1).T   # (n, size)
+
+    out = np.empty((size, p - 1))
+    for j in range(1, p):
+        Xr = np.delete(X, j, axis=1)
+        fitted = Xr @ np.linalg.lstsq(Xr, y, rcond=None)[0]
+        resid = y - fitted
+        Y = fitted[:, None] + resid[perm]
+        out[:, j - 1] = np.abs(_t_stats(X, pinv, diag_inv, Y)[j])
+    return out
+
+
+def _run(fn, tasks, X, y, groups, workers):
+    if workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks)),
+                                 initializer=_init, initargs=(X, y, groups)) as pool:
+            parts = list(pool.map(fn, tasks))
+    else:
+        _init(X, y, groups)
+        parts = [fn(t) for t in tasks]
+    return np.concatenate(parts, axis=0)
+
+
+def _tasks(seed, n_resamples, chunk, cluster):
+    sizes = [chunk] * (n_resamples // chunk) + ([n_resamples % chunk] if n_resamples % chunk else [])
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    return [(s, size, cluster) for s, size in zip(seeds, sizes)]
+
+
+def bootstrap(X, y, groups=None, n_resamples=N_RESAMPLES, seed=0, workers=1, chunk=CHUNK):
+    """Bootstrap coefficient draws (B, p): resample rows, or whole groups when groups is given."""
+    m = len(y) if groups is None else pd.unique(groups).size
+    chunk = max(1, min(chunk, MAX_CELLS // max(m, 1)))
+    tasks = _tasks(seed, n_resamples, chunk, groups is not None)
+    return _run(_bootstrap_chunk, tasks, X, y, groups, workers)
+
+
+def permutation_pvalues(X, y, n_resamples=N_RESAMPLES, seed=0, workers=1, chunk=CHUNK):
+    """Two-sided Freedman–Lane permutation p-values for each non-intercept coefficient.
+
+    NaN for every coefficient when the design is rank-deficient (a constant or
+    collinear regressor): the coefficients aren't identified, so neither are
+    their t-statistics. The bootstrap marks such resamples NaN the same way.
+    """
+    if np.linalg.matrix_rank(X) < X.shape[1]:
+        print("⚠️  Rank-deficient design (constant or collinear regressor); permutation p-values are NaN")
+        return np.full(X.shape[1] - 1, np.nan)
+    chunk = max(1, min(chunk, MAX_CELLS // max(len(y), 1)))
+    _init(X, y, None)
+    t_obs = np.abs(_t_stats(X, np.linalg.pinv(X), _diag_inv(X), y[:, None])[1:, 0])
+    t_perm = _run(_permutation_chunk, _tasks(seed, n_resamples, chunk, False), X, y, None, workers)
+    return (1 + (t_perm >= t_obs).sum(axis=0)) / (len(t_perm) + 1)
+
+
+def infer(df, regressors=REGRESSORS, target=TARGET, cluster=CLUSTER, n_resamples=N_RESAMPLES,
+          seed=0, workers=1, confidence=0.95):
+    """Per-coefficient table of OLS estimates with bootstrap and permutation inference."""
+    X, y, names = design(df, regressors, target)
+    beta = np.linalg.lstsq(X, y, rcond=None)[0]
+    a = (1 - confidence) / 2 * 100
+
+    boot = bootstrap(X, y, None, n_resamples, seed, workers)
+    out = pd.DataFrame({
+        "Variable": names,
+        "Coefficient": beta,
+        "Boot_SE": np.nanstd(boot, axis=0, ddof=1),
+        "CI_low": np.nanpercentile(boot, a, axis=0),
+        "CI_high": np.nanpercentile(boot, 100 - a, axis=0),
+    })
+
+    groups = df[cluster].to_numpy() if cluster and cluster in df.columns else None
+    if groups is not None and pd.unique(groups).size > 1:
+        cboot = bootstrap(X, y, groups, n_resamples, seed + 1, workers)
+        out["Cluster_SE"] = np.nanstd(cboot, axis=0, ddof=1)
+        out["Cluster_CI_low"] = np.nanpercentile(cboot, a, axis=0)
+        out["Cluster_CI_high"] = np.nanpercentile(cboot, 100 - a, axis=0)
+        out["Cluster_valid"] = np.isfinite(cboot).all(axis=1).mean()
+    else:
+        out["Cluster_SE"] = out["Cluster_CI_low"] = out["Cluster_CI_high"] = np.nan
+        out["Cluster_valid"] = 0.0
+
+    out["Perm_p"] = np.concatenate([[np.nan], permutation_pvalues(X, y, n_resamples, seed + 2, workers)])
+    out["N_resamples"] = n_resamples
+    out["Confidence"] = confidence
+    out["Seed"] = seed
+    return out
+
+
+def main(output_path=OUTPUT_PATH, n_resamples=N_RESAMPLES, seed=0, workers=None):
+    df = load_results(REGRESSORS + [TARGET, CLUSTER], dropna=REGRESSORS + [TARGET])
+    workers = workers or os.cpu_count() or 1
+    print(f"🎲 {n_resamples} bootstrap / permutation resamples on {len(df)} results...")
+    out = infer(df, n_resamples=n_resamples, seed=seed, workers=workers)
+    out.to_parquet(output_path, index=False)
+    print(out.round(5).to_string(index=False))
+    print(f"✅ Saved → {Path(output_path).resolve()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,256 @@
+# src/features/render_report.py
+"""
+Headless batch rendering of the analysis figures.
+
+Draws the notebook plots (raw vs neutral, condition vs ΔTime, pair grid,
+regression coefficients and residuals) with the Agg backend. Figures are
+rendered in a process pool: each worker opens the dataset once and reads
+only the columns its figures need.
+
+Above DENSITY_THRESHOLD points a scatter is replaced by a 2-D density image
+binned with np.histogram2d, which draws in constant time and stays readable.
+Every run writes PNG/SVG files and a manifest.json listing them.
+
+    python src/features/render_report.py [--out data/reports] [--formats png svg]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt  # noqa: E402
+import numpy as np  # noqa: E402
+from matplotlib.colors import LogNorm  # noqa: E402
+
+from results_dataset import DEFAULT_PATH, load_results  # noqa: E402
+from streaming_ols import OLSAccumulator  # noqa: E402
+
+OUTPUT_DIR = Path("data/reports")
+FORMATS = ("png",)
+DENSITY_THRESHOLD = 20_000
+BINS = 120
+CONDITIONS = ["wind", "rho_air_abs", "altitude_m"]
+LABELS = {
+    "perf": "Raw performance (s)",
+    "t_neutral": "Neutral performance (s)",
+    "wind": "Wind (m/s)",
+    "rho_air_abs": "Air density (kg/m³)",
+    "altitude_m": "Altitude (m)",
+    "delta": "ΔTime (Neutral - Raw) [s]",
+}
+
+
+# --- drawing primitives ---
+
+def points(ax, x, y, density_threshold=DENSITY_THRESHOLD, bins=BINS, **scatter_kw):
+    """Scatter for small inputs, log-scaled 2-D histogram for large ones. Returns the mode used."""
+    ok = np.isfinite(x) & np.isfinite(y)
+    x, y = x[ok], y[ok]
+    if len(x) <= density_threshold:
+        ax.scatter(x, y, s=12, alpha=0.7, **scatter_kw)
+        return "scatter"
+    counts, xe, ye = np.histogram2d(x, y, bins=bins)
+    mesh = ax.pcolormesh(xe, ye, np.ma.masked_equal(counts.T, 0), norm=LogNorm(), cmap="viridis")
+    ax.figure.colorbar(mesh, ax=ax, label="results per bin")
+    return "density"
+
+
+def histogram(ax, x, bins=60, **kw):
+    x = x[np.isfinite(x)]
+    counts, edges = np.histogram(x, bins=bins)
+    ax.stairs(counts, edges, fill=True, alpha=0.7, **kw)
+
+
+def _cols(df, *names):
+    return [df[c].to_numpy(dtype=np.float64, na_value=np.nan) for c in names]
+
+
+# --- figures: each takes the projected frame and returns (fig, mode) ---
+
+def fig_raw_vs_neutral(df):
+    perf, neutral = _cols(df, "perf", "t_neutral")
+    fig, ax = plt.subplots(figsize=(10, 6))
+    mode = points(ax, perf, neutral, color="steelblue")
+    lo, hi = np.nanmin(perf), np.nanmax(perf)
+    ax.plot([lo, hi], [lo, hi], "r--", label="y = x")
+    ax.set(xlabel=LABELS["perf"], ylabel=LABELS["t_neutral"], title="Raw vs Physics-Corrected 100m Times")
+    ax.legend()
+    ax.grid(True)
+    return fig, mode
+
+
+def _condition_figure(col, color, title, fit_line=False):
+    def draw(df):
+        x, delta = _cols(df, col, "delta")
+        fig, ax = plt.subplots(figsize=(8, 5))
+        mode = points(ax, x, delta, color=color)
+        ok = np.isfinite(x) & np.isfinite(delta)
+        if fit_line and ok.sum() > 1:
+            m, b = np.polyfit(x[ok], delta[ok], 1)
+            xs = np.array([x[ok].min(), x[ok].max()])
+            ax.plot(xs, m * xs + b, "r--", label=f"Slope = {m:.3f} s/(m/s)")
+            ax.legend()
+        ax.set(xlabel=LABELS[col], ylabel=LABELS["delta"], title=title)
+        ax.grid(True)
+        return fig, mode
+    return draw
+
+
+def fig_pairs(df):
+    """Pair grid of conditions and ΔTime (histograms on the diagonal)."""
+    names = CONDITIONS + ["delta"]
+    cols = _cols(df, *names)
+    k = len(names)
+    fig, axes = plt.subplots(k, k, figsize=(3 * k, 3 * k))
+    mode = "scatter"
+    for i in range(k):
+        for j in range(k):
+            ax = axes[i, j]
+            if i == j:
+                histogram(ax, cols[i])
+            else:
+                # density images here skip per-panel colorbars
+                x, y = cols[j], cols[i]
+                ok = np.isfinite(x) & np.isfinite(y)
+                if ok.sum() > DENSITY_THRESHOLD:
+                    counts, xe, ye = np.histogram2d(x[ok], y[ok], bins=60)
+                    ax.pcolormesh(xe, ye, np.ma.masked_equal(counts.T, 0), norm=LogNorm(), cmap="viridis")
+                    mode = "density"
+                else:
+                    ax.scatter(x[ok], y[ok], s=6, alpha=0.6)
+            if i == k - 1:
+                ax.set_xlabel(names[j])
+            if j == 0:
+                ax.set_ylabel(names[i])
+    fig.suptitle("Relationships Between Environmental Variables and ΔTime", y=1.0)
+    fig.tight_layout()
+    return fig, mode
+
+
+def _ols(df):
+    return OLSAccumulator(CONDITIONS, "delta").update(df)
+
+
+def fig_coefficients(df):
+    fit = _ols(df).fit().set_index("Variable").drop("const")
+    fig, ax = plt.subplots(figsize=(7, 5))
+    ax.bar(fit.index, fit["Coefficient"], yerr=1.96 * fit["Std_Error"], capsize=4)
+    ax.set(ylabel="ΔTime contribution (s per unit)", title="Estimated Effect of Each Environmental Factor")
+    ax.grid(True)
+    return fig, "bar"
+
+
+def fig_residuals(df):
+    fit = _ols(df).fit()["Coefficient"].to_numpy()
+    X = np.column_stack([np.ones(len(df))] + _cols(df, *CONDITIONS))
+    (delta,) = _cols(df, "delta")
+    fitted = X @ fit
+    fig, ax = plt.subplots(figsize=(8, 5))
+    mode = points(ax, fitted, delta - fitted)
+    ax.axhline(0, color="k", linestyle="--")
+    ax.set(xlabel="Fitted Values", ylabel="Residuals", title="Residuals vs Fitted Values")
+    ax.grid(True)
+    return fig, mode
+
+
+def fig_delta_hist(df):
+    (delta,) = _cols(df, "delta")
+    fig, ax = plt.subplots(figsize=(8, 5))
+    histogram(ax, delta, color="slateblue")
+    ax.set(xlabel=LABELS["delta"], ylabel="Results", title="Distribution of Corrections")
+    ax.grid(True)
+    return fig, "histogram"
+
+
+# name -> (draw function, columns it reads)
+FIGURES = {
+    "raw_vs_neutral": (fig_raw_vs_neutral, ["perf", "t_neutral"]),
+    "wind_vs_delta": (_condition_figure("wind", "orange", "Effect of Wind on 100m Performance", True), ["wind", "delta"]),
+    "density_vs_delta": (_condition_figure("rho_air_abs", "green", "Effect of Air Density on Performance"),
+                         ["rho_air_abs", "delta"]),
+    "altitude_vs_delta": (_condition_figure("altitude_m", "purple", "Effect of Altitude on Performance"),
+                          ["altitude_m", "delta"]),
+    "delta_hist": (fig_delta_hist, ["delta"]),
+    "pairs": (fig_pairs, CONDITIONS + ["delta"]),
+    "coefficients": (fig_coefficients, CONDITIONS + ["delta"]),
+    "residuals": (fig_residuals, CONDITIONS + ["delta"]),
+}
+
+
+# --- rendering ---
+
+_SOURCE = {}
+
+
+def _init(path):
+    _SOURCE["path"] = path
+
+
+def render_one(task):
+    """Render one figure in the current process; returns its manifest entry."""
+    name, out_dir, formats = task
+    draw, columns = FIGURES[name]
+    t0 = time.perf_counter()
+    df = load_results(columns, path=_SOURCE.get("path", DEFAULT_PATH), dropna=True)
+    fig, mode = draw(df)
+    files = []
+    for fmt in formats:
+        target = Path(out_dir) / f"{name}.{fmt}"
+        fig.savefig(target, dpi=120, bbox_inches="tight")
+        files.append(target.name)
+    plt.close(fig)
+    return {"name": name, "files": files, "rows": len(df), "mode": mode,
+            "seconds": round(time.perf_counter() - t0, 3)}
+
+
+def render_report(path=DEFAULT_PATH, out_dir=OUTPUT_DIR, formats=FORMATS, names=None, workers=None):
+    """Render the selected figures (all by default) and write manifest.json. Returns the manifest."""
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    names = list(names or FIGURES)
+    tasks = [(n, str(out_dir), tuple(formats)) for n in names]
+    workers = min(workers or os.cpu_count() or 1, len(tasks))
+
+    t0 = time.perf_counter()
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init, initargs=(str(path),)) as pool:
+            entries = list(pool.map(render_one, tasks))
+    else:
+        _init(str(path))
+        entries = [render_one(t) for t in tasks]
+
+    manifest = {
+        "source": str(path),
+        "source_mtime": Path(path).stat().st_mtime,
+        "generated": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "seconds": round(time.perf_counter() - t0, 3),
+        "density_threshold": DENSITY_THRESHOLD,
+        "figures": entries,
+    }
+    (out_dir / "manifest.json").write_text(json.dumps(manifest, indent=2))
+    return manifest
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Render the analysis figures headlessly.")
+    ap.add_argument("--data", default=str(DEFAULT_PATH))
+    ap.add_argument("--out", default=str(OUTPUT_DIR))
+    ap.add_argument("--formats", nargs="+", default=list(FORMATS), choices=["png", "svg", "pdf"])
+    ap.add_argument("--figures", nargs="+", choices=list(FIGURES), default=None)
+    ap.add_argument("--workers", type=int, default=None)
+    args = ap.parse_args(argv)
+
+    manifest = render_report(args.data, args.out, args.formats, args.figures, args.workers)
+    for e in manifest["figures"]:
+        print(f"🖼️  {e['name']:<18} {e['mode']:<9} {e['rows']:>9,} rows  {e['seconds']:.2f} s")
+    print(f"✅ {len(manifest['figures'])} figures in {manifest['seconds']:.1f} s → {Path(args.out).resolve()}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,176 @@
+# src/features/results_dataset.py
+"""
+Shared read access to the processed results for notebooks and apps.
+
+Built on pyarrow datasets so a query reads only what it needs:
+- column projection (only the requested columns are decoded),
+- row filters (venue, year, wind / altitude ranges, not-null) pushed down
+  to Parquet row-group statistics,
+- derived columns such as delta = t_neutral − perf computed once and cached,
+- a streaming iterator over record batches for out-of-core work.
+
+Works on a single Parquet file or a hive-partitioned directory.
+
+    from results_dataset import load_results
+    df = load_results(["wind", "rho_air_abs", "altitude_m", "delta"], dropna=True)
+"""
+
+import datetime as dt
+from pathlib import Path
+
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+
+DEFAULT_PATH = Path("data/processed/results_physics_refined.parquet")
+
+# derived column -> (source columns, function of a DataFrame holding them)
+DERIVED = {
+    "delta": (["t_neutral", "perf"], lambda d: d["t_neutral"] - d["perf"]),
+}
+
+
+def _range(field, bounds):
+    lo, hi = bounds
+    expr = None
+    if lo is not None:
+        expr = ds.field(field) >= lo
+    if hi is not None:
+        upper = ds.field(field) <= hi
+        expr = upper if expr is None else expr & upper
+    return expr
+
+
+class ResultsDataset:
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = Path(path)
+        self._open()
+
+    def _open(self):
+        partitioning = "hive" if self.path.is_dir() else None
+        self.dataset = ds.dataset(self.path, format="parquet", partitioning=partitioning)
+        self.schema = self.dataset.schema
+        self._cache = {}
+        self._stamp = self._mtime()
+
+    def _mtime(self):
+        files = self.dataset.files
+        return max((Path(f).stat().st_mtime for f in files), default=0.0)
+
+    # --- filters ---
+
+    def filter(self, venue=None, competitor=None, year=None, wind=None, altitude=None, notnull=()):
+        """Build a dataset expression; ranges are (lo, hi) tuples with None for open ends.
+
+        year is an int, a list of ints or a (lo, hi) range. It is pushed down
+        via a `year` column when the data has one, and matched against the
+        'DD MON YYYY' date strings otherwise.
+        """
+        parts = []
+        if venue is not None:
+            parts.append(ds.field("venue").isin([venue] if isinstance(venue, str) else list(venue)))
+        if competitor is not None:
+            names = [competitor] if isinstance(competitor, str) else list(competitor)
+            parts.append(ds.field("competitor").isin(names))
+        if wind is not None:
+            parts.append(_range("wind", wind))
+        if altitude is not None:
+            parts.append(_range("altitude_m", altitude))
+        if year is not None:
+            parts.append(self._year_filter(year))
+        for c in notnull:
+            parts.append(ds.field(c).is_valid())
+
+        parts = [p for p in parts if p is not None]
+        if not parts:
+            return None
+        expr = parts[0]
+        for p in parts[1:]:
+            expr = expr & p
+        return expr
+
+    def _year_filter(self, year):
+        if isinstance(year, tuple):
+            lo, hi = year
+            years = list(range(lo or 1900, (hi or dt.date.today().year) + 1))
+        elif isinstance(year, int):
+            years = [year]
+        else:
+            years = list(year)
+        if "year" in self.schema.names:
+            return ds.field("year").isin(years)
+        expr = None
+        for y in years:
+            e = pc.ends_with(ds.field("date"), str(y))
+            expr = e if expr is None else expr | e
+        return expr
+
+    # --- reading ---
+
+    def _plan(self, columns):
+        """Physical columns to read for the requested (possibly derived) columns."""
+        columns = list(columns) if columns is not None else list(self.schema.names)
+        physical = []
+        for c in columns:
+            for src in (DERIVED[c][0] if c in DERIVED else [c]):
+                if src not in physical:
+                    physical.append(src)
+        return columns, physical
+
+    def _finish(self, df, columns, dropna):
+        for c in columns:
+            if c in DERIVED and c not in df.columns:
+                df[c] = DERIVED[c][1](df)
+        df = df[columns]
+        if dropna:
+            df = df.replace([float("inf"), float("-inf")], float("nan"))
+            df = df.dropna(subset=columns if dropna is True else list(dropna))
+        return df
+
+    def read(self, columns=None, dropna=False, **filters):
+        """DataFrame of the requested columns for rows matching the filters (cached).
+
+        dropna=True drops rows with missing values in any requested column;
+        a list restricts it to those columns. Physical not-null conditions
+        are pushed down into the scan as well.
+        """
+        if self._mtime() != self._stamp:
+            self._open()  # the dataset holds the old files' footers too
+
+        key = (tuple(columns or ()), repr(sorted(filters.items())), repr(dropna))
+        if key not in self._cache:
+            columns, physical = self._plan(columns)
+            if dropna:
+                wanted = columns if dropna is True else list(dropna)
+                filters.setdefault("notnull", [c for c in self._plan(wanted)[1]])
+            table = self.dataset.to_table(columns=physical, filter=self.filter(**filters))
+            self._cache[key] = self._finish(table.to_pandas(), columns, dropna)
+        return self._cache[key].copy()
+
+    def iter_batches(self, columns=None, dropna=False, batch_size=65_536, **filters):
+        """Stream DataFrames of at most batch_size rows; nothing is cached."""
+        columns, physical = self._plan(columns)
+        if dropna:
+            wanted = columns if dropna is True else list(dropna)
+            filters.setdefault("notnull", self._plan(wanted)[1])
+        scanner = self.dataset.scanner(columns=physical, filter=self.filter(**filters), batch_size=batch_size)
+        for batch in scanner.to_batches():
+            if batch.num_rows:
+                yield self._finish(batch.to_pandas(), columns, dropna)
+
+    def count(self, **filters):
+        return self.dataset.count_rows(filter=self.filter(**filters))
+
+
+_open = {}
+
+
+def open_results(path=DEFAULT_PATH):
+    """Shared ResultsDataset per path, so repeated loads hit the same cache."""
+    path = Path(path)
+    if path not in _open:
+        _open[path] = ResultsDataset(path)
+    return _open[path]
+
+
+def load_results(columns=None, path=DEFAULT_PATH, dropna=False, **filters):
+    return open_results(path).read(columns, dropna=dropna, **filters)
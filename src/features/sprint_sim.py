@@ -0,0 +1,199 @@
+# src/features/sprint_sim.py
+"""
+Batched ODE simulation of a sprint (acceleration, top speed, deceleration).
+
+Per unit body mass the runner obeys
+
+    dv/dt = f0 · (1 − v / v0) · exp(−t / tau)  −  k · (v − w) · |v − w|
+    k     = ½ · rho · CdA / m
+
+i.e. a linear force–velocity propulsive term that fades with fatigue, minus
+aerodynamic drag that depends on air density rho (kg/m³) and wind w (m/s,
+positive = tailwind). Every scenario (athlete × condition) is one element of
+a NumPy array and all of them are integrated together with fixed-step RK4,
+so thousands of races cost about as much as a few hundred array operations.
+"""
+
+from dataclasses import dataclass, asdict
+
+import numpy as np
+import pandas as pd
+
+RHO_REF = 1.225  # sea-level air density (kg/m³)
+
+
+@dataclass(frozen=True)
+class AthleteParams:
+    """Propulsive / body parameters of a (roughly 9.9 s) elite male sprinter."""
+    f0: float = 8.3          # max propulsive force per kg at v = 0 (N/kg)
+    v0: float = 13.2         # theoretical max velocity with no drag or fatigue (m/s)
+    tau: float = 12.0        # fatigue time constant (s)
+    mass_kg: float = 80.0
+    cd_a: float = 0.45       # drag coefficient × frontal area (m²)
+
+    def to_dict(self):
+        return asdict(self)
+
+
+DEFAULT_ATHLETE = AthleteParams()
+
+
+@dataclass
+class SimResult:
+    """Compact simulation output: summary metrics (n,) plus sampled curves (n, n_t)."""
+    t: np.ndarray             # curve sample times (n_t,)
+    velocity: np.ndarray      # (n, n_t) float32, m/s
+    acceleration: np.ndarray  # (n, n_t) float32, m/s²
+    race_time: np.ndarray     # s, incl. reaction time (NaN if the distance wasn't reached)
+    top_speed: np.ndarray     # m/s
+    t_top_speed: np.ndarray   # s after the gun
+    energy_j: np.ndarray      # propulsive mechanical work (J)
+    drag_energy_j: np.ndarray # work done against air (J)
+
+    @property
+    def efficiency(self):
+        """Share of propulsive work not lost to aerodynamic drag."""
+        return 1.0 - self.drag_energy_j / self.energy_j
+
+    def summary(self):
+        return pd.DataFrame({
+            "race_time": self.race_time,
+            "top_speed": self.top_speed,
+            "t_top_speed": self.t_top_speed,
+            "energy_j": self.energy_j,
+            "drag_energy_j": self.drag_energy_j,
+            "efficiency": self.efficiency,
+        })
+
+
+def _accel(v, drive, inv_v0, k, wind):
+    """dv/dt for the current propulsive drive f0·exp(−t/tau)."""
+    rel = v - wind
+    return drive * (1.0 - v * inv_v0) - k * rel * np.abs(rel)
+
+
+def simulate(f0=DEFAULT_ATHLETE.f0, v0=DEFAULT_ATHLETE.v0, tau=DEFAULT_ATHLETE.tau,
+             mass_kg=DEFAULT_ATHLETE.mass_kg, cd_a=DEFAULT_ATHLETE.cd_a,
+             wind=0.0, rho=RHO_REF, distance=100.0, reaction_time=0.0,
+             dt=0.01, t_max=20.0, curve_dt=0.1):
+    """Integrate all scenarios at once; every argument broadcasts to shape (n,).
+
+    Curves are sampled every curve_dt seconds until the slowest scenario
+    finishes; samples after a scenario's own finish are NaN.
+    """
+    f0, v0, tau, mass, cd_a, wind, rho, distance = np.broadcast_arrays(*(
+        np.atleast_1d(np.asarray(a, dtype=np.float64))
+        for a in (f0, v0, tau, mass_kg, cd_a, wind, rho, distance)
+    ))
+    n = f0.shape[0]
+    k = 0.5 * rho * cd_a / mass
+    inv_v0 = 1.0 / v0
+    half_decay = np.exp(-0.5 * dt / tau)  # fatigue factor over half a step
+
+    x = np.zeros(n)
+    v = np.zeros(n)
+    drive = f0.copy()        # f0 · exp(−t/tau), advanced multiplicatively
+    finish = np.full(n, np.nan)
+    running = np.ones(n, dtype=bool)
+    top_speed = np.zeros(n)
+    t_top = np.zeros(n)
+    work = np.zeros(n)       # per kg
+    drag_work = np.zeros(n)  # per kg
+
+    every = max(int(round(curve_dt / dt)), 1)
+    vel_curve, acc_curve, t_curve = [], [], []
+
+    n_steps = int(np.ceil(t_max / dt))
+    for i in range(n_steps):
+        t = i * dt
+        drive_half = drive * half_decay
+        drive_next = drive_half * half_decay
+
+        # classic RK4 on (x, v); dx/dt = v
+        k1 = _accel(v, drive, inv_v0, k, wind)
+        v2 = v + 0.5 * dt * k1
+        k2 = _accel(v2, drive_half, inv_v0, k, wind)
+        v3 = v + 0.5 * dt * k2
+        k3 = _accel(v3, drive_half, inv_v0, k, wind)
+        v4 = v + dt * k3
+        k4 = _accel(v4, drive_next, inv_v0, k, wind)
+        v_new = v + dt / 6 * (k1 + 2 * k2 + 2 * k3 + k4)
+        x_new = x + dt / 6 * (v + 2 * v2 + 2 * v3 + v4)
+
+        if i % every == 0:
+            t_curve.append(t)
+            vel_curve.append(np.where(running, v, np.nan).astype(np.float32))
+            acc_curve.append(np.where(running, k1, np.nan).astype(np.float32))
+
+        # energy bookkeeping (rectangle rule on power per kg), only while running
+        live = running * dt
+        rel = v - wind
+        work += np.maximum(drive * (1.0 - v * inv_v0), 0.0) * v * live
+        drag_work += k * rel * np.abs(rel) * v * live
+
+        # finish-line crossing, linearly interpolated inside the step
+        crossed = running & (x_new >= distance)
+        if crossed.any():
+            idx = np.flatnonzero(crossed)
+            frac = (distance[idx] - x[idx]) / (x_new[idx] - x[idx])
+            finish[idx] = t + frac * dt
+
+        faster = running & (v_new > top_speed)
+        top_speed[faster] = v_new[faster]
+        t_top[faster] = t + dt
+
+        running &= ~crossed
+        # finished scenarios keep integrating harmlessly; their outputs are masked
+        x, v, drive = x_new, v_new, drive_next
+        if not running.any():
+            break
+
+    return SimResult(
+        t=np.asarray(t_curve),
+        velocity=np.stack(vel_curve, axis=1),
+        acceleration=np.stack(acc_curve, axis=1),
+        race_time=finish + reaction_time,
+        top_speed=top_speed,
+        t_top_speed=t_top,
+        energy_j=work * mass,
+        drag_energy_j=drag_work * mass,
+    )
+
+
+def _take(result, idx):
+    """Rows idx of a SimResult (used to scatter deduplicated scenarios back)."""
+    return SimResult(
+        t=result.t,
+        velocity=result.velocity[idx],
+        acceleration=result.acceleration[idx],
+        race_time=result.race_time[idx],
+        top_speed=result.top_speed[idx],
+        t_top_speed=result.t_top_speed[idx],
+        energy_j=result.energy_j[idx],
+        drag_energy_j=result.drag_energy_j[idx],
+    )
+
+
+def simulate_frame(df, athlete=DEFAULT_ATHLETE, wind_col="wind", rho_col="rho_air_abs",
+                   dedupe=True, **kwargs):
+    """Simulate one scenario per row of df under that row's wind and air density.
+
+    Athlete parameters may be columns of df (f0, v0, tau, mass_kg, cd_a);
+    otherwise the values from `athlete` are used for every row. With dedupe,
+    identical scenarios (same wind, density and athlete) are integrated once,
+    which on an archive with 0.1 m/s wind readings and per-venue-day weather
+    cuts the work by orders of magnitude without changing any result.
+    """
+    cols = {name: df[name].to_numpy(dtype=np.float64) if name in df.columns
+            else np.full(len(df), value, dtype=np.float64)
+            for name, value in athlete.to_dict().items()}
+    cols["wind"] = df[wind_col].to_numpy(dtype=np.float64)
+    cols["rho"] = df[rho_col].to_numpy(dtype=np.float64)
+
+    if not dedupe:
+        return simulate(**cols, **kwargs)
+
+    names = list(cols)
+    unique, inverse = np.unique(np.column_stack([cols[c] for c in names]), axis=0, return_inverse=True)
+    result = simulate(**{c: unique[:, j] for j, c in enumerate(names)}, **kwargs)
+    return _take(result, inverse.ravel())
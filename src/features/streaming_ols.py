@@ -0,0 +1,225 @@
+# src/features/streaming_ols.py
+"""
+Out-of-core OLS from streamed sufficient statistics.
+
+OLSAccumulator keeps the count, the means and the centred co-moment
+matrices of (x, y). Batches are folded in with the pairwise update of Chan
+et al., which stays accurate where raw X'X sums would cancel badly
+(altitude_m is in the thousands, the deltas are hundredths of a second).
+Accumulators from different files or processes merge the same way.
+
+From the statistics alone it gives coefficients, standard errors, t / p
+values, R² and VIFs (the diagonal of the inverse correlation matrix), with
+no second pass over the data.
+
+accumulate() keeps one accumulator per Parquet file in a JSON state file.
+A rerun after new files are appended reads only those files; rewritten
+files are re-read and deleted ones dropped.
+
+    python src/features/streaming_ols.py [dataset_or_file]
+"""
+
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow.dataset as ds
+from scipy import stats
+
+from results_dataset import DEFAULT_PATH, ResultsDataset
+
+REGRESSORS = ["wind", "rho_air_abs", "altitude_m"]
+TARGET = "delta"
+STATE_PATH = Path("data/processed/.pipeline/ols_state.json")
+
+
+class OLSAccumulator:
+    """Running sufficient statistics of y ~ 1 + x for a fixed set of regressors."""
+
+    def __init__(self, regressors=REGRESSORS, target=TARGET):
+        self.regressors = list(regressors)
+        self.target = target
+        p = len(self.regressors)
+        self.n = 0
+        self.mean = np.zeros(p + 1)          # [x..., y]
+        self.comoment = np.zeros((p + 1, p + 1))
+
+    # --- accumulation ---
+
+    def _merge_stats(self, n, mean, comoment):
+        if n == 0:
+            return self
+        if self.n == 0:
+            self.n, self.mean, self.comoment = n, mean.copy(), comoment.copy()
+            return self
+        total = self.n + n
+        d = mean - self.mean
+        self.comoment += comoment + np.outer(d, d) * (self.n * n / total)
+        self.mean += d * (n / total)
+        self.n = total
+        return self
+
+    def update(self, df):
+        """Fold in a DataFrame batch; rows with missing or infinite values are skipped."""
+        Z = df[self.regressors + [self.target]].to_numpy(dtype=np.float64)
+        Z = Z[np.isfinite(Z).all(axis=1)]
+        if len(Z) == 0:
+            return self
+        mean = Z.mean(axis=0)
+        C = Z - mean
+        return self._merge_stats(len(Z), mean, C.T @ C)
+
+    def merge(self, other):
+        if other.regressors != self.regressors or other.target != self.target:
+            raise ValueError("Cannot merge accumulators over different variables")
+        return self._merge_stats(other.n, other.mean, other.comoment)
+
+    # --- results ---
+
+    @property
+    def _sxx(self):
+        return self.comoment[:-1, :-1]
+
+    def fit(self):
+        """Coefficient table (const first) with SE, t, p; R² and n in the attrs."""
+        p = len(self.regressors)
+        dof = self.n - p - 1
+        if dof <= 0:
+            raise ValueError(f"Need more than {p + 1} observations, have {self.n}")
+        sxx, sxy, syy = self._sxx, self.comoment[:-1, -1], self.comoment[-1, -1]
+        sxx_inv = np.linalg.pinv(sxx)  # pinv, as statsmodels, so a constant regressor does not abort the fit
+        slopes = sxx_inv @ sxy
+        mx, my = self.mean[:-1], self.mean[-1]
+
+        rss = max(syy - sxy @ slopes, 0.0)
+        sigma2 = rss / dof
+        var_const = sigma2 * (1.0 / self.n + mx @ sxx_inv @ mx)
+        se = np.sqrt(np.concatenate([[var_const], sigma2 * np.diag(sxx_inv)]))
+        coef = np.concatenate([[my - mx @ slopes], slopes])
+        with np.errstate(divide="ignore", invalid="ignore"):
+            t = coef / se
+
+        out = pd.DataFrame({
+            "Variable": ["const"] + self.regressors,
+            "Coefficient": coef,
+            "Std_Error": se,
+            "t_value": t,
+            "P_value": 2 * stats.t.sf(np.abs(t), dof),
+        })
+        out.attrs.update(n=self.n, r_squared=1.0 - rss / syy if syy > 0 else np.nan, sigma=np.sqrt(sigma2))
+        return out
+
+    def vif(self):
+        """Variance inflation factors 1 / (1 − R²ⱼ) from the correlation matrix.
+
+        R²ⱼ regresses regressor j on the others through a pseudo-inverse, so a
+        collinear set gives inf instead of raising; a constant regressor gets NaN.
+        """
+        sd = np.sqrt(np.diag(self._sxx))
+        live = sd > 1e-10 * np.sqrt(max(self.n, 1)) * np.maximum(np.abs(self.mean[:-1]), 1.0)  # not constant
+        with np.errstate(divide="ignore", invalid="ignore"):
+            corr = self._sxx / np.outer(sd, sd)
+        out = np.full(len(sd), np.nan)
+        for j in np.flatnonzero(live):
+            others = np.flatnonzero(live & (np.arange(len(sd)) != j))
+            r = corr[others, j]
+            r2 = r @ np.linalg.pinv(corr[np.ix_(others, others)]) @ r if len(others) else 0.0
+            out[j] = 1.0 / (1.0 - r2) if 1.0 - r2 > 1e-12 else np.inf
+        return pd.DataFrame({"feature": self.regressors, "VIF": out})
+
+    # --- persistence ---
+
+    def to_dict(self):
+        return {"regressors": self.regressors, "target": self.target, "n": self.n,
+                "mean": self.mean.tolist(), "comoment": self.comoment.tolist()}
+
+    @classmethod
+    def from_dict(cls, d):
+        acc = cls(d["regressors"], d["target"])
+        acc.n = d["n"]
+        acc.mean = np.asarray(d["mean"], dtype=np.float64)
+        acc.comoment = np.asarray(d["comoment"], dtype=np.float64)
+        return acc
+
+
+def predict(fit, df):
+    """Fitted values for df from a coefficient table returned by OLSAccumulator.fit()."""
+    coef = fit.set_index("Variable")["Coefficient"]
+    out = np.full(len(df), coef["const"])
+    for name, c in coef.drop("const").items():
+        out += c * df[name].to_numpy(dtype=np.float64, na_value=np.nan)
+    return out
+
+
+def accumulate_file(path, regressors=REGRESSORS, target=TARGET, batch_size=65_536):
+    """Accumulator over one Parquet file, streamed batch by batch."""
+    acc = OLSAccumulator(regressors, target)
+    columns = list(regressors) + [target]
+    for batch in ResultsDataset(path).iter_batches(columns, dropna=True, batch_size=batch_size):
+        acc.update(batch)
+    return acc
+
+
+def _accumulate_job(args):
+    path, regressors, target = args
+    return path, accumulate_file(path, regressors, target).to_dict()
+
+
+def _fingerprint(path):
+    st = Path(path).stat()
+    return f"{st.st_size}:{st.st_mtime_ns}"
+
+
+def accumulate(path=DEFAULT_PATH, regressors=REGRESSORS, target=TARGET, state_path=STATE_PATH, workers=None):
+    """Accumulator over every file of a dataset, re-reading only files changed since state_path.
+
+    Returns (accumulator, number of files read).
+    """
+    path = Path(path)
+    files = sorted(ds.dataset(path, format="parquet").files) if path.is_dir() else [str(path)]
+    key = {"regressors": list(regressors), "target": target}
+
+    state = {}
+    if state_path and Path(state_path).exists():
+        saved = json.loads(Path(state_path).read_text())
+        if saved.get("key") == key:
+            state = saved["files"]
+    state = {f: s for f, s in state.items() if f in files}
+
+    todo = [f for f in files if f not in state or state[f]["fingerprint"] != _fingerprint(f)]
+    jobs = [(f, list(regressors), target) for f in todo]
+    workers = workers or os.cpu_count() or 1
+    if workers > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+            done = list(pool.map(_accumulate_job, jobs))
+    else:
+        done = [_accumulate_job(j) for j in jobs]
+    for f, acc in done:
+        state[f] = {"fingerprint": _fingerprint(f), "acc": acc}
+
+    total = OLSAccumulator(regressors, target)
+    for f in files:
+        total.merge(OLSAccumulator.from_dict(state[f]["acc"]))
+
+    if state_path:
+        Path(state_path).parent.mkdir(parents=True, exist_ok=True)
+        Path(state_path).write_text(json.dumps({"key": key, "files": state}))
+    return total, len(todo)
+
+
+def main(path=DEFAULT_PATH):
+    acc, n_read = accumulate(path)
+    print(f"📥 {n_read} file(s) read, {acc.n} observations accumulated")
+    fit = acc.fit()
+    print(fit.to_string(index=False))
+    print(f"R² = {fit.attrs['r_squared']:.4f}")
+    print("\n🔍 Variance Inflation Factors:")
+    print(acc.vif().to_string(index=False))
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:])
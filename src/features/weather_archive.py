@@ -0,0 +1,378 @@
+# src/features/weather_archive.py
+"""
+Offline hourly weather archive: (location, hour) → temperature, pressure, humidity.
+
+Hourly ERA5 values are imported in bulk once. They are stored as one
+float32 block of HOURS_PER_BLOCK hours per (location, calendar year):
+
+    data/processed/weather_archive/
+        index.parquet     lat, lon, year → block row
+        temp_c.npy        (n_blocks, 8784) float32, opened with mmap_mode="r"
+        pressure_hpa.npy
+        rh_pct.npy
+
+Locations are venue coordinates rounded to the response-cache grid, so
+venues that share a stadium share a series. Lookups are vectorized. Each
+row's (location, year) key is binary-searched in the sorted block index,
+and values are gathered straight from the memory-mapped arrays. Only the
+pages that are touched get read.
+
+- sample(): linear interpolation between the two hours around a UTC
+  timestamp (race start),
+- daily(): the mean of the 24 UTC hours of a date, the fallback when the
+  start time isn't known.
+
+The hourly path is dormant for now: the toplists the scraper reads carry
+no start time, so nothing in ingest/clean produces race_time or
+utc_offset_h, and every row takes the daily mean. sample() and
+race_start_utc() are ready for a start-time source once one is added.
+
+attach_hourly_weather() joins both onto a results frame in memory.
+attach_weather() is what the enrichment stages call. It uses the archive
+when there is one and sends only the rows it can't cover to the ERA5 daily
+API. The pipeline doesn't fingerprint the archive, so rerun the weather
+stages with --force after an import.
+
+    python src/features/weather_archive.py import data/processed/results_altitude_density.parquet
+    python src/features/weather_archive.py info
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from api_cache import GRID_DECIMALS, weather_key
+from bulk_weather import attach_daily_weather, date_spans, to_iso_dates
+from npy_store import append_rows
+
+ARCHIVE_DIR = Path("data/processed/weather_archive")
+ERA5 = "https://archive-api.open-meteo.com/v1/era5"
+HOURS_PER_BLOCK = 366 * 24
+# ERA5 hourly variable → archive column (surface pressure is already hPa)
+HOURLY_VARS = {
+    "temperature_2m": "temp_c",
+    "surface_pressure": "pressure_hpa",
+    "relative_humidity_2m": "rh_pct",
+}
+COLUMNS = list(HOURLY_VARS.values())
+YEAR_STRIDE = 10_000  # block key = location * YEAR_STRIDE + year
+
+
+def location_keys(lat, lon):
+    """Grid-rounded (lat, lon) pairs as two float arrays."""
+    return (np.round(np.asarray(lat, dtype=np.float64), GRID_DECIMALS),
+            np.round(np.asarray(lon, dtype=np.float64), GRID_DECIMALS))
+
+
+def grid_key(lat, lon):
+    """One int64 per grid cell (-1 where a coordinate is missing), for fast factorizing."""
+    scale = 10 ** GRID_DECIMALS
+    lat, lon = np.asarray(lat, dtype=np.float64), np.asarray(lon, dtype=np.float64)
+    ok = np.isfinite(lat) & np.isfinite(lon)
+    la = np.rint(np.where(ok, lat, 0) * scale).astype(np.int64) + 90 * scale
+    lo = np.rint(np.where(ok, lon, 0) * scale).astype(np.int64) + 180 * scale
+    return np.where(ok, la * (360 * scale + 1) + lo, -1)
+
+
+def hours_since_epoch(when):
+    """datetime-like (UTC) → float hours since 1970-01-01, NaN for missing."""
+    t = pd.to_datetime(pd.Series(when), utc=True, errors="coerce")
+    return (t.dt.tz_localize(None) - pd.Timestamp(0)).dt.total_seconds().to_numpy(dtype=np.float64,
+                                                                                 na_value=np.nan) / 3600
+
+
+def _year_and_offset(hours):
+    """Integer epoch hours → (calendar year, hour within that year)."""
+    t = hours.astype("datetime64[h]")
+    year_start = t.astype("datetime64[Y]")
+    return year_start.astype(np.int64) + 1970, (t - year_start.astype("datetime64[h]")).astype(np.int64)
+
+
+class WeatherArchive:
+    def __init__(self, path=ARCHIVE_DIR):
+        self.path = Path(path)
+        index = pd.read_parquet(self.path / "index.parquet")
+        self.locations = index[["lat", "lon"]].drop_duplicates().reset_index(drop=True)
+        self._loc_id = dict(zip(grid_key(self.locations["lat"], self.locations["lon"]).tolist(),
+                                range(len(self.locations))))
+        loc = self._location_ids(index["lat"], index["lon"])
+        keys = loc * YEAR_STRIDE + index["year"].to_numpy(dtype=np.int64)
+        order = np.argsort(keys)
+        self._keys, self._blocks = keys[order], index["block"].to_numpy(dtype=np.int64)[order]
+        self.arrays = {c: np.load(self.path / f"{c}.npy", mmap_mode="r") for c in COLUMNS}
+
+    @staticmethod
+    def exists(path=ARCHIVE_DIR):
+        return (Path(path) / "index.parquet").exists()
+
+    def __len__(self):
+        return len(self._keys)
+
+    # --- lookups ---
+
+    def _location_ids(self, lat, lon):
+        """Location id per row, -1 where the archive has no such location."""
+        codes, uniq = pd.factorize(grid_key(lat, lon))
+        ids = np.array([self._loc_id.get(k, -1) for k in uniq.tolist()], dtype=np.int64)
+        return ids[codes] if len(ids) else np.full(len(codes), -1, dtype=np.int64)
+
+    def _blocks_for(self, loc, hours):
+        """(block row, hour within block, found) for whole epoch hours."""
+        ok = (loc >= 0) & np.isfinite(hours)
+        year, offset = _year_and_offset(np.where(ok, hours, 0).astype(np.int64))
+        keys = loc * YEAR_STRIDE + year
+        pos = np.minimum(np.searchsorted(self._keys, keys), len(self._keys) - 1)
+        ok &= self._keys[pos] == keys
+        return self._blocks[pos], offset, ok
+
+    def _at(self, loc, hours):
+        """Values at whole epoch hours; NaN where location, year or value is missing."""
+        block, offset, ok = self._blocks_for(loc, hours)
+        out = {}
+        for c, arr in self.arrays.items():
+            v = np.full(len(ok), np.nan)
+            v[ok] = arr[block[ok], offset[ok]]
+            out[c] = v
+        return out
+
+    def sample(self, lat, lon, when):
+        """Hourly values linearly interpolated to UTC timestamps `when` → DataFrame(temp_c, pressure_hpa, rh_pct)."""
+        loc = self._location_ids(lat, lon)
+        hours = hours_since_epoch(when)
+        h0 = np.floor(hours)
+        frac = hours - h0
+        v0, v1 = self._at(loc, h0), self._at(loc, h0 + 1)
+        return pd.DataFrame({c: v0[c] + (v1[c] - v0[c]) * frac for c in COLUMNS})
+
+    def daily(self, lat, lon, dates):
+        """Mean of the 24 UTC hours of each date (NaN unless all 24 are present)."""
+        loc = self._location_ids(lat, lon)
+        block, offset, ok = self._blocks_for(loc, np.floor(hours_since_epoch(dates)))  # a UTC day never spans two years
+        rows, cols = block[ok, None], offset[ok, None] + np.arange(24)
+        out = {}
+        for c, arr in self.arrays.items():
+            v = np.full(len(ok), np.nan)
+            v[ok] = arr[rows, cols].mean(axis=1, dtype=np.float64)
+            out[c] = v
+        return pd.DataFrame(out)
+
+    def coverage(self):
+        """Years stored per location."""
+        index = pd.read_parquet(self.path / "index.parquet")
+        return index.groupby(["lat", "lon"])["year"].agg(["min", "max", "count"]).reset_index()
+
+
+def open_archive(path=ARCHIVE_DIR):
+    """The archive at path, or None if nothing has been imported yet."""
+    return WeatherArchive(path) if WeatherArchive.exists(path) else None
+
+
+# ---------- race-time join ----------
+
+def race_start_utc(df, date_col="iso_date", time_col="race_time", lon_col="lon", offset_col="utc_offset_h"):
+    """UTC start time per row, NaT where the local start time is unknown.
+
+    race_time is a local 'HH:MM'. The UTC offset comes from an offset column
+    when present, otherwise from mean solar time (lon / 15 h, ignoring
+    daylight saving).
+    """
+    if time_col not in df.columns:
+        return pd.Series(pd.NaT, index=df.index, dtype="datetime64[ns]")
+    day = _parse_distinct(df[date_col], "%Y-%m-%d")
+    clock = _parse_distinct(df[time_col], "%H:%M") - pd.Timestamp("1900-01-01")
+    if offset_col in df.columns:
+        offset = pd.to_numeric(df[offset_col], errors="coerce").to_numpy(dtype=np.float64)
+    else:
+        offset = np.round(pd.to_numeric(df[lon_col], errors="coerce").to_numpy(dtype=np.float64) / 15)
+    return pd.Series(day + clock - pd.to_timedelta(offset, unit="h"), index=df.index)
+
+
+def _parse_distinct(values, fmt):
+    """pd.to_datetime(values, format=fmt) computed once per distinct string."""
+    codes, uniq = pd.factorize(pd.Series(values).astype(object))
+    parsed = pd.to_datetime(pd.Series(uniq, dtype=object), format=fmt, errors="coerce").to_numpy()
+    out = np.full(len(codes), np.datetime64("NaT"), dtype=parsed.dtype if len(parsed) else "datetime64[ns]")
+    out[codes >= 0] = parsed[codes[codes >= 0]]
+    return pd.DatetimeIndex(out)
+
+
+def attach_hourly_weather(df, archive, lat_col="lat", lon_col="lon", date_col="iso_date", time_col="race_time"):
+    """Add temp_c / pressure_hpa / rh_pct from the archive plus weather_source ('hourly', 'daily' or None).
+
+    Rows with a known start time get values interpolated to that time.
+    Others, and timed rows the archive can't cover, get the daily mean.
+    Today's results have no race_time column, so every row is 'daily'.
+    """
+    out = df.reset_index(drop=True)
+    lat, lon = out[lat_col].to_numpy(dtype=np.float64), out[lon_col].to_numpy(dtype=np.float64)
+    start = race_start_utc(out, date_col, time_col, lon_col)
+    values = archive.sample(lat, lon, start)
+    use_hourly = values.notna().all(axis=1).to_numpy()
+
+    rest = np.flatnonzero(~use_hourly)
+    if len(rest):
+        dates = _parse_distinct(out[date_col].iloc[rest], "%Y-%m-%d")
+        values.iloc[rest] = archive.daily(lat[rest], lon[rest], dates).to_numpy()
+    use_daily = ~use_hourly & values.notna().all(axis=1).to_numpy()
+
+    for c in COLUMNS:
+        out[c] = values[c].to_numpy()
+    out["weather_source"] = np.where(use_hourly, "hourly", np.where(use_daily, "daily", None))
+    return out
+
+
+def attach_weather(df, fetch, daily_vars, archive=None):
+    """Weather for the enrichment stages: archive first, ERA5 daily API for whatever it can't cover.
+
+    daily_vars maps ERA5 daily variables to temp_c / pressure_hpa / rh_pct
+    for the fallback. weather_source records which path filled each row.
+    """
+    archive = archive if archive is not None else open_archive(ARCHIVE_DIR)
+    if archive is None:
+        out = attach_daily_weather(df, fetch, list(daily_vars)).rename(columns=daily_vars)
+        out["weather_source"] = np.where(out[COLUMNS].notna().all(axis=1), "era5_daily", None)
+        return out
+
+    out = attach_hourly_weather(df, archive)
+    miss = out["weather_source"].isna().to_numpy()
+    if miss.any():
+        print(f"🗄️  archive covers {int((~miss).sum())} rows; {int(miss.sum())} go to the ERA5 daily API")
+        rest = attach_daily_weather(out[miss].drop(columns=COLUMNS + ["weather_source"]), fetch,
+                                    list(daily_vars)).rename(columns=daily_vars)
+        out.loc[miss, COLUMNS] = rest[COLUMNS].to_numpy()
+        out.loc[miss, "weather_source"] = np.where(rest[COLUMNS].notna().all(axis=1), "era5_daily", None)
+    return out
+
+
+# ---------- bulk import ----------
+
+def hourly_request(lat, lon, start_date, end_date):
+    """(url, params, cache key) for one location's hourly series over a span."""
+    params = {
+        "latitude": lat,
+        "longitude": lon,
+        "start_date": start_date,
+        "end_date": end_date,
+        "hourly": list(HOURLY_VARS),
+        "timezone": "UTC",
+    }
+    return ERA5, params, weather_key(lat, lon, start_date, end_date, ["hourly"] + list(HOURLY_VARS))
+
+
+def hourly_frame(js):
+    """ERA5 hourly JSON → DataFrame(time, temp_c, pressure_hpa, rh_pct), or None."""
+    hourly = (js or {}).get("hourly", {})
+    if not hourly:
+        return None
+    out = pd.DataFrame({HOURLY_VARS[v]: hourly.get(v) for v in HOURLY_VARS}, dtype=np.float64)
+    out["time"] = pd.to_datetime(hourly["time"])
+    return out
+
+
+def import_frame(hourly, path=ARCHIVE_DIR):
+    """Merge an hourly frame (lat, lon, time [UTC], temp_c, pressure_hpa, rh_pct) into the archive.
+
+    New values overwrite stored ones for the same hours; everything else is kept.
+    Stored blocks are updated in place through a writable memory map and new
+    blocks are appended to the .npy files, so an import touches only the
+    blocks it writes. Returns the number of (location, year) blocks written.
+    """
+    path = Path(path)
+    h = hourly.dropna(subset=["lat", "lon", "time"]).copy()
+    if h.empty:
+        return 0
+    h["lat"], h["lon"] = location_keys(h["lat"], h["lon"])
+    epoch_h = hours_since_epoch(h["time"]).astype(np.int64)
+    h["year"], h["offset"] = _year_and_offset(epoch_h)
+
+    if WeatherArchive.exists(path):
+        index = pd.read_parquet(path / "index.parquet")
+    else:
+        index = pd.DataFrame({"lat": pd.Series(dtype="float64"), "lon": pd.Series(dtype="float64"),
+                              "year": pd.Series(dtype="int64"), "block": pd.Series(dtype="int64")})
+
+    blocks = h[["lat", "lon", "year"]].drop_duplicates()
+    blocks = blocks.merge(index, on=["lat", "lon", "year"], how="left")
+    new = blocks["block"].isna()
+    blocks.loc[new, "block"] = len(index) + np.arange(int(new.sum()))
+    blocks["block"] = blocks["block"].astype(np.int64)
+
+    row = h.merge(blocks, on=["lat", "lon", "year"], how="left")["block"].to_numpy()
+    offset = h["offset"].to_numpy()
+    stored = row < len(index)
+    new_row = row[~stored] - len(index)
+
+    path.mkdir(parents=True, exist_ok=True)
+    for c in COLUMNS:
+        values = h[c].to_numpy(dtype=np.float32)
+        if stored.any():
+            arr = np.load(path / f"{c}.npy", mmap_mode="r+")
+            arr[row[stored], offset[stored]] = values[stored]
+            arr.flush()
+            del arr
+        if new.any():
+            pad = np.full((int(new.sum()), HOURS_PER_BLOCK), np.nan, dtype=np.float32)
+            pad[new_row, offset[~stored]] = values[~stored]
+            append_rows(path / f"{c}.npy", pad, at=len(index))
+    if new.any():  # the index goes last: blocks it names always exist
+        index = pd.concat([index, blocks.loc[new, ["lat", "lon", "year", "block"]]], ignore_index=True)
+        index.to_parquet(path / "index.parquet", index=False)
+    return len(blocks)
+
+
+def import_for_results(df, fetch, path=ARCHIVE_DIR):
+    """Fetch and import hourly ERA5 for every location/date span the results need."""
+    need = pd.DataFrame({"iso_date": to_iso_dates(df["date"]) if "iso_date" not in df.columns else df["iso_date"]})
+    need["lat"], need["lon"] = location_keys(df["lat"], df["lon"])
+    need = need.dropna()
+    if WeatherArchive.exists(path):  # skip dates whose whole day is already stored
+        have = WeatherArchive(path).daily(need["lat"], need["lon"], need["iso_date"]).notna().all(axis=1)
+        need = need[~have.to_numpy()]
+
+    locs, jobs = [], []
+    for (lat, lon), dates in need.groupby(["lat", "lon"], sort=False)["iso_date"]:
+        for start, end in date_spans(dates):
+            locs.append((lat, lon))
+            jobs.append(hourly_request(lat, lon, start, end))
+    print(f"🌦️  {len(jobs)} hourly ERA5 requests for {len(set(locs))} locations")
+
+    frames = []
+    for (lat, lon), js in zip(locs, fetch.map(jobs)):
+        f = hourly_frame(js)
+        if f is None:
+            print(f"⚠️  No hourly weather for ({lat:.3f}, {lon:.3f})")
+            continue
+        frames.append(f.assign(lat=lat, lon=lon))
+    if not frames:
+        return 0
+    return import_frame(pd.concat(frames, ignore_index=True), path)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Build or inspect the offline hourly weather archive.")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    imp = sub.add_parser("import", help="fetch hourly ERA5 for the venues/dates of a results file")
+    imp.add_argument("results", help="Parquet file with lat, lon and date columns")
+    sub.add_parser("info", help="show what the archive covers")
+    args = ap.parse_args(argv)
+
+    if args.cmd == "import":
+        from fetch_executor import open_fetcher
+        with open_fetcher() as fetch:
+            n = import_for_results(pd.read_parquet(args.results), fetch)
+        print(f"💾 {n} location-years written → {ARCHIVE_DIR.resolve()}")
+    else:
+        archive = open_archive()
+        if archive is None:
+            print("📭 No weather archive yet; run the import command first.")
+            return
+        cov = archive.coverage()
+        print(f"📚 {len(archive)} location-years, {len(cov)} locations")
+        print(cov.to_string(index=False))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -1,49 +1,239 @@
 # src/ingest/scrape_results.py
 """
-Fetches 100 m results from World Athletics,
-cleans the table, and saves it as Parquet.
-"""
+Fetches sprint results from the World Athletics toplists,
+parses the tables, and appends unseen results to a partitioned dataset.
 
-import requests
-from bs4 import BeautifulSoup
-import pandas as pd
-from pathlib import Path
+Crawls every page of every requested list (event × sex × age group ×
+season or all-time) concurrently over one pooled session, parses the HTML
+with lxml, and writes only results whose stable result hash is not already
+stored. results.parquet is then refreshed as a snapshot of the dataset.
 
-URL = "https://worldathletics.org/records/all-time-toplists/sprints/100-metres/outdoor/men/senior"
+    python src/ingest/scrape_results.py
+    python src/ingest/scrape_results.py --events 100-metres 200-metres --sexes men women --seasons 2023 2024
+"""
 
-print("Fetching data...")
+import argparse
+import hashlib
+import sys
+import time
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
 
-# Fetch the page
-response = requests.get(URL, headers={"User-Agent": "Mozilla/5.0"})
-response.raise_for_status()
+import lxml.html
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
 
-soup = BeautifulSoup(response.text, "lxml")
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "features"))
+from fetch_executor import FetchExecutor  # noqa: E402
 
-# Extract all table rows
-rows = soup.select("table tbody tr")
-data = []
-for row in rows:
-    cols = [c.get_text(strip=True) for c in row.select("td")]
-    if cols:
-        data.append(cols)
+BASE = "https://worldathletics.org/records"
+OUTPUT_PATH = Path("data/processed/results.parquet")
+DATASET_PATH = Path("data/raw/results")
+PARTITIONS = ["event", "sex"]
+MAX_PAGES = 200  # safety stop per list
 
-# Convert to DataFrame
-df = pd.DataFrame(data)
+EVENT_GROUPS = {
+    "60-metres": "sprints",
+    "100-metres": "sprints",
+    "200-metres": "sprints",
+    "400-metres": "sprints",
+    "100-metres-hurdles": "hurdles",
+    "110-metres-hurdles": "hurdles",
+    "400-metres-hurdles": "hurdles",
+}
 
-# Assign column names safely
 possible_cols = [
     "rank", "perf", "wind", "competitor", "dob",
     "nat", "pos", "venue", "date", "resultscore", "competition"
 ]
-if len(df.columns) <= len(possible_cols):
-    df.columns = possible_cols[:len(df.columns)]
+# cells that identify a result; rank is left out because it shifts as lists grow
+IDENTITY_COLS = ["event", "sex", "age_group", "environment",
+                 "perf", "wind", "competitor", "dob", "nat", "pos", "venue", "date", "competition"]
+
+
+@dataclass(frozen=True)
+class ToplistSpec:
+    """One toplist: all-time when season is None, otherwise a single season."""
+    event: str = "100-metres"
+    sex: str = "men"
+    age_group: str = "senior"
+    environment: str = "outdoor"
+    season: int = None
+
+    def url(self):
+        group = EVENT_GROUPS.get(self.event, "sprints")
+        path = f"{group}/{self.event}/{self.environment}/{self.sex}/{self.age_group}"
+        if self.season is None:
+            return f"{BASE}/all-time-toplists/{path}"
+        return f"{BASE}/toplists/{path}/{self.season}"
+
+    def page_request(self, page):
+        params = {"regionType": "world", "page": page, "bestResultsOnly": "false"}
+        return self.url(), params, f"{self.url()}?page={page}"
+
+
+def frontier(events=("100-metres",), sexes=("men",), age_groups=("senior",),
+             seasons=(None,), environment="outdoor"):
+    """Every list to crawl, from the cartesian product of the parameters."""
+    return [ToplistSpec(e, s, a, environment, y)
+            for e in events for s in sexes for a in age_groups for y in seasons]
+
+
+def parse_page(html):
+    """Table rows of one toplist page as lists of cell strings (lxml, no BeautifulSoup)."""
+    if not html:
+        return []
+    tree = lxml.html.fromstring(html)
+    rows = []
+    for tr in tree.xpath("//table//tbody/tr"):
+        cols = ["".join(t.strip() for t in td.itertext()) for td in tr.xpath("./td")]
+        if cols:
+            rows.append(cols)
+    return rows
+
+
+def rows_to_frame(rows, spec):
+    df = pd.DataFrame(rows)
+    # Assign column names safely
+    if len(df.columns) <= len(possible_cols):
+        df.columns = possible_cols[:len(df.columns)]
+    for c in possible_cols:
+        if c not in df.columns:
+            df[c] = None
+    df["event"] = spec.event
+    df["sex"] = spec.sex
+    df["age_group"] = spec.age_group
+    df["environment"] = spec.environment
+    df["season"] = spec.season
+    return df
+
+
+def result_ids(df):
+    """Stable per-result hash over the identifying cells."""
+    joined = df[IDENTITY_COLS].astype("string").fillna("").agg("|".join, axis=1)
+    return joined.map(lambda s: hashlib.sha1(s.encode()).hexdigest()[:16])
+
+
+def crawl(specs, fetch, max_pages=MAX_PAGES):
+    """Fetch all pages of all lists, one wave of concurrent pages per list at a time.
+
+    A list is finished at its first page whose result table is empty. A page
+    that still fails after the executor's retries (None) is logged and
+    skipped, and the list goes on; only a wave in which every page of a list
+    fails stops it, so an unreachable list isn't polled up to max_pages.
+    """
+    wave = fetch.max_workers
+    next_page = {spec: 1 for spec in specs}
+    pages, failed = {}, []
+    while next_page:
+        jobs, owners = [], []
+        for spec, start in next_page.items():
+            for page in range(start, min(start + wave, max_pages + 1)):
+                jobs.append(spec.page_request(page))
+                owners.append((spec, page))
+
+        done, answered = set(), set()
+        for (spec, page), html in zip(owners, fetch.map(jobs, text=True)):
+            if html is None:
+                failed.append((spec, page))
+                print(f"⚠️  {spec.url()} page {page} failed; skipped")
+                continue
+            answered.add(spec)
+            rows = parse_page(html)
+            if rows:
+                pages[(spec, page)] = rows
+            else:
+                done.add(spec)
+        for spec in list(next_page):
+            next_page[spec] += wave
+            if spec not in answered:
+                print(f"❌ {spec.url()}: a whole wave of pages failed; giving up on this list")
+            if spec in done or spec not in answered or next_page[spec] > max_pages:
+                del next_page[spec]
+        print(f"📄 {len(pages)} pages fetched, {len(failed)} failed, {len(next_page)} lists still open")
+
+    frames = [rows_to_frame(pages[k], k[0]) for k in sorted(pages, key=lambda k: (specs.index(k[0]), k[1]))]
+    if not frames:
+        return pd.DataFrame(columns=possible_cols + ["event", "sex", "age_group", "environment", "season"])
+    df = pd.concat(frames, ignore_index=True)
+    df["result_id"] = result_ids(df)
+    return df.drop_duplicates("result_id").reset_index(drop=True)
+
+
+def stored_ids(dataset_path=DATASET_PATH):
+    if not Path(dataset_path).exists():
+        return set()
+    dataset = ds.dataset(dataset_path, format="parquet", partitioning="hive")
+    return set(dataset.to_table(columns=["result_id"]).column("result_id").to_pylist())
+
+
+def append_new(df, dataset_path=DATASET_PATH):
+    """Write only results whose result_id isn't stored yet. Returns the new rows."""
+    new = df[~df["result_id"].isin(stored_ids(dataset_path))]
+    if new.empty:
+        return new
+    table = pa.Table.from_pandas(new.astype({"season": "Int64"}), preserve_index=False)
+    ds.write_dataset(
+        table, dataset_path, format="parquet",
+        partitioning=PARTITIONS, partitioning_flavor="hive",
+        basename_template=f"part-{time.strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:8]}-{{i}}.parquet",
+        existing_data_behavior="overwrite_or_ignore",
+    )
+    return new
+
+
+def load_dataset(dataset_path=DATASET_PATH):
+    dataset = ds.dataset(dataset_path, format="parquet", partitioning="hive")
+    return dataset.to_table().to_pandas()
+
+
+def toplist_fetcher():
+    """Executor for toplist pages; the pipeline opens it for the scrape stage so its requests are recorded."""
+    fetch = FetchExecutor(max_workers=4, rate=2.0)  # no response cache: pages change nightly
+    fetch.session.headers["User-Agent"] = "Mozilla/5.0"
+    return fetch
+
+
+def scrape_results(specs=None, dataset_path=DATASET_PATH, fetch=None, max_pages=MAX_PAGES):
+    """Crawl the frontier, append the delta, and return every stored result."""
+    specs = specs or frontier()
+    own_fetch = fetch is None
+    if own_fetch:
+        fetch = toplist_fetcher()
+    try:
+        print(f"Fetching {len(specs)} lists...")
+        df = crawl(specs, fetch, max_pages)
+    finally:
+        if own_fetch:
+            fetch.close()
+
+    new = append_new(df, dataset_path)
+    print(f"{len(df)} rows fetched, {len(new)} new.")
+    if not Path(dataset_path).exists():
+        return df
+    return load_dataset(dataset_path)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Scrape World Athletics toplists incrementally.")
+    ap.add_argument("--events", nargs="+", default=["100-metres"])
+    ap.add_argument("--sexes", nargs="+", default=["men"])
+    ap.add_argument("--ages", nargs="+", default=["senior"])
+    ap.add_argument("--seasons", nargs="+", type=int, default=None, help="default: all-time lists")
+    ap.add_argument("--max-pages", type=int, default=MAX_PAGES)
+    ap.add_argument("--out", default=str(OUTPUT_PATH))
+    args = ap.parse_args(argv)
 
-print(f"{len(df)} rows fetched.")
+    specs = frontier(args.events, args.sexes, args.ages, args.seasons or [None])
+    df = scrape_results(specs, max_pages=args.max_pages)
 
-# Save the data
-Path("data/processed").mkdir(parents=True, exist_ok=True)
-out_path = Path("data/processed/results.parquet")
-df.to_parquet(out_path, index=False)
+    # Save a snapshot for the downstream stages
+    Path(args.out).parent.mkdir(parents=True, exist_ok=True)
+    df.to_parquet(args.out, index=False)
+    print(f"✅ Saved to {Path(args.out).resolve()}")
 
-print(f"✅ Saved to {out_path.resolve()}")
 
+if __name__ == "__main__":
+    main()
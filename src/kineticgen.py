@@ -0,0 +1,328 @@
+# src/kineticgen.py
+"""
+KineticGen command line: one entry point for the processing stages.
+
+    python src/kineticgen.py scrape  [--events 100-metres 200-metres] [--seasons 2023 2024]
+    python src/kineticgen.py clean   [--input data/processed/results.parquet]
+    python src/kineticgen.py enrich  [--input data/processed/results_clean.parquet]
+    python src/kineticgen.py correct [--wind-coeff 0.05] [--surface data/processed/correction_surface]
+    python src/kineticgen.py uncertainty [--draws 2000] [--top 20]
+    python src/kineticgen.py athletes [--top 20] [--athlete "Usain BOLT"]
+    python src/kineticgen.py fit     [model | athletes] [--resamples 2000]
+    python src/kineticgen.py report  [--output data/reports] [--formats png svg]
+    python src/kineticgen.py serve   [--port 8765] [--poll 30]
+
+Only argparse is imported at startup. A command imports its stage module
+(and with it pandas, pyarrow, scipy or matplotlib) when it runs, so --help
+and argument errors return at once. Paths and parameters are arguments;
+the defaults are the files the stages have always used.
+
+The commands are also plain functions (scrape(), clean(), enrich(),
+correct(), uncertainty(), athletes(), fit_model(), fit_athletes(), report(), serve()). Importing this module
+does nothing else, so a scheduler can run stages in-process:
+
+    import kineticgen
+    df = kineticgen.clean("raw.parquet", "clean.parquet")
+    kineticgen.main(["correct", "--input", "enriched.parquet"])
+
+For incremental, fingerprinted runs of the whole chain use pipeline.py.
+"""
+
+import argparse
+import importlib
+import sys
+from pathlib import Path
+
+SRC = Path(__file__).resolve().parent
+P = "data/processed/"
+
+
+def _load(module):
+    """Import a stage module from src/features or src/ingest on first use."""
+    for sub in ("features", "ingest"):
+        if str(SRC / sub) not in sys.path:
+            sys.path.insert(0, str(SRC / sub))
+    return importlib.import_module(module)
+
+
+def _save(df, path):
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    df.to_parquet(path, index=False)
+
+
+def _given(**kwargs):
+    """Keyword arguments that were actually set, so the stage's own defaults apply to the rest."""
+    return {k: v for k, v in kwargs.items() if v is not None}
+
+
+# --- stages as functions: read input, write output, return the result ---
+
+def scrape(output=P + "results.parquet", events=("100-metres",), sexes=("men",), ages=("senior",),
+           seasons=None, max_pages=None, dataset=None):
+    """Crawl the toplists, append new results to the raw dataset, snapshot it to output."""
+    s = _load("scrape_results")
+    specs = s.frontier(events, sexes, ages, seasons or [None])
+    df = s.scrape_results(specs, **_given(max_pages=max_pages, dataset_path=dataset))
+    _save(df, output)
+    return df
+
+
+def clean(input=P + "results.parquet", output=P + "results_clean.parquet"):
+    """Parse marks, winds and dates into the typed clean schema."""
+    import pyarrow.parquet as pq
+    c = _load("clean_results")
+    df = c.clean_results(c.read_raw(input))
+    Path(output).parent.mkdir(parents=True, exist_ok=True)
+    pq.write_table(c.to_arrow(df), output)
+    return df
+
+
+def enrich(input=P + "results_clean.parquet", output=P + "results_weather_real.parquet",
+           altitude_output=P + "results_altitude_density.parquet"):
+    """Venue coordinates and altitude, then race-day weather and air density.
+
+    The intermediate altitude/density frame (what correct reads) goes to
+    altitude_output unless that is None. Both steps share one fetcher.
+    """
+    import pandas as pd
+    fetch_executor = _load("fetch_executor")
+    df = pd.read_parquet(input)
+    with fetch_executor.open_fetcher() as fetch:
+        located = _load("add_altitude_density").add_altitude_density(df, fetch=fetch)
+        if altitude_output:
+            _save(located, altitude_output)
+        out = _load("fetch_real_weather").fetch_real_weather(located, fetch=fetch)
+    _save(out, output)
+    return out
+
+
+def correct(input=P + "results_altitude_density.parquet", output=P + "results_physics_refined.parquet",
+            surface=None, rho_ref=None, alt_scale=None, wind_coeff=None, rho_coeff=None):
+    """Neutral times (t_neutral; delta is derived on read by results_dataset); t_neutral_model too when a correction surface is given."""
+    import pandas as pd
+    physics = _load("physics_corrections")
+    df = pd.read_parquet(input)
+    out = physics.physics_corrections(df, surface_dir=surface, **_given(
+        rho_ref=rho_ref, alt_scale=alt_scale, wind_coeff=wind_coeff, rho_coeff=rho_coeff))
+    _save(out, output)
+    return out
+
+
+def uncertainty(input=P + "results_physics_refined.parquet", output=P + "results_uncertainty.parquet",
+                draws=None, seed=0, workers=None, top=0, beat_output=P + "results_beat_top.parquet"):
+    """Monte Carlo spread and quantiles of t_neutral; with top, P(beat) among the top neutral times too."""
+    import pandas as pd
+    mc = _load("neutral_uncertainty")
+    df = pd.read_parquet(input)
+    out = mc.uncertainty_stage(df, seed=seed, workers=workers, **_given(draws=draws))
+    _save(out, output)
+    if top:
+        _save(mc.beat_table(df, top, seed=seed, **_given(draws=draws)), beat_output)
+    return out
+
+
+def athletes(input=P + "results_physics_refined.parquet", store=P + "athlete_aggregates"):
+    """Fold new refined results into the per-athlete aggregate store; returns (store, mode, rows)."""
+    return _load("athlete_aggregates").refresh_store(input, store)
+
+
+def fit_model(input=P + "results_physics_refined.parquet", summary=P + "model_summary.parquet",
+              inference=P + "model_inference.parquet", resamples=None, seed=0, workers=None):
+    """Environmental regression summary plus resampling inference; returns (summary, inference)."""
+    return _load("model_summary").export_model_summary(
+        input, summary, inference, **_given(n_resamples=resamples), seed=seed, workers=workers)
+
+
+def fit_athletes(input=P + "results_weather_real.parquet", output=P + "results_fitted.parquet",
+                 fits=P + "athlete_fits.parquet", reaction_time=None, workers=None):
+    """Per-result drag-model scale fits, warm-started from and merged into the athlete fits file."""
+    import pandas as pd
+    fit = _load("athlete_fit")
+    df = pd.read_parquet(input)
+    previous = fit.read_fits(fits)
+    out = fit.fit_results(df, workers=workers, fits=previous, **_given(reaction_time=reaction_time))
+    _save(out, output)
+    _save(fit.athlete_fits(out, previous), fits)
+    return out
+
+
+def report(input=P + "results_physics_refined.parquet", output="data/reports", formats=("png",),
+           figures=None, workers=None):
+    """Render the analysis figures headlessly; returns the manifest."""
+    render = _load("render_report")
+    unknown = sorted(set(figures or ()) - set(render.FIGURES))
+    if unknown:
+        raise ValueError(f"unknown figures {unknown}; known: {', '.join(render.FIGURES)}")
+    return render.render_report(input, output, formats, figures, workers)
+
+
+def serve(input=P + "results_physics_refined.parquet", host="127.0.0.1", port=8765, poll=None):
+    """Index the neutral rankings and answer HTTP queries until interrupted."""
+    rs = _load("ranking_service")
+    ranking = rs.NeutralRanking.from_parquet(input)
+    print(f"📇 indexed {len(ranking):,} results")
+    rs.serve(ranking, host, port, source=input, poll=poll)
+
+
+# --- command line ---
+
+def _done(name, rows, path):
+    print(f"✅ {name}: {rows:,} rows → {Path(path).resolve()}")
+
+
+def cmd_scrape(a):
+    df = scrape(a.output, a.events, a.sexes, a.ages, a.seasons, a.max_pages, a.dataset)
+    _done("scrape", len(df), a.output)
+
+
+def cmd_clean(a):
+    df = clean(a.input, a.output)
+    _done("clean", len(df), a.output)
+    print(f"   {int(df['altitude_assisted'].sum())} A, {int(df['hand_timed'].sum())} h, "
+          f"{int(df['wind_assisted'].sum())} wind-assisted")
+
+
+def cmd_enrich(a):
+    df = enrich(a.input, a.output, a.altitude_output or None)
+    _done("enrich", len(df), a.output)
+
+
+def cmd_correct(a):
+    df = correct(a.input, a.output, a.surface, a.rho_ref, a.alt_scale, a.wind_coeff, a.rho_coeff)
+    _done("correct", len(df), a.output)
+
+
+def cmd_uncertainty(a):
+    df = uncertainty(a.input, a.output, a.draws, a.seed, a.workers, a.top, a.beat_output)
+    _done("uncertainty", len(df), a.output)
+    print(f"   median spread (sd) {df['t_neutral_sd'].median():.4f} s")
+    if a.top:
+        print(f"🏁 P(beat) among the top {a.top} → {Path(a.beat_output).resolve()}")
+
+
+def cmd_athletes(a):
+    agg, mode, rows = athletes(a.input, a.store)
+    print(f"👤 athletes {mode}: {rows:,} results folded in; {len(agg):,} athletes, {len(agg.seasons):,} seasons")
+    table = agg.athlete(a.athlete) if a.athlete else agg.top(a.top)
+    cols = ["competitor", "dob", "nat", "results", "best_perf", "best_legal", "best_neutral", "sd_neutral"]
+    print(table[(["year"] if a.athlete else []) + cols].to_string(index=False))
+
+
+def cmd_fit(a):
+    if a.what == "athletes":
+        df = fit_athletes(a.input or P + "results_weather_real.parquet", a.output, a.fits,
+                          a.reaction_time, a.workers)
+        _done("fit athletes", len(df), a.output)
+        print(f"   {df['fit_converged'].mean():.1%} converged; athlete fits → {Path(a.fits).resolve()}")
+        return
+    summary, inference = fit_model(a.input or P + "results_physics_refined.parquet", a.summary,
+                                   a.inference, a.resamples, a.seed, a.workers)
+    print(summary.to_string(index=False))
+    _done("fit model", len(summary), a.summary)
+    if inference is not None:
+        print(inference[["Variable", "Coefficient", "CI_low", "CI_high", "Cluster_SE", "Perm_p"]]
+              .to_string(index=False))
+        _done("fit inference", len(inference), a.inference)
+
+
+def cmd_report(a):
+    manifest = report(a.input, a.output, a.formats, a.figures, a.workers)
+    for e in manifest["figures"]:
+        print(f"🖼️  {e['name']:<18} {e['mode']:<9} {e['rows']:>9,} rows  {e['seconds']:.2f} s")
+    print(f"✅ report: {len(manifest['figures'])} figures in {manifest['seconds']:.1f} s "
+          f"→ {Path(a.output).resolve()}")
+
+
+def cmd_serve(a):
+    serve(a.input, a.host, a.port, a.poll)
+
+
+def parser():
+    ap = argparse.ArgumentParser(prog="kineticgen", description="KineticGen processing stages.")
+    sub = ap.add_subparsers(dest="command", required=True, metavar="command")
+
+    def command(name, func, help, input=None, output=None):
+        p = sub.add_parser(name, help=help, description=help)
+        if input is not None:
+            p.add_argument("--input", default=input, help="input Parquet file (default: %(default)s)")
+        if output is not None:
+            p.add_argument("--output", default=output, help="output path (default: %(default)s)")
+        p.set_defaults(func=func)
+        return p
+
+    p = command("scrape", cmd_scrape, "crawl World Athletics toplists", output=P + "results.parquet")
+    p.add_argument("--events", nargs="+", default=["100-metres"])
+    p.add_argument("--sexes", nargs="+", default=["men"])
+    p.add_argument("--ages", nargs="+", default=["senior"])
+    p.add_argument("--seasons", nargs="+", type=int, default=None, help="default: all-time lists")
+    p.add_argument("--max-pages", type=int, default=None, help="per list (default: the scraper's limit)")
+    p.add_argument("--dataset", default=None, help="raw partitioned dataset (default: data/raw/results)")
+
+    command("clean", cmd_clean, "parse raw results into the clean schema",
+            P + "results.parquet", P + "results_clean.parquet")
+
+    p = command("enrich", cmd_enrich, "add venue altitude, race-day weather and air density",
+                P + "results_clean.parquet", P + "results_weather_real.parquet")
+    p.add_argument("--altitude-output", default=P + "results_altitude_density.parquet",
+                   help="where the altitude/density step is saved, '' to skip (default: %(default)s)")
+
+    p = command("correct", cmd_correct, "compute wind/altitude/density-neutral times",
+                P + "results_altitude_density.parquet", P + "results_physics_refined.parquet")
+    p.add_argument("--surface", default=None, help="correction surface directory for t_neutral_model")
+    for flag in ("--rho-ref", "--alt-scale", "--wind-coeff", "--rho-coeff"):
+        p.add_argument(flag, type=float, default=None, help="default: the correction engine's value")
+
+    p = command("uncertainty", cmd_uncertainty, "Monte Carlo quantiles of neutral times and P(beat)",
+                P + "results_physics_refined.parquet", P + "results_uncertainty.parquet")
+    p.add_argument("--draws", type=int, default=None, help="draws per result (default: 2000)")
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--workers", type=int, default=None)
+    p.add_argument("--top", type=int, default=0, help="also write P(beat) between the top N neutral times")
+    p.add_argument("--beat-output", default=P + "results_beat_top.parquet", help="default: %(default)s")
+
+    p = command("athletes", cmd_athletes, "update the per-athlete aggregate store and show bests",
+                P + "results_physics_refined.parquet")
+    p.add_argument("--store", default=P + "athlete_aggregates", help="store directory (default: %(default)s)")
+    p.add_argument("--top", type=int, default=20)
+    p.add_argument("--athlete", default=None, help="show this competitor's season progression instead")
+
+    p = command("fit", cmd_fit, "fit the environmental regression or the per-athlete model")
+    p.add_argument("what", nargs="?", choices=["model", "athletes"], default="model")
+    p.add_argument("--input", default=None,
+                   help="default: results_physics_refined (model) or results_weather_real (athletes)")
+    p.add_argument("--summary", default=P + "model_summary.parquet",
+                   help="model: coefficient table (default: %(default)s)")
+    p.add_argument("--inference", default=P + "model_inference.parquet",
+                   help="model: resampling table (default: %(default)s)")
+    p.add_argument("--resamples", type=int, default=None, help="model: bootstrap/permutation draws (0 skips)")
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--output", default=P + "results_fitted.parquet",
+                   help="athletes: fitted results (default: %(default)s)")
+    p.add_argument("--fits", default=P + "athlete_fits.parquet",
+                   help="athletes: per-athlete fits (default: %(default)s)")
+    p.add_argument("--reaction-time", type=float, default=None, help="athletes: seconds added to the model")
+    p.add_argument("--workers", type=int, default=None)
+
+    p = command("report", cmd_report, "render the analysis figures",
+                P + "results_physics_refined.parquet", "data/reports")
+    p.add_argument("--formats", nargs="+", default=["png"], choices=["png", "svg", "pdf"])
+    p.add_argument("--figures", nargs="+", default=None, help="default: all")
+    p.add_argument("--workers", type=int, default=None)
+
+    p = command("serve", cmd_serve, "answer ranking queries (top, best, rank) over HTTP",
+                P + "results_physics_refined.parquet")
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=8765)
+    p.add_argument("--poll", type=float, default=None, help="seconds between checks for new results")
+    return ap
+
+
+def main(argv=None):
+    """Run one command; returns the exit status (errors from the stage itself propagate)."""
+    args = parser().parse_args(argv)
+    args.func(args)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,333 @@
+# src/pipeline.py
+"""
+Incremental, content-hashed runner for the processing stages.
+
+Each stage declares its input/output Parquet files, parameters, source
+files and any other data files it reads (such as the correction surface).
+The runner hashes inputs, parameters, code and data files and
+- skips a stage whose fingerprint is unchanged since the last run,
+- for row-wise stages, processes only new/changed input rows when code,
+  parameters and data files are unchanged, reusing the previous output for
+  the rest,
+- hands Arrow tables produced earlier in the same run to downstream stages
+  in memory instead of re-reading them from Parquet.
+
+So changing a physics constant only reruns the physics stage; the enrichment
+stages (and their network calls) are skipped.
+
+Every run is instrumented (see features/instrumentation.py): per-stage time,
+rows, memory and HTTP activity go to data/processed/.pipeline/runs/.
+
+Run from the repo root:
+    python src/pipeline.py                 # everything except the scraper
+    python src/pipeline.py physics         # one stage (+ stale upstream stages)
+    python src/pipeline.py --force clean   # ignore saved fingerprints
+    python src/pipeline.py --profile physics --trace-memory
+"""
+
+import argparse
+import hashlib
+import importlib
+import importlib.util
+import json
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+SRC = Path(__file__).resolve().parent
+for sub in ("features", "ingest"):
+    if str(SRC / sub) not in sys.path:
+        sys.path.insert(0, str(SRC / sub))
+
+from correction_engine import DEFAULT_PARAMS  # noqa: E402
+from instrumentation import REPORT_DIR, RunRecorder, StageMetrics  # noqa: E402
+
+STATE_DIR = Path("data/processed/.pipeline")
+SRC_HASH = "_src_hash"  # provenance column threaded through row-wise stages
+
+
+def _import(spec):
+    module, func = spec.split(":")
+    return getattr(importlib.import_module(module), func)
+
+
+@dataclass
+class Stage:
+    name: str
+    func: str                                   # "module:function", imported on first use
+    output: str
+    inputs: list = field(default_factory=list)
+    params: dict = field(default_factory=dict)  # passed to func as keyword arguments
+    code: list = field(default_factory=list)    # helper modules whose source is part of the fingerprint
+    fetch: object = False                       # True: func takes the shared FetchExecutor as `fetch`;
+                                                # "module:function": its own, built by that factory
+    incremental: bool = True                    # row-wise: output rows derive from single input rows
+    external: bool = False                      # no local inputs; only runs when asked for
+    files: list = field(default_factory=list)   # non-Parquet data the func reads itself (hashed, not loaded)
+
+    def load(self):
+        return _import(self.func)
+
+    def source_files(self):
+        modules = [self.func.split(":")[0], *self.code]
+        return [importlib.util.find_spec(m).origin for m in modules]
+
+
+P = "data/processed/"
+SURFACE = P + "correction_surface"
+ENRICH_CODE = ["api_cache", "fetch_executor", "atmosphere", "bulk_weather", "gazetteer", "weather_archive",
+               "elevation_raster"]
+
+STAGES = [
+    Stage("scrape", "scrape_results:scrape_results", P + "results.parquet",
+          fetch="scrape_results:toplist_fetcher", incremental=False, external=True),
+    Stage("clean", "clean_results:clean_results", P + "results_clean.parquet",
+          inputs=[P + "results.parquet"]),
+    Stage("weather", "add_weather_altitude:add_weather_altitude", P + "results_weather.parquet",
+          inputs=[P + "results_clean.parquet"], code=ENRICH_CODE, fetch=True),
+    Stage("altitude", "add_altitude_density:add_altitude_density", P + "results_altitude_density.parquet",
+          inputs=[P + "results_clean.parquet"], code=ENRICH_CODE, fetch=True),
+    Stage("real_weather", "fetch_real_weather:fetch_real_weather", P + "results_weather_real.parquet",
+          inputs=[P + "results_altitude_density.parquet"], code=ENRICH_CODE, fetch=True),
+    Stage("physics", "physics_corrections:physics_corrections", P + "results_physics_refined.parquet",
+          inputs=[P + "results_altitude_density.parquet"],
+          params={**DEFAULT_PARAMS.to_dict(), "surface_dir": SURFACE},
+          code=["correction_engine", "correction_surface"],
+          files=[SURFACE + "/surface.npy", SURFACE + "/surface.json"]),
+    Stage("uncertainty", "neutral_uncertainty:uncertainty_stage", P + "results_uncertainty.parquet",
+          inputs=[P + "results_physics_refined.parquet"], params={"draws": 2000, "seed": 0},
+          code=["correction_engine", "atmosphere"]),
+    Stage("athletes", "athlete_aggregates:aggregate_stage", P + "athlete_aggregates/athletes.parquet",
+          inputs=[P + "results_physics_refined.parquet"], params={"store": P + "athlete_aggregates"},
+          code=["correction_engine", "ranking_service"], incremental=False),
+    Stage("fit", "athlete_fit:fit_stage", P + "results_fitted.parquet",
+          inputs=[P + "results_weather_real.parquet"], params={"reaction_time": 0.15},
+          code=["sprint_sim"]),
+    Stage("athlete_fits", "athlete_fit:fits_stage", P + "athlete_fits.parquet",
+          inputs=[P + "results_fitted.parquet"], incremental=False),
+]
+
+
+# --- hashing ---
+
+def row_hashes(df):
+    """Stable 64-bit hash per row (content only, index ignored)."""
+    cols = sorted(c for c in df.columns if c != SRC_HASH)
+    return pd.util.hash_pandas_object(df[cols], index=False).to_numpy(dtype=np.uint64)
+
+
+def frame_hash(df):
+    h = hashlib.sha256()
+    h.update(json.dumps(sorted(map(str, df.columns))).encode())
+    h.update(row_hashes(df).tobytes())
+    return h.hexdigest()
+
+
+def files_hash(paths):
+    """Hash of the files' contents; a missing file hashes as absent rather than failing."""
+    h = hashlib.sha256()
+    for p in paths:
+        h.update(Path(p).read_bytes() if Path(p).exists() else b"\0missing")
+    return h.hexdigest()
+
+
+def params_hash(params):
+    return hashlib.sha256(json.dumps(params, sort_keys=True, default=str).encode()).hexdigest()
+
+
+# --- runner ---
+
+class Runner:
+    def __init__(self, stages=STAGES, state_dir=STATE_DIR, recorder=None):
+        self.stages = {s.name: s for s in stages}
+        self.order = [s.name for s in stages]
+        self.state_dir = Path(state_dir)
+        self.state_path = self.state_dir / "state.json"
+        self.state = json.loads(self.state_path.read_text()) if self.state_path.exists() else {}
+        self.tables = {}      # output path -> Arrow table produced or read during this run
+        self._fetch = None
+        self._stage_fetch = None  # executor of the running stage when it has its own
+        self.recorder = recorder or RunRecorder()
+        self.recorder.fetcher = self.live_fetcher  # HTTP counters of the executor in use, once opened
+
+    # planning
+
+    def producer(self, path):
+        for name in self.order:
+            if self.stages[name].output == path:
+                return self.stages[name]
+        return None
+
+    def plan(self, targets=None):
+        """Stages to consider, upstream first. External stages run only when named."""
+        if not targets:
+            return [self.stages[n] for n in self.order
+                    if not self.stages[n].external or not Path(self.stages[n].output).exists()]
+        wanted = set()
+
+        def visit(name):
+            if name in wanted:
+                return
+            wanted.add(name)
+            for p in self.stages[name].inputs:
+                up = self.producer(p)
+                if up is not None and (not up.external or not Path(up.output).exists()):
+                    visit(up.name)
+
+        for t in targets:
+            if t not in self.stages:
+                raise KeyError(f"unknown stage {t!r}; known: {', '.join(self.order)}")
+            wanted.add(t) if self.stages[t].external else visit(t)
+        return [self.stages[n] for n in self.order if n in wanted]
+
+    # I/O
+
+    def read(self, path):
+        """Stage input as a DataFrame; always converted from Arrow so hashes match across runs."""
+        if path not in self.tables:
+            self.tables[path] = pq.read_table(path)
+        return self.tables[path].to_pandas()
+
+    def fetcher(self):
+        if self._fetch is None:
+            from fetch_executor import open_fetcher
+            self._fetch = open_fetcher()
+        return self._fetch
+
+    def live_fetcher(self):
+        return self._stage_fetch if self._stage_fetch is not None else self._fetch
+
+    def _sidecar(self, stage, kind):
+        return self.state_dir / f"{stage.name}.{kind}.npy"
+
+    # execution
+
+    def fingerprint(self, stage, inputs):
+        return {
+            "code": files_hash(stage.source_files()),
+            "params": params_hash(stage.params),
+            "files": files_hash(stage.files),
+            "inputs": [frame_hash(df) for df in inputs],
+        }
+
+    def call(self, stage, inputs):
+        kwargs = dict(stage.params)
+        if isinstance(stage.fetch, str) and self._stage_fetch is None:
+            raise RuntimeError(f"stage {stage.name} needs its own fetcher; run it through Runner.run")
+        if stage.fetch:
+            kwargs["fetch"] = self._stage_fetch if isinstance(stage.fetch, str) else self.fetcher()
+        return stage.load()(*inputs, **kwargs)
+
+    def run_stage(self, stage, force=False, metrics=None):
+        m = metrics or StageMetrics(stage.name)
+        inputs = [self.read(p) for p in stage.inputs]
+        m.rows_in = sum(len(df) for df in inputs)
+        fp = self.fingerprint(stage, inputs)
+        prev = self.state.get(stage.name, {})
+        out_path = Path(stage.output)
+
+        if not force and out_path.exists() and prev.get("fingerprint") == fp:
+            print(f"⏭️  {stage.name}: up to date")
+            m.mode = "skipped"
+            m.rows_out = prev.get("rows", 0)
+            return
+
+        same_logic = all(prev.get("fingerprint", {}).get(k) == fp[k] for k in ("code", "params", "files"))
+        rows_path, seen_path = self._sidecar(stage, "rows"), self._sidecar(stage, "seen")
+        row_wise = stage.incremental and len(inputs) == 1
+
+        if row_wise and same_logic and not force and out_path.exists() \
+                and rows_path.exists() and seen_path.exists():
+            out, src = self._run_delta(stage, inputs[0], self.read(stage.output),
+                                       np.load(rows_path), np.load(seen_path))
+            m.mode = "delta"
+        else:
+            print(f"▶️  {stage.name}: full run")
+            if row_wise:
+                inputs = [inputs[0].assign(**{SRC_HASH: row_hashes(inputs[0])})]
+            out = self.call(stage, inputs)
+            src = out.pop(SRC_HASH).to_numpy(dtype=np.uint64) if SRC_HASH in out.columns else None
+
+        table = pa.Table.from_pandas(out, preserve_index=False)
+        out_path.parent.mkdir(parents=True, exist_ok=True)
+        pq.write_table(table, out_path)
+        self.tables[stage.output] = table
+        m.rows_out = table.num_rows
+
+        self.state_dir.mkdir(parents=True, exist_ok=True)
+        if src is not None:
+            np.save(rows_path, src)
+            np.save(seen_path, row_hashes(inputs[0]))
+        else:
+            rows_path.unlink(missing_ok=True)
+            seen_path.unlink(missing_ok=True)
+        self.state[stage.name] = {"fingerprint": fp, "rows": table.num_rows}
+        self.state_path.write_text(json.dumps(self.state, indent=2))
+        print(f"✅ {stage.name}: {table.num_rows} rows → {out_path}")
+
+    def _run_delta(self, stage, df, prev_out, prev_src, seen):
+        """Rerun the stage on unseen input rows only and splice into the previous output."""
+        hashes = row_hashes(df)
+        new = ~np.isin(hashes, seen)
+        keep = np.isin(prev_src, hashes)  # drop output rows whose source row disappeared
+        print(f"🔁 {stage.name}: {int(new.sum())} new rows, {int((~keep).sum())} removed, "
+              f"{int(keep.sum())} reused")
+
+        parts, srcs = [prev_out[keep]], [prev_src[keep]]
+        if new.any():
+            fresh = self.call(stage, [df[new].assign(**{SRC_HASH: hashes[new]})])
+            if SRC_HASH not in fresh.columns:
+                raise RuntimeError(f"stage {stage.name} dropped {SRC_HASH}; mark it incremental=False")
+            srcs.append(fresh.pop(SRC_HASH).to_numpy(dtype=np.uint64))
+            parts.append(fresh)
+        out = pd.concat(parts, ignore_index=True) if len(parts) > 1 else parts[0]
+        return out, np.concatenate(srcs)
+
+    def run(self, targets=None, force=False, report=True):
+        try:
+            for stage in self.plan(targets):
+                # a stage's own executor is opened before the recorder looks at it and closed after
+                self._stage_fetch = _import(stage.fetch)() if isinstance(stage.fetch, str) else None
+                try:
+                    with self.recorder.stage(stage.name) as m:
+                        self.run_stage(stage, force=force, metrics=m)
+                finally:
+                    if self._stage_fetch is not None:
+                        self._stage_fetch.close()
+                        self._stage_fetch = None
+        finally:
+            if self._fetch is not None:
+                self._fetch.close()
+                self._fetch = None
+            if report and self.recorder.stages:
+                path = self.recorder.save()
+                print(self.recorder.summary())
+                print(f"📊 run report → {path}")
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Run the KineticGen processing stages incrementally.")
+    ap.add_argument("stages", nargs="*", help="stages to run (default: all but the scraper)")
+    ap.add_argument("--force", action="store_true", help="ignore saved fingerprints")
+    ap.add_argument("--list", action="store_true", help="list stages and exit")
+    ap.add_argument("--profile", metavar="STAGE", help="run STAGE under cProfile (.prof next to the report)")
+    ap.add_argument("--trace-memory", action="store_true", help="tracemalloc peak and top allocations per stage")
+    ap.add_argument("--report-dir", default=str(REPORT_DIR), help="where run reports are written")
+    args = ap.parse_args(argv)
+
+    runner = Runner(recorder=RunRecorder(profile=args.profile, trace_memory=args.trace_memory,
+                                         report_dir=args.report_dir))
+    if args.list:
+        for s in runner.plan(runner.order):
+            print(f"{s.name:14s} {', '.join(s.inputs) or '-':45s} → {s.output}")
+        return
+    runner.run(args.stages, force=args.force)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,10 @@
+# tests/conftest.py
+"""Put the flat source directories on sys.path, as the scripts do for themselves."""
+
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+for sub in ("src", "src/features", "src/ingest", "benchmarks", "app"):
+    if str(ROOT / sub) not in sys.path:
+        sys.path.insert(0, str(ROOT / sub))
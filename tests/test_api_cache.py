@@ -0,0 +1,56 @@
+# tests/test_api_cache.py
+import itertools
+import sqlite3
+
+import pytest
+
+import api_cache
+from api_cache import ResponseCache
+
+
+@pytest.fixture(autouse=True)
+def clock(monkeypatch):
+    ticks = itertools.count(1)
+    monkeypatch.setattr(api_cache.time, "time", lambda: float(next(ticks)))
+
+
+def accessed(path):
+    with sqlite3.connect(path) as db:
+        return dict(db.execute("SELECT key, accessed FROM responses"))
+
+
+def test_hits_are_written_in_batches(tmp_path):
+    path = tmp_path / "cache.sqlite"
+    cache = ResponseCache(path)
+    cache.set("a", {"v": 1})
+    before = accessed(path)["a"]
+
+    assert cache.get("a") == {"v": 1} and cache.get("missing") is None
+    assert accessed(path)["a"] == before  # a hit doesn't write
+    cache.close()
+    assert accessed(path)["a"] > before
+
+
+def test_eviction_sees_pending_hits(tmp_path):
+    cache = ResponseCache(tmp_path / "cache.sqlite", max_entries=2)
+    cache.set("old", 1)
+    cache.set("new", 2)
+    cache.get("old")  # now the most recently used
+    cache.set("newest", 3)
+    assert cache.get("new") is None and cache.get("old") == 1
+    cache.close()
+
+
+def test_open_fetcher_close_persists_access_times(tmp_path, monkeypatch):
+    from fetch_executor import open_fetcher
+    path = tmp_path / "cache.sqlite"
+    monkeypatch.setenv("KINETICGEN_CACHE", str(path))
+    with open_fetcher() as fetch:
+        fetch.cache.set("a", {"v": 1})
+    before = accessed(path)["a"]
+
+    with open_fetcher() as fetch:
+        assert fetch.cache.get("a") == {"v": 1}
+    assert accessed(path)["a"] > before
+    with open_fetcher() as fetch:  # reopens cleanly after the close
+        assert fetch.cache.stats()["entries"] == 1
@@ -0,0 +1,95 @@
+# tests/test_athlete_aggregates.py
+import numpy as np
+import pandas as pd
+
+from athlete_aggregates import KEY, AthleteAggregates
+from clean_results import WIND_LIMIT
+
+
+def results(n, seed):
+    rng = np.random.default_rng(seed)
+    year = rng.integers(2015, 2019, n)
+    df = pd.DataFrame({
+        "competitor": [f"A{i}" for i in rng.integers(0, 8, n)],
+        "dob": rng.choice(["1990", "1995"], n),
+        "nat": rng.choice(["NOR", "JAM", None], n),   # a missing part of the key
+        "year": year,
+        "date": [f"0{d}.07.{y}" for d, y in zip(rng.integers(1, 10, n), year)],
+        "venue": rng.choice(["Oslo", "Rome", "Doha"], n),
+        "perf": rng.normal(10.2, 0.15, n),
+        "wind": np.round(rng.uniform(-2.0, 3.0, n), 1),
+    })
+    df["t_neutral"] = df["perf"] - 0.05 * df["wind"]
+    df.loc[rng.choice(n, 10, replace=False), "perf"] = np.nan
+    return df
+
+
+def expected(df, keys):
+    d = df.assign(delta=df["t_neutral"] - df["perf"],
+                  legal=df["perf"].where(df["wind"] <= WIND_LIMIT),
+                  nat=df["nat"].fillna("<na>"))
+    return d.groupby(keys).agg(
+        results=("perf", "size"), mean_perf=("perf", "mean"), var_perf=("perf", "var"),
+        mean_neutral=("t_neutral", "mean"), var_neutral=("t_neutral", "var"),
+        mean_delta=("delta", "mean"), var_delta=("delta", "var"),
+        best_perf=("perf", "min"), best_legal=("legal", "min"), best_neutral=("t_neutral", "min"))
+
+
+def check(table, df, keys):
+    got = table.assign(nat=table["nat"].fillna("<na>"), year=table["year"].astype("Int64") if "year" in keys else 0)
+    got = got.set_index(keys).sort_index()
+    want = expected(df, keys)
+    assert len(got) == len(want)
+    assert got["results"].tolist() == want["results"].tolist()
+    for name in ("perf", "neutral", "delta"):
+        n = got[f"n_{name}"].to_numpy(dtype=np.float64)
+        np.testing.assert_allclose(got[f"mean_{name}"], want[f"mean_{name}"], rtol=1e-12)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            var = np.where(n > 1, got[f"m2_{name}"] / (n - 1), np.nan)
+        np.testing.assert_allclose(var, want[f"var_{name}"], rtol=1e-9, atol=1e-15)
+    for b in ("perf", "legal", "neutral"):
+        np.testing.assert_array_equal(got[f"best_{b}"], want[f"best_{b}"])
+
+
+def test_batched_updates_match_groupby():
+    df = results(600, seed=1)
+    store = AthleteAggregates()
+    for part in np.array_split(np.arange(len(df)), [50, 51, 300]):
+        store.update(df.iloc[part])
+    check(store.seasons, df, KEY + ["year"])
+    check(store.athletes, df, KEY)
+    assert len(store.seen) == len(df)
+
+
+def test_sync_adds_new_rows_and_rebuilds_on_removal():
+    df = results(300, seed=2)
+    store = AthleteAggregates()
+    assert store.sync(df.iloc[:200]) == ("updated", 200)
+    assert store.sync(df) == ("updated", 100)
+    assert store.sync(df) == ("updated", 0)
+
+    fewer = df.drop(index=df.index[5])
+    assert store.sync(fewer) == ("rebuilt", len(fewer))
+    check(store.seasons, fewer, KEY + ["year"])
+    check(store.athletes, fewer, KEY)
+    assert len(store.seen) == len(fewer)
+
+
+def test_save_load_round_trip(tmp_path):
+    df = results(200, seed=3)
+    store = AthleteAggregates()
+    store.update(df)
+    store.save(tmp_path)
+    back = AthleteAggregates.load(tmp_path)
+
+    for name in ("seasons", "athletes"):
+        pd.testing.assert_frame_equal(getattr(back, name), getattr(store, name), check_dtype=False)
+        assert str(getattr(back, name)["competitor"].dtype) == str(getattr(store, name)["competitor"].dtype)
+    assert np.array_equal(back.seen, store.seen)
+
+    # the loaded store keeps folding in: text keys still match the stored ones after the category round trip
+    more = results(50, seed=4)
+    back.update(more)
+    store.update(more)
+    check(back.athletes, pd.concat([df, more]), KEY)
+    assert len(back.athletes) == len(store.athletes)
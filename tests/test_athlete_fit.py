@@ -0,0 +1,41 @@
+# tests/test_athlete_fit.py
+import numpy as np
+import pandas as pd
+
+from athlete_fit import athlete_fits, fit_results, model_times
+from sprint_sim import DEFAULT_ATHLETE
+
+
+def test_athlete_fits_groups_only_observed_categories():
+    names = [f"athlete {i}" for i in range(500)]
+    fitted = pd.DataFrame({
+        "competitor": pd.Categorical(["athlete 1", "athlete 1", "athlete 2"], categories=names),
+        "dob": pd.Categorical(["1990", "1990", "1991"], categories=[str(y) for y in range(1950, 2010)]),
+        "fit_scale": [1.0, 1.2, 0.9],
+        "fit_converged": [True, True, True],
+    })
+    fits = athlete_fits(fitted)
+    assert len(fits) == 2
+    np.testing.assert_allclose(fits.sort_values("scale")["scale"], [0.9, 1.1])
+    assert fits["n_results"].sum() == 3
+
+
+def test_fit_results_recovers_known_scales():
+    rng = np.random.default_rng(0)
+    athletes = {"A": 0.92, "B": 1.0, "C": 1.07}
+    who = rng.choice(list(athletes), 30)
+    scale = np.array([athletes[a] for a in who])
+    wind = np.round(rng.uniform(-2.0, 2.0, 30), 1)
+    rho = rng.uniform(0.95, 1.25, 30)
+    df = pd.DataFrame({"competitor": who, "dob": "1990", "wind": wind, "rho_air_abs": rho,
+                       "perf": model_times(scale, wind, rho)})
+
+    fitted = fit_results(df, workers=1, shard_size=7)
+    assert fitted["fit_converged"].all()
+    np.testing.assert_allclose(fitted["fit_scale"], scale, atol=1e-4)
+    np.testing.assert_allclose(fitted["fit_f0"], scale * DEFAULT_ATHLETE.f0, rtol=1e-4)
+
+    fits = athlete_fits(fitted).set_index("competitor")["scale"]
+    np.testing.assert_allclose(fits[list(athletes)], list(athletes.values()), atol=1e-4)
+    warm = fit_results(df, workers=1, fits=athlete_fits(fitted))  # warm brackets move the start, not the root
+    np.testing.assert_allclose(warm["fit_scale"], scale, atol=1e-4)
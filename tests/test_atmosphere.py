@@ -0,0 +1,29 @@
+# tests/test_atmosphere.py
+import numpy as np
+import pandas as pd
+import pytest
+
+from atmosphere import air_density, frame_air_density, hpa_to_pa, saturation_vapour_pressure
+
+
+@pytest.mark.parametrize("temp_c, pressure_pa, rh_pct, rho", [
+    (15.0, 101_325.0, 0.0, 1.2250),    # ISA sea level
+    (0.0, 101_325.0, 0.0, 1.2922),
+    (20.0, 101_325.0, 0.0, 1.2041),
+    (30.0, 101_325.0, 100.0, 1.1455),  # saturated air is lighter than dry air (1.1644)
+    (20.0, 80_000.0, 50.0, 0.9454),    # ~2000 m, as in Mexico City
+])
+def test_air_density_matches_reference_values(temp_c, pressure_pa, rh_pct, rho):
+    assert air_density(temp_c, pressure_pa, rh_pct) == pytest.approx(rho, rel=1e-3)
+
+
+def test_saturation_vapour_pressure_and_broadcasting():
+    assert saturation_vapour_pressure(20.0) == pytest.approx(2339.0, rel=2e-3)
+    assert saturation_vapour_pressure(20.0, "magnus") == pytest.approx(2339.0, rel=2e-3)
+    with pytest.raises(ValueError):
+        saturation_vapour_pressure(20.0, "goff")
+
+    df = pd.DataFrame({"temp_c": [15.0, 30.0], "pressure_hpa": [1013.25, 1013.25], "rh_pct": [0.0, 100.0]})
+    np.testing.assert_allclose(frame_air_density(df),
+                               air_density(df["temp_c"], hpa_to_pa(df["pressure_hpa"]), df["rh_pct"]))
+    assert air_density(np.array([[10.0], [20.0]]), 101_325.0, np.array([0.0, 50.0, 100.0])).shape == (2, 3)
@@ -0,0 +1,51 @@
+# tests/test_bulk_weather.py
+import numpy as np
+import pandas as pd
+
+from bulk_weather import attach_daily_weather, date_spans, to_iso_dates
+
+
+class FakeFetch:
+    """Answers each span request with one value per day: lat + day of the span."""
+
+    def __init__(self):
+        self.jobs = []
+
+    def map(self, jobs):
+        self.jobs.extend(jobs)
+        out = []
+        for _, params, _ in jobs:
+            days = pd.date_range(params["start_date"], params["end_date"]).strftime("%Y-%m-%d").tolist()
+            out.append({"daily": {"time": days, "temperature_2m_mean": [params["latitude"] + i
+                                                                         for i in range(len(days))]}})
+        return out
+
+
+def test_date_spans_cover_each_date_once_within_max_days():
+    dates = ["2020-01-05", "2020-01-01", "2020-03-01", "2020-01-05", None, "2023-07-01", "2023-07-02"]
+    spans = date_spans(dates, max_days=60)
+    assert spans == [("2020-01-01", "2020-01-05"), ("2020-03-01", "2020-03-01"), ("2023-07-01", "2023-07-02")]
+
+    rng = np.random.default_rng(0)
+    days = pd.Timestamp("2015-01-01") + pd.to_timedelta(rng.integers(0, 3000, 400), unit="D")
+    spans = date_spans(days.strftime("%Y-%m-%d"), max_days=30)
+    start, end = (pd.to_datetime([s[i] for s in spans]) for i in (0, 1))
+    assert ((end - start).days < 30).all() and (start[1:] > end[:-1]).all()
+    covered = [((days >= s) & (days <= e)).sum() for s, e in zip(start, end)]
+    assert sum(covered) == len(days)
+
+
+def test_attach_daily_weather_splits_spans_per_venue():
+    df = pd.DataFrame({
+        "lat": [10.0, 10.0, 10.0, 20.0, 20.0, np.nan],
+        "lon": [1.0, 1.0, 1.0, 2.0, 2.0, 3.0],
+        "iso_date": to_iso_dates(["01 JUN 2020", "03 JUN 2020", "01 JUN 2022", "02 JUN 2020", "x", "01 JUN 2020"]),
+    })
+    fetch = FakeFetch()
+    out = attach_daily_weather(df, fetch, ["temperature_2m_mean"], max_days=30, verbose=False)
+
+    requested = sorted((p["latitude"], p["start_date"], p["end_date"]) for _, p, _ in fetch.jobs)
+    assert requested == [(10.0, "2020-06-01", "2020-06-03"), (10.0, "2022-06-01", "2022-06-01"),
+                         (20.0, "2020-06-02", "2020-06-02")]
+    assert len(out) == len(df)
+    np.testing.assert_array_equal(out["temperature_2m_mean"], [10.0, 12.0, 10.0, 20.0, np.nan, np.nan])
@@ -0,0 +1,17 @@
+# tests/test_clean_results.py
+import pandas as pd
+import pyarrow as pa
+
+from clean_results import SCHEMA, clean_results, to_arrow
+
+
+def test_output_follows_the_schema():
+    raw = pd.DataFrame({
+        "rank": ["1", "2"], "perf": ["9.58A", "10.0h"], "wind": ["+0.9", "+2.4w"],
+        "competitor": ["A", "B"], "dob": ["21 AUG 1986", None], "nat": ["JAM", "USA"],
+        "pos": ["1", "1f1"], "venue": ["Berlin", "Mexico City"], "date": ["16 AUG 2009", "12 OCT 1968"],
+        "resultscore": ["1356", "1200"], "competition": ["WCh", "OG"],
+    }).astype(pd.ArrowDtype(pa.large_string()))  # as pandas 3 / pyarrow-backed frames arrive
+    table = to_arrow(clean_results(raw).assign(_src_hash=[1, 2]))
+    assert table.schema.remove(table.schema.get_field_index("_src_hash")).remove_metadata() == SCHEMA
+    assert table.schema.field("_src_hash").type == pa.int64()
@@ -0,0 +1,24 @@
+# tests/test_correction_engine.py
+import numpy as np
+import pandas as pd
+
+from correction_engine import group_codes
+
+
+def test_group_codes_many_wide_columns_do_not_overflow():
+    n = 2000
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({f"c{i}": rng.permutation(n) for i in range(8)})  # 2000**8 overflows int64
+    df = pd.concat([df, df.iloc[:10]], ignore_index=True)
+    codes, first = group_codes(df, list(df.columns))
+    assert len(first) == n
+    np.testing.assert_array_equal(codes[n:], codes[:10])
+    np.testing.assert_array_equal(first, np.arange(n))
+
+
+def test_group_codes_missing_values_and_columns():
+    df = pd.DataFrame({"a": ["x", None, "x", None], "b": [1.0, np.nan, 1.0, 2.0]})
+    codes, first = group_codes(df, ["a", "b", "not_there"])
+    assert codes.tolist() == [0, 1, 0, 2] and first.tolist() == [0, 1, 3]
+    assert group_codes(df, ["not_there"])[0].tolist() == [0, 0, 0, 0]
+    assert len(group_codes(df.iloc[:0], ["a"])[1]) == 0
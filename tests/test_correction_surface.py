@@ -0,0 +1,54 @@
+# tests/test_correction_surface.py
+import numpy as np
+
+import correction_engine
+from correction_engine import DEFAULT_PARAMS
+from correction_surface import AXES, CorrectionSurface, build_surface, model_delta
+
+SMALL_AXES = {
+    "wind": np.arange(-2.0, 2.001, 0.5),
+    "rho": np.arange(1.0, 1.301, 0.05),
+    "perf": np.arange(9.8, 10.601, 0.2),
+}
+
+
+def linear_surface():
+    """The correction_engine model on a grid: linear in wind and rho, so interpolation is exact."""
+    grid = np.meshgrid(*(SMALL_AXES[n] for n in AXES), indexing="ij")
+    zeros = np.zeros_like(grid[0])
+    values = correction_engine.neutral_times(grid[2], grid[0], zeros, grid[1]) - grid[2]
+    return CorrectionSurface(SMALL_AXES, values)
+
+
+def test_lookup_matches_correction_engine_on_and_off_grid():
+    surface = linear_surface()
+    rng = np.random.default_rng(0)
+    wind = np.concatenate([SMALL_AXES["wind"], rng.uniform(-2.0, 2.0, 200)])
+    rho = np.concatenate([np.resize(SMALL_AXES["rho"], 9), rng.uniform(1.0, 1.3, 200)])
+    perf = np.concatenate([np.resize(SMALL_AXES["perf"], 9), rng.uniform(9.8, 10.6, 200)])
+    want = correction_engine.neutral_times(perf, wind, np.zeros_like(perf), rho)
+    np.testing.assert_allclose(surface.neutral_times(perf, wind, rho), want, rtol=0, atol=1e-12)
+
+    # outside the grid the lookup is clamped to the edge
+    edge = correction_engine.neutral_times(10.0, 2.0, 0.0, 1.3)
+    np.testing.assert_allclose(surface.neutral_times(10.0, 5.0, 1.6), edge, atol=1e-12)
+    assert not surface.in_range(5.0, 1.2, 10.0) and surface.in_range(1.0, 1.2, 10.0)
+
+
+def test_built_surface_matches_the_model_within_tolerance(tmp_path):
+    axes = {"wind": np.arange(-2.0, 2.001, 1.0), "rho": np.array([1.0, 1.1, 1.2, 1.3]),
+            "perf": np.array([9.8, 10.2, 10.6])}
+    surface = build_surface(axes, n_validate=50)
+    surface.save(tmp_path)
+    loaded = CorrectionSurface.load(tmp_path)
+
+    grid = np.meshgrid(*(axes[n] for n in AXES), indexing="ij")
+    np.testing.assert_allclose(loaded.delta(*grid), model_delta(*grid), atol=1e-5)  # float32 storage
+
+    rng = np.random.default_rng(1)
+    pts = [rng.uniform(axes[n][0], axes[n][-1], 40) for n in AXES]
+    err = np.abs(loaded.delta(*pts) - model_delta(*pts))
+    assert err.max() < 0.005
+    assert loaded.meta["max_abs_error_s"] < 0.005 and loaded.meta["rho_ref"] == DEFAULT_PARAMS.rho_ref
+    # neutral conditions need no correction
+    assert abs(float(loaded.delta(0.0, DEFAULT_PARAMS.rho_ref, 10.2))) < 0.005
@@ -0,0 +1,77 @@
+# tests/test_dashboard_data.py
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+import dashboard_data
+from clean_results import DICT, clean_results, to_arrow
+from physics_corrections import physics_corrections
+
+RAW = pd.DataFrame({
+    "rank": ["1", "2", "3", "4"],
+    "perf": ["9.58", "9.69", "9.72", "10.01A"],
+    "wind": ["+0.9", "-0.1", "+1.7", "+2.4w"],
+    "competitor": ["Usain BOLT", "Yohan BLAKE", "Usain BOLT", None],
+    "dob": ["21 AUG 1986", "26 DEC 1989", "21 AUG 1986", None],
+    "nat": ["JAM", "JAM", "JAM", "USA"],
+    "pos": ["1", "1", "1", "1"],
+    "venue": ["Berlin", "Lausanne", "Berlin", "Mexico City"],
+    "date": ["16 AUG 2009", "23 AUG 2012", "10 JUL 2010", "12 OCT 1968"],
+    "resultscore": ["1356", "1320", "1300", "1200"],
+    "competition": ["WCh", "DL", "DL", "OG"],
+})
+
+
+def write_results(path):
+    """A results_physics_refined-like file that keeps the clean schema's dictionary columns."""
+    df = clean_results(RAW).assign(altitude_m=[40.0, 500.0, 40.0, 2240.0], rho_air_abs=[1.20, 1.14, 1.19, 0.98])
+    pq.write_table(to_arrow(physics_corrections(df)), path)
+
+
+def test_load_reads_dictionary_columns(tmp_path):
+    path = tmp_path / "results.parquet"
+    write_results(path)
+    assert pa.types.is_dictionary(pq.read_schema(path).field("competitor").type)
+    assert pq.read_schema(path).field("competitor").type == DICT
+
+    df = dashboard_data.load(path)
+    assert list(df["athlete"]) == ["Usain BOLT (21 AUG 1986)", "Yohan BLAKE (26 DEC 1989)",
+                                   "Usain BOLT (21 AUG 1986)", "? (?)"]
+    assert list(df["venue"]) == ["Berlin", "Lausanne", "Berlin", "Mexico City"]
+    assert df["year"].tolist() == [2009, 2012, 2010, 1968]
+
+
+def test_aggregates_and_filters(tmp_path):
+    path = tmp_path / "results.parquet"
+    write_results(path)
+    df = dashboard_data.load(path)
+
+    venues = dashboard_data.aggregates(df, "venue").set_index("venue")
+    assert venues.loc["Berlin", "n"] == 2
+    assert venues.loc["Berlin", "best_perf"] == 9.58
+    assert venues.loc["Berlin", "best_neutral"] == df.loc[df["venue"] == "Berlin", "t_neutral"].min()
+    assert venues["best_neutral"].is_monotonic_increasing
+
+    mask = dashboard_data.filter_mask(df, venues=["Berlin", "Nowhere"], wind=(0.0, 1.0))
+    assert mask.tolist() == [True, False, False, False]
+    assert dashboard_data.filter_mask(df, years=(2010, 2012)).tolist() == [False, True, True, False]
+
+
+def test_athlete_table_from_the_store(tmp_path):
+    path = tmp_path / "results.parquet"
+    write_results(path)
+    table = dashboard_data.athlete_aggregates(path, tmp_path / "store").set_index("athlete")
+    assert table.loc["Usain BOLT (21 AUG 1986)", "n"] == 2
+    assert table.loc["Usain BOLT (21 AUG 1986)", "best_perf"] == 9.58
+    assert table.loc["Yohan BLAKE (26 DEC 1989)", "n"] == 1
+
+
+def test_downsample_keeps_sparse_outliers():
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({"x": rng.normal(0, 1, 20_000), "y": rng.normal(0, 1, 20_000)})
+    df.loc[len(df)] = [40.0, 40.0]  # one far outlier
+    out = dashboard_data.downsample(df, "x", "y", max_points=5000)
+    assert len(out) < 5000
+    assert (out["x"] == 40.0).any()
+    assert out.index.is_monotonic_increasing
@@ -0,0 +1,18 @@
+# tests/test_elevation_raster.py
+import numpy as np
+
+from elevation_raster import ElevationRaster, import_tiles
+
+
+def flat(height, size=5):
+    return np.full((size, size), height, dtype=np.int16)
+
+
+def test_import_replaces_and_appends_tiles(tmp_path):
+    assert import_tiles({(52, 13): flat(30), (46, 6): flat(400)}, tmp_path, size=5) == 2
+    assert import_tiles({(46, 6): flat(450), (-34, 18): flat(10)}, tmp_path) == 3
+
+    raster = ElevationRaster(tmp_path)
+    assert len(raster) == 3
+    np.testing.assert_allclose(raster.sample([52.5, 46.5, -33.5, 0.5], [13.5, 6.5, 18.5, 0.5]),
+                               [30, 450, 10, np.nan])
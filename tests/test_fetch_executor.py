@@ -0,0 +1,72 @@
+# tests/test_fetch_executor.py
+import pytest
+
+import stub_network
+from api_cache import ResponseCache
+from fetch_executor import FetchExecutor
+from stub_network import StubNetwork, geocode
+
+
+def executor(cache=None, **kwargs):
+    return FetchExecutor(cache=cache, max_workers=4, rate=0, backoff=0.001, max_backoff=0.01, **kwargs)
+
+
+def search(stub):
+    return stub.base + "/v1/search"
+
+
+def test_retries_until_the_stub_answers():
+    with StubNetwork(fail_first=2) as stub, executor() as ex:
+        assert ex.get_json(search(stub), {"name": "Berlin"}) == geocode("Berlin")
+        assert ex.counters["requests"] == 3
+        assert ex.counters["retries"] == 2
+        assert ex.counters["failures"] == 0
+
+
+def test_gives_up_after_max_attempts():
+    with StubNetwork(fail_first=10) as stub, executor(max_attempts=3) as ex:
+        assert ex.get_json(search(stub), {"name": "Berlin"}) is None
+        assert stub.requests == 3
+        assert ex.counters["failures"] == 1
+
+
+def test_identical_in_flight_requests_share_one_call(monkeypatch):
+    monkeypatch.setattr(stub_network, "LATENCY_S", 0.2)
+    with StubNetwork() as stub, executor() as ex:
+        futures = [ex.submit(search(stub), {"name": "Rome"}) for _ in range(3)]
+        assert len({id(f) for f in futures}) == 1
+        assert futures[0].result() == geocode("Rome")
+        assert stub.requests == 1
+        assert ex.counters["deduplicated"] == 2
+
+
+def test_cache_serves_repeat_runs(tmp_path):
+    cache = ResponseCache(tmp_path / "cache.sqlite")
+    with StubNetwork() as stub:
+        jobs = [(search(stub), {"name": n}, None) for n in ("Oslo", "Doha")]
+        with executor(cache) as ex:
+            first = ex.map(jobs)
+        requests = stub.requests
+        with executor(cache) as ex:
+            assert ex.map(jobs) == first
+            assert ex.counters["requests"] == 0
+        assert stub.requests == requests == 2
+    assert cache.stats()["hits"] == 2
+    cache.close()
+
+
+def test_offline_cache_miss_does_not_fetch(tmp_path):
+    cache = ResponseCache(tmp_path / "cache.sqlite", offline=True)
+    with StubNetwork() as stub, executor(cache) as ex:
+        assert ex.get_json(search(stub), {"name": "Lima"}) is None
+        assert stub.requests == 0
+    cache.close()
+
+
+@pytest.mark.parametrize("fail_first", [1, 4])
+def test_retries_are_counted_per_request(fail_first):
+    with StubNetwork(fail_first=fail_first) as stub, executor(max_attempts=5) as ex:
+        names = ["Turku", "Eugene"]
+        results = ex.map([(search(stub), {"name": n}, None) for n in names])
+        assert results == [geocode(n) for n in names]
+        assert ex.counters["retries"] == 2 * fail_first
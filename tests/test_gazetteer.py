@@ -0,0 +1,18 @@
+# tests/test_gazetteer.py
+import gazetteer
+from api_cache import ResponseCache
+from fetch_executor import FetchExecutor
+from stub_network import StubNetwork, elevation
+
+
+def test_fetch_elevations_batches_and_caches_per_location(tmp_path):
+    coords = [(round(40 + i / 100, 2), 10.0) for i in range(gazetteer.ELEVATION_BATCH + 20)]
+    cache = ResponseCache(tmp_path / "cache.sqlite")
+    with StubNetwork() as stub, FetchExecutor(cache=cache, max_workers=4, rate=0) as ex:
+        got = gazetteer.fetch_elevations(coords + coords[:5], ex)
+        assert stub.requests == 2
+        assert got == {c: elevation(*c)["elevation"][0] for c in coords}
+
+        assert gazetteer.fetch_elevations(coords[10:30], ex) == {c: got[c] for c in coords[10:30]}
+        assert stub.requests == 2  # every location is now a cache hit
+    cache.close()
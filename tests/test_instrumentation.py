@@ -0,0 +1,21 @@
+# tests/test_instrumentation.py
+import importlib.util
+import sys
+
+import instrumentation
+
+
+def test_imports_without_the_resource_module(monkeypatch):
+    monkeypatch.setitem(sys.modules, "resource", None)  # as on Windows
+    monkeypatch.setitem(sys.modules, "psutil", None)
+    spec = importlib.util.spec_from_file_location("instrumentation_windows", instrumentation.__file__)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    assert module.resource is None
+
+    recorder = module.RunRecorder()
+    with recorder.stage("clean") as m:
+        m.rows_out = 10
+    assert m.max_rss_mb is None and m.rss_growth_mb is None
+    assert m.cpu_s >= 0
+    assert "clean" in recorder.summary()
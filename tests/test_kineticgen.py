@@ -0,0 +1,29 @@
+# tests/test_kineticgen.py
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+CLI = Path(__file__).resolve().parents[1] / "src" / "kineticgen.py"
+HEAVY = ["pandas", "numpy", "pyarrow", "scipy", "matplotlib"]
+
+PROBE = f"""
+import json, runpy, sys
+sys.argv = ["kineticgen.py"] + json.loads(sys.argv[1])
+try:
+    runpy.run_path({str(CLI)!r}, run_name="__main__")
+except SystemExit as e:
+    code = e.code
+print(json.dumps({{"code": code, "loaded": [m for m in {HEAVY!r} if m in sys.modules]}}))
+"""
+
+
+@pytest.mark.parametrize("argv", [["--help"], ["correct", "--help"], ["fit", "--bogus"]])
+def test_help_and_argument_errors_do_not_import_the_stack(argv):
+    out = subprocess.run([sys.executable, "-c", PROBE, json.dumps(argv)], capture_output=True, text=True,
+                         check=True)
+    result = json.loads(out.stdout.strip().splitlines()[-1])
+    assert result["loaded"] == []
+    assert result["code"] == (2 if "--bogus" in argv else 0)
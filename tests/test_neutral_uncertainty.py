@@ -0,0 +1,59 @@
+# tests/test_neutral_uncertainty.py
+import numpy as np
+import pandas as pd
+
+from correction_engine import neutral_times
+from neutral_uncertainty import InputNoise, neutral_uncertainty, quantile_columns, simulation_inputs
+
+NO_NOISE = InputNoise(wind_resolution=0.0, wind_sd=0.0, temp_sd=0.0, pressure_sd=0.0, rh_sd=0.0,
+                      rho_sd=0.0, altitude_sd=0.0)
+
+
+def results(n, seed=0, weather=True):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "venue": rng.choice(["Oslo", "Rome", "Doha"], n),
+        "date": rng.choice(["01.06.2020", "02.06.2020"], n),
+        "perf": rng.uniform(9.8, 10.4, n),
+        "wind": np.round(rng.uniform(-2.0, 2.0, n), 1),
+        "altitude_m": rng.choice([10.0, 2240.0], n),
+        "rho_air_abs": rng.uniform(1.1, 1.25, n),
+    })
+    if weather:
+        df["temp_c"], df["pressure_hpa"], df["rh_pct"] = 22.0, 1010.0, 50.0
+    return df
+
+
+def test_intervals_collapse_without_input_noise():
+    for weather in (True, False):
+        df = results(40, weather=weather)
+        out = neutral_uncertainty(df, NO_NOISE, draws=50)
+        t = neutral_times(df["perf"], df["wind"], df["altitude_m"], df["rho_air_abs"])
+        np.testing.assert_allclose(out["t_neutral_sd"], 0.0, atol=1e-12)
+        for col in quantile_columns():
+            np.testing.assert_allclose(out[col], t, rtol=1e-12)
+
+
+def test_fixed_seed_is_reproducible_across_chunks_and_workers():
+    df = results(60, seed=1)
+    cols = ["t_neutral_sd", *quantile_columns()]
+    one = neutral_uncertainty(df, draws=200, seed=7, max_cells=2_000)  # 10 rows per chunk
+    again = neutral_uncertainty(df, draws=200, seed=7, max_cells=2_000, workers=2)
+    other = neutral_uncertainty(df, draws=200, seed=8, max_cells=2_000)
+    pd.testing.assert_frame_equal(one[cols], again[cols])
+    assert not np.allclose(one["t_neutral_sd"], other["t_neutral_sd"])
+    assert (one["t_neutral_q05"] < one["t_neutral_q95"]).all()
+
+
+def test_weather_groups_of_many_distinct_records_stay_distinct():
+    # six grouping columns with ~n values each: a mixed-radix code would overflow int64
+    n = 3000
+    rng = np.random.default_rng(2)
+    df = results(n, seed=2).assign(venue=[f"v{i}" for i in rng.permutation(n)],
+                                   date=[f"d{i}" for i in rng.permutation(n)],
+                                   temp_c=rng.permutation(n) / 100, pressure_hpa=900 + rng.permutation(n) / 10,
+                                   rh_pct=rng.permutation(n) / 30)
+    df = pd.concat([df, df.iloc[:5]], ignore_index=True)
+    cols = simulation_inputs(df)
+    assert len(np.unique(cols["conditions"])) == n
+    np.testing.assert_array_equal(cols["conditions"][n:], cols["conditions"][:5])
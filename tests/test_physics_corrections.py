@@ -0,0 +1,54 @@
+# tests/test_physics_corrections.py
+import inspect
+
+import numpy as np
+import pandas as pd
+
+from correction_engine import DEFAULT_PARAMS, CorrectionParams, neutral_times
+from instrumentation import RunRecorder
+from physics_corrections import physics_corrections
+from pipeline import STAGES, Runner, Stage
+
+
+def results():
+    return pd.DataFrame({
+        "competitor": ["A", "B", "C"],
+        "venue": ["X", "Y", "Z"],
+        "perf": [9.58, 9.80, 10.01],
+        "wind": [0.9, -1.2, 2.0],
+        "altitude_m": [40.0, 1500.0, 2240.0],
+        "rho_air_abs": [1.20, 1.05, 0.98],
+    })
+
+
+def physics_stage(tmp_path, params):
+    return Stage("physics", "physics_corrections:physics_corrections", str(tmp_path / "physics.parquet"),
+                 inputs=[str(tmp_path / "input.parquet")], params=params, code=["correction_engine"])
+
+
+def run(tmp_path, params):
+    runner = Runner([physics_stage(tmp_path, params)], state_dir=tmp_path / "state",
+                    recorder=RunRecorder(report_dir=tmp_path / "runs"))
+    runner.run(report=False)
+    return pd.read_parquet(tmp_path / "physics.parquet")
+
+
+def test_defaults_are_the_correction_params():
+    defaults = {k: p.default for k, p in inspect.signature(physics_corrections).parameters.items()
+                if k in DEFAULT_PARAMS.to_dict()}
+    assert defaults == DEFAULT_PARAMS.to_dict()
+    stage = next(s for s in STAGES if s.name == "physics")
+    assert {k: stage.params[k] for k in defaults} == DEFAULT_PARAMS.to_dict()
+
+
+def test_editing_a_coefficient_changes_t_neutral(tmp_path):
+    results().to_parquet(tmp_path / "input.parquet", index=False)
+    before = run(tmp_path, DEFAULT_PARAMS.to_dict())
+
+    edited = CorrectionParams(wind_coeff=0.09)
+    after = run(tmp_path, edited.to_dict())
+
+    df = results()
+    expected = neutral_times(df["perf"], df["wind"], df["altitude_m"], df["rho_air_abs"], edited)
+    assert not np.allclose(before["t_neutral"], after["t_neutral"])
+    np.testing.assert_allclose(after["t_neutral"], expected)
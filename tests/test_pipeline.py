@@ -0,0 +1,122 @@
+# tests/test_pipeline.py
+import numpy as np
+import pandas as pd
+
+from correction_engine import DEFAULT_PARAMS, neutral_times
+from correction_surface import CorrectionSurface
+from instrumentation import RunRecorder
+from pipeline import Runner, Stage
+
+
+def results(n, start=0):
+    i = np.arange(start, start + n)
+    return pd.DataFrame({
+        "competitor": [f"athlete {k}" for k in i],
+        "venue": [f"venue {k % 7}" for k in i],
+        "perf": 9.8 + (i % 50) / 100,
+        "wind": (i % 9 - 4) / 2.0,
+        "altitude_m": (i % 5) * 400.0,
+        "rho_air_abs": 1.2 - (i % 5) * 0.04,
+    })
+
+
+def run(tmp_path, params=DEFAULT_PARAMS.to_dict(), files=(), **kwargs):
+    """Run a physics stage over tmp_path/input.parquet; returns (mode, output)."""
+    stage = Stage("physics", "physics_corrections:physics_corrections", str(tmp_path / "physics.parquet"),
+                  inputs=[str(tmp_path / "input.parquet")], params=params, code=["correction_engine"],
+                  files=list(files))
+    runner = Runner([stage], state_dir=tmp_path / "state", recorder=RunRecorder(report_dir=tmp_path / "runs"))
+    runner.run(report=False, **kwargs)
+    return runner.recorder.stages[0].mode, pd.read_parquet(tmp_path / "physics.parquet")
+
+
+def expected(df):
+    return neutral_times(df["perf"], df["wind"], df["altitude_m"], df["rho_air_abs"])
+
+
+def test_unchanged_input_is_skipped(tmp_path):
+    results(20).to_parquet(tmp_path / "input.parquet", index=False)
+    assert run(tmp_path)[0] == "full"
+    assert run(tmp_path)[0] == "skipped"
+    assert run(tmp_path, force=True)[0] == "full"
+
+
+def test_appended_rows_run_as_a_delta(tmp_path):
+    results(20).to_parquet(tmp_path / "input.parquet", index=False)
+    run(tmp_path)
+    grown = pd.concat([results(20), results(5, start=20)], ignore_index=True)
+    grown.to_parquet(tmp_path / "input.parquet", index=False)
+
+    mode, out = run(tmp_path)
+    assert mode == "delta"
+    assert len(out) == 25
+    out = out.sort_values("competitor").reset_index(drop=True)
+    grown = grown.sort_values("competitor").reset_index(drop=True)
+    np.testing.assert_allclose(out["t_neutral"], expected(grown))
+
+
+def test_removed_rows_are_dropped_from_the_output(tmp_path):
+    results(20).to_parquet(tmp_path / "input.parquet", index=False)
+    run(tmp_path)
+    results(20).iloc[5:].to_parquet(tmp_path / "input.parquet", index=False)
+
+    mode, out = run(tmp_path)
+    assert mode == "delta"
+    assert sorted(out["competitor"]) == sorted(results(20).iloc[5:]["competitor"])
+
+
+def test_changed_params_rerun_in_full(tmp_path):
+    results(20).to_parquet(tmp_path / "input.parquet", index=False)
+    run(tmp_path)
+    mode, _ = run(tmp_path, {**DEFAULT_PARAMS.to_dict(), "wind_coeff": 0.09})
+    assert mode == "full"
+
+
+def flat_surface(directory, delta):
+    axes = {"wind": [-4.0, 4.0], "rho": [0.8, 1.4], "perf": [9.0, 12.0]}
+    CorrectionSurface(axes, np.full((2, 2, 2), delta)).save(directory)
+
+
+def test_surface_files_are_part_of_the_fingerprint(tmp_path):
+    surface = tmp_path / "surface"
+    params = {**DEFAULT_PARAMS.to_dict(), "surface_dir": str(surface)}
+    files = [surface / "surface.npy", surface / "surface.json"]
+    results(20).to_parquet(tmp_path / "input.parquet", index=False)
+
+    mode, out = run(tmp_path, params, files)  # not built yet: no model column
+    assert mode == "full" and "t_neutral_model" not in out
+
+    flat_surface(surface, -0.05)
+    mode, out = run(tmp_path, params, files)
+    assert mode == "full"
+    np.testing.assert_allclose(out["t_neutral_model"], out["perf"] - 0.05, rtol=1e-6)
+    assert run(tmp_path, params, files)[0] == "skipped"
+
+    flat_surface(surface, -0.10)  # rebuilt surface: no reuse of old rows
+    results(25).to_parquet(tmp_path / "input.parquet", index=False)
+    mode, out = run(tmp_path, params, files)
+    assert mode == "full"
+    np.testing.assert_allclose(out["t_neutral_model"], out["perf"] - 0.10, rtol=1e-6)
+
+
+def own_fetcher():
+    from fetch_executor import FetchExecutor
+    return FetchExecutor(max_workers=2, rate=100.0)
+
+
+def fetching_stage(fetch):
+    import gazetteer
+    jobs = [(gazetteer.ELEVATION_URL, {"latitude": str(1.0 + i), "longitude": "2.0"}, None) for i in range(3)]
+    return pd.DataFrame({"elevation": [js["elevation"][0] for js in fetch.map(jobs)]})
+
+
+def test_a_stage_with_its_own_fetcher_has_its_requests_recorded(tmp_path):
+    from stub_network import StubNetwork
+    stage = Stage("scrape", "test_pipeline:fetching_stage", str(tmp_path / "pages.parquet"),
+                  fetch="test_pipeline:own_fetcher", incremental=False, external=True)
+    runner = Runner([stage], state_dir=tmp_path / "state", recorder=RunRecorder(report_dir=tmp_path / "runs"))
+    with StubNetwork() as stub:
+        runner.run(["scrape"], report=False)
+    assert stub.requests == 3
+    assert runner.recorder.stages[0].http["requests"] == 3
+    assert runner.live_fetcher() is None  # closed with the stage; the shared executor was never opened
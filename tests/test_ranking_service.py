@@ -0,0 +1,129 @@
+# tests/test_ranking_service.py
+import numpy as np
+import pandas as pd
+import pytest
+
+from correction_engine import neutral_times
+from ranking_service import NeutralRanking, athlete_labels
+
+FILTERS = [
+    {},
+    {"venue": "Oslo"},
+    {"venue": ["Oslo", "Rome"]},
+    {"year": (2001, 2003)},
+    {"year": 2004},
+    {"wind_band": "tail"},
+    {"wind_band": ["strong_head", "assisted"]},
+    {"altitude_band": "altitude"},
+    {"athlete": "A3 (1990)"},
+    {"venue": "Rome", "year": (2000, 2002), "wind_band": ["head", "tail"]},
+    {"athlete": ["A1 (1990)", "A7 (1991)"], "altitude_band": ["low", "mid"]},
+    {"venue": "Nowhere"},
+]
+
+
+def results(n, seed):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "competitor": [f"A{i}" for i in rng.integers(0, 12, n)],
+        "dob": rng.choice(["1990", "1991"], n),
+        "venue": rng.choice(["Oslo", "Rome", "Doha", "Mexico City"], n),
+        "year": rng.integers(2000, 2006, n),
+        "perf": np.round(rng.uniform(9.8, 10.6, n), 2),  # hundredths: plenty of ties
+        "wind": rng.choice([-2.5, -1.0, 0.0, 0.5, 1.5, 2.4], n),
+        "altitude_m": rng.choice([10.0, 600.0, 2240.0], n),
+        "rho_air_abs": 1.2,
+    })
+    df.loc[rng.choice(n, 5, replace=False), "perf"] = np.nan  # unranked
+    return df
+
+
+def expected(df, **filters):
+    """Brute force: every ranked row, sorted by neutral time (ties in arrival order), then filtered."""
+    out = df.reset_index(drop=True).assign(
+        row=np.arange(len(df)),
+        t_neutral=neutral_times(df["perf"], df["wind"], df["altitude_m"], df["rho_air_abs"]),
+        athlete=athlete_labels(df).to_numpy())
+    out = out[np.isfinite(out["t_neutral"])].sort_values("t_neutral", kind="stable")
+    keep = np.ones(len(out), dtype=bool)
+    for dim, value in filters.items():
+        if dim == "year" and isinstance(value, tuple):
+            keep &= out["year"].between(*value).to_numpy()
+            continue
+        values = [value] if isinstance(value, (str, int)) else list(value)
+        if dim == "wind_band":
+            band = pd.cut(out["wind"], [-np.inf, -2.0, 0.0, 2.0, np.inf],
+                          labels=["strong_head", "head", "tail", "assisted"])
+            keep &= band.isin(values).to_numpy()
+        elif dim == "altitude_band":
+            band = pd.cut(out["altitude_m"], [-np.inf, 500.0, 1000.0, np.inf], right=False,
+                          labels=["low", "mid", "altitude"])
+            keep &= band.isin(values).to_numpy()
+        else:
+            keep &= out[dim].isin(values).to_numpy()
+    return out[keep]
+
+
+def check_top(ranking, df, k):
+    for filters in FILTERS:
+        want = expected(df, **filters).head(k)
+        got = ranking.top(k, **filters)
+        assert got["row"].tolist() == want["row"].tolist(), filters
+        np.testing.assert_allclose(got["t_neutral"], want["t_neutral"])
+        assert got["athlete"].tolist() == want["athlete"].tolist()
+
+
+@pytest.mark.parametrize("k", [1, 10, 100, 1000])
+def test_top_matches_brute_force_sort(k):
+    df = results(600, seed=1)
+    check_top(NeutralRanking(df), df, k)
+
+
+def test_top_after_appends_matches_brute_force_sort():
+    df = results(900, seed=2)
+    ranking = NeutralRanking()
+    for part in np.array_split(np.arange(len(df)), [100, 101, 400, 401]):  # incl. one-row batches
+        ranking.append(df.iloc[part])
+        check_top(ranking, df.iloc[:part[-1] + 1], 50)
+
+    fresh = NeutralRanking(df)
+    for d in ranking.index:
+        assert np.array_equal(ranking.index[d], fresh.index[d]), d
+    assert np.array_equal(ranking.best, fresh.best)
+
+
+def test_best_per_athlete_and_rank_of():
+    df = results(500, seed=3)
+    ranking = NeutralRanking(df.iloc[:250])
+    ranking.append(df.iloc[250:])
+    for filters in FILTERS:
+        want = expected(df, **filters).drop_duplicates("athlete").head(5)
+        got = ranking.best_per_athlete(5, **filters)
+        assert got["row"].tolist() == want["row"].tolist(), filters
+
+        t = expected(df, **filters)["t_neutral"].to_numpy()
+        for mark in (9.0, np.median(t) if len(t) else 10.0, 12.0):
+            assert ranking.rank_of(mark, **filters) == 1 + int((t < mark).sum()), filters
+
+
+def test_refresh_appends_new_rows_and_rebuilds_on_removal(tmp_path):
+    df = results(400, seed=4)
+    path = tmp_path / "results.parquet"
+    df.iloc[:300].to_parquet(path)
+    ranking = NeutralRanking.from_parquet(path)
+
+    df.to_parquet(path)
+    mode, added = ranking.refresh(path)
+    assert mode == "appended" and added == expected(df.iloc[300:]).shape[0]
+    check_top(ranking, df, 50)
+    assert ranking.refresh(path) == ("appended", 0)
+
+    fewer = df.drop(index=df.index[10])
+    fewer.to_parquet(path)
+    assert ranking.refresh(path)[0] == "rebuilt"
+    check_top(ranking, fewer, 50)
+
+
+def test_unknown_band_is_an_error():
+    with pytest.raises(ValueError):
+        NeutralRanking(results(50, seed=5)).top(wind_band="gale")
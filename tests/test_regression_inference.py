@@ -0,0 +1,37 @@
+# tests/test_regression_inference.py
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from regression_inference import infer
+
+
+def results(n=60, constant_rho=False):
+    rng = np.random.default_rng(3)
+    df = pd.DataFrame({
+        "wind": rng.uniform(-2, 2, n),
+        "rho_air_abs": np.full(n, 1.2) if constant_rho else rng.normal(1.15, 0.04, n),
+        "altitude_m": rng.uniform(0, 2000, n),
+        "venue": rng.choice(["A", "B", "C", "D"], n),
+    })
+    df["delta"] = -0.06 * df["wind"] + 0.5 * (df["rho_air_abs"] - 1.2) + rng.normal(0, 0.01, n)
+    return df
+
+
+def test_matches_least_squares_and_is_seeded():
+    df = results()
+    a, b = infer(df, n_resamples=200, seed=1), infer(df, n_resamples=200, seed=1)
+    pd.testing.assert_frame_equal(a, b)
+    X = np.column_stack([np.ones(len(df)), df[["wind", "rho_air_abs", "altitude_m"]].to_numpy()])
+    np.testing.assert_allclose(a["Coefficient"], np.linalg.lstsq(X, df["delta"].to_numpy(), rcond=None)[0])
+    assert a.loc[a["Variable"] == "wind", "Perm_p"].item() < 0.01
+
+
+def test_constant_regressor_gives_nan_inference_instead_of_raising():
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)  # all-NaN bootstrap columns
+        out = infer(results(constant_rho=True), n_resamples=50)
+    assert np.isfinite(out["Coefficient"]).all()
+    assert out["Perm_p"].isna().all()
+    assert out["Boot_SE"].isna().all()
@@ -0,0 +1,40 @@
+# tests/test_render_report.py
+import json
+
+import numpy as np
+import pandas as pd
+from matplotlib.collections import PathCollection, QuadMesh
+
+from render_report import DENSITY_THRESHOLD, plt, points, render_report
+
+
+def test_large_scatters_become_density_images():
+    rng = np.random.default_rng(0)
+    x = rng.normal(size=DENSITY_THRESHOLD + 100)
+    y = x + rng.normal(size=len(x))
+    x[:10] = np.nan  # dropped before counting
+
+    fig, (small, big) = plt.subplots(1, 2)
+    assert points(small, x[10:500], y[10:500]) == "scatter"
+    assert points(big, x, y) == "density"
+    assert any(isinstance(c, PathCollection) for c in small.collections)
+    mesh = [c for c in big.collections if isinstance(c, QuadMesh)]
+    assert not any(isinstance(c, PathCollection) for c in big.collections)
+    assert mesh[0].get_array().sum() == len(x) - 10  # every finite point lands in a bin
+    plt.close(fig)
+
+
+def test_render_report_writes_density_figures_and_manifest(tmp_path):
+    rng = np.random.default_rng(1)
+    n = DENSITY_THRESHOLD + 500
+    perf = rng.normal(10.2, 0.2, n)
+    path = tmp_path / "results.parquet"
+    pd.DataFrame({"perf": perf, "t_neutral": perf + rng.normal(0, 0.05, n),
+                  "wind": rng.uniform(-2, 2, n)}).to_parquet(path)
+
+    manifest = render_report(path, tmp_path / "out", formats=("png",), names=["raw_vs_neutral", "wind_vs_delta"],
+                             workers=1)
+    assert [f["mode"] for f in manifest["figures"]] == ["density", "density"]
+    assert all(f["rows"] == n for f in manifest["figures"])
+    assert (tmp_path / "out" / "raw_vs_neutral.png").stat().st_size > 0
+    assert json.loads((tmp_path / "out" / "manifest.json").read_text()) == manifest
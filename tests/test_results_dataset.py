@@ -0,0 +1,95 @@
+# tests/test_results_dataset.py
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from results_dataset import ResultsDataset
+
+QUERIES = [
+    {},
+    {"venue": "Oslo"},
+    {"venue": ["Oslo", "Rome"], "wind": (-1.0, 2.0)},
+    {"competitor": "A3", "altitude": (None, 1000.0)},
+    {"year": 2019},
+    {"year": (2018, 2020), "wind": (0.0, None)},
+]
+
+
+def results(n=2000, seed=0):
+    rng = np.random.default_rng(seed)
+    year = rng.integers(2015, 2023, n)
+    df = pd.DataFrame({
+        "competitor": [f"A{i}" for i in rng.integers(0, 20, n)],
+        "venue": rng.choice(["Oslo", "Rome", "Doha", "Mexico City"], n),
+        "date": [f"0{d} JUN {y}" for d, y in zip(rng.integers(1, 10, n), year)],
+        "year": year,
+        "perf": rng.normal(10.2, 0.2, n),
+        "wind": np.round(rng.uniform(-3.0, 3.0, n), 1),
+        "altitude_m": rng.choice([10.0, 600.0, 2240.0], n),
+    })
+    df["t_neutral"] = df["perf"] - 0.05 * df["wind"]
+    df.loc[rng.choice(n, 50, replace=False), "wind"] = np.nan
+    return df
+
+
+def expected(df, venue=None, competitor=None, year=None, wind=None, altitude=None):
+    keep = pd.Series(True, index=df.index)
+    if venue is not None:
+        keep &= df["venue"].isin([venue] if isinstance(venue, str) else venue)
+    if competitor is not None:
+        keep &= df["competitor"].eq(competitor)
+    if year is not None:
+        keep &= df["year"].between(*year) if isinstance(year, tuple) else df["year"].eq(year)
+    for col, bounds in (("wind", wind), ("altitude_m", altitude)):
+        if bounds is not None:
+            lo, hi = bounds
+            keep &= df[col].ge(-np.inf if lo is None else lo) & df[col].le(np.inf if hi is None else hi)
+    return df[keep]
+
+
+def sort(df):
+    return df.sort_values(list(df.columns), ignore_index=True)
+
+
+@pytest.mark.parametrize("with_year", [True, False])
+def test_pushdown_returns_the_rows_pandas_filtering_does(tmp_path, with_year):
+    df = results()
+    path = tmp_path / "results.parquet"
+    source = df if with_year else df.drop(columns="year")  # without it, years come from the dates
+    pq.write_table(pa.Table.from_pandas(source, preserve_index=False), path, row_group_size=128)
+    data = ResultsDataset(path)
+
+    for query in QUERIES:
+        want = expected(df, **query)
+        got = data.read(["competitor", "wind", "perf"], **query)
+        assert list(got.columns) == ["competitor", "wind", "perf"]
+        pd.testing.assert_frame_equal(sort(got), sort(want[["competitor", "wind", "perf"]]))
+        assert data.count(**query) == len(want)
+
+        got = data.read(["venue", "wind", "delta"], dropna=True, **query)
+        want = want.assign(delta=want["t_neutral"] - want["perf"]).dropna(subset=["wind"])
+        pd.testing.assert_frame_equal(sort(got), sort(want[["venue", "wind", "delta"]]))
+        streamed = pd.concat(data.iter_batches(["venue", "wind", "delta"], dropna=True, batch_size=100, **query))
+        pd.testing.assert_frame_equal(sort(streamed), sort(got))
+
+
+def test_partitioned_directory_and_cache_invalidation(tmp_path):
+    df = results(500, seed=1)
+    pq.write_to_dataset(pa.Table.from_pandas(df, preserve_index=False), tmp_path / "parts",
+                        partition_cols=["venue"])
+    data = ResultsDataset(tmp_path / "parts")
+    got = data.read(["competitor", "perf"], venue="Rome", year=(2016, 2017))
+    want = expected(df, venue="Rome", year=(2016, 2017))[["competitor", "perf"]]
+    pd.testing.assert_frame_equal(sort(got), sort(want))
+
+    file = tmp_path / "one.parquet"
+    df.iloc[:100].to_parquet(file)
+    data = ResultsDataset(file)
+    assert len(data.read(["perf"])) == 100
+    df.iloc[:60].to_parquet(file)
+    os.utime(file, (1, 1))  # a different mtime, whatever the clock resolution
+    assert len(data.read(["perf"])) == 60
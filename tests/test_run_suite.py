@@ -0,0 +1,36 @@
+# tests/test_run_suite.py
+import json
+
+import run_suite
+
+
+def document(**seconds):
+    return {"tier": "10k", "rows": 10_000, "repeat": 1, "host": {"cpus": 1},
+            "cases": {name: {"seconds": s, "rows": 10_000, "rows_per_s": round(10_000 / s)}
+                      for name, s in seconds.items()}}
+
+
+def status(rows):
+    return {r[0]: r[5] for r in rows}
+
+
+def test_compare_flags_a_slowdown():
+    rows = run_suite.compare(document(correction=0.50), document(correction=0.20))
+    assert status(rows) == {"correction": "REGRESSION"}
+
+
+def test_compare_tolerates_noise():
+    rows = run_suite.compare(document(correction=0.21, density=0.0004),
+                             document(correction=0.20, density=0.0001))
+    assert status(rows) == {"correction": "ok", "density": "ok"}  # density: under MIN_DELTA_S
+    assert status(run_suite.compare(document(clean=0.1), None)) == {"clean": "new"}
+
+
+def test_main_exits_nonzero_on_a_regression(tmp_path, monkeypatch):
+    (tmp_path / "10k.json").write_text(json.dumps(document(clean=0.05)))
+    monkeypatch.setattr(run_suite, "BASELINE_DIR", tmp_path)
+    monkeypatch.setattr(run_suite, "run_suite", lambda tier, cases, repeat: document(clean=0.5))
+    assert run_suite.main(["--cases", "clean"]) == 1
+
+    monkeypatch.setattr(run_suite, "run_suite", lambda tier, cases, repeat: document(clean=0.05))
+    assert run_suite.main(["--cases", "clean"]) == 0
@@ -0,0 +1,42 @@
+# tests/test_scrape_results.py
+from scrape_results import ToplistSpec, crawl
+
+
+def page_html(page):
+    return f"<table><tbody><tr><td>{page}</td><td>9.9{page}</td></tr></tbody></table>"
+
+
+class FakeFetch:
+    """Serves pages 1..last; pages in `fail` come back as None, as after exhausted retries."""
+    max_workers = 2
+
+    def __init__(self, last, fail=()):
+        self.last, self.fail, self.requested = last, set(fail), []
+
+    def map(self, jobs, text=False):
+        out = []
+        for _, params, _ in jobs:
+            page = params["page"]
+            self.requested.append(page)
+            if page in self.fail:
+                out.append(None)
+            else:
+                out.append(page_html(page) if page <= self.last else "<table><tbody></tbody></table>")
+        return out
+
+
+def test_failed_page_is_skipped_not_end_of_list():
+    df = crawl([ToplistSpec()], FakeFetch(last=5, fail={2}))
+    assert sorted(df["rank"].astype(int)) == [1, 3, 4, 5]
+
+
+def test_list_ends_at_first_empty_page():
+    fetch = FakeFetch(last=3)
+    df = crawl([ToplistSpec()], fetch)
+    assert len(df) == 3 and max(fetch.requested) == 4
+
+
+def test_list_stops_when_a_whole_wave_fails():
+    fetch = FakeFetch(last=10, fail={3, 4})
+    df = crawl([ToplistSpec()], fetch)
+    assert sorted(df["rank"].astype(int)) == [1, 2] and max(fetch.requested) == 4
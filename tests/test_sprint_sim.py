@@ -0,0 +1,47 @@
+# tests/test_sprint_sim.py
+import numpy as np
+import pandas as pd
+
+from sprint_sim import simulate, simulate_frame
+
+F0 = np.array([7.0, 8.3, 9.5])
+V0 = np.array([11.5, 13.2, 12.0])
+
+
+def analytic_velocity(t, f0, v0, tau):
+    """Without drag, dv/dt = f0·exp(−t/tau)·(1 − v/v0) is linear in v."""
+    return v0 * (1.0 - np.exp(-f0 * tau / v0 * (1.0 - np.exp(-t / tau))))
+
+
+def analytic_finish(distance, f0, v0):
+    """Without drag or fatigue, x(t) = v0·t − v0²/f0·(1 − exp(−f0·t/v0)); solved by bisection."""
+    lo, hi = np.zeros_like(f0), np.full_like(f0, 60.0)
+    for _ in range(100):
+        mid = (lo + hi) / 2
+        short = v0 * mid - v0 ** 2 / f0 * (1.0 - np.exp(-f0 * mid / v0)) < distance
+        lo, hi = np.where(short, mid, lo), np.where(short, hi, mid)
+    return (lo + hi) / 2
+
+
+def test_velocity_matches_analytic_solution_without_drag():
+    tau = np.array([12.0, 5.0, 30.0])
+    res = simulate(f0=F0, v0=V0, tau=tau, cd_a=0.0, wind=3.0, distance=100.0, dt=0.01, curve_dt=0.1)
+    want = analytic_velocity(res.t[None, :], F0[:, None], V0[:, None], tau[:, None])
+    seen = np.isfinite(res.velocity)
+    assert seen[:, :50].all()
+    np.testing.assert_allclose(res.velocity[seen], want[seen], rtol=1e-5, atol=1e-5)
+    np.testing.assert_allclose(res.drag_energy_j, 0.0)
+
+
+def test_finish_time_matches_analytic_solution_without_drag_or_fatigue():
+    res = simulate(f0=F0, v0=V0, tau=1e12, rho=0.0, distance=[60.0, 100.0, 200.0],
+                   reaction_time=0.15, dt=0.01, t_max=30.0)
+    want = analytic_finish(np.array([60.0, 100.0, 200.0]), F0, V0) + 0.15
+    np.testing.assert_allclose(res.race_time, want, atol=1e-4)
+
+
+def test_drag_slows_headwind_runs_and_dedupe_changes_nothing():
+    df = pd.DataFrame({"wind": [-2.0, 0.0, 2.0, 0.0, 2.0], "rho_air_abs": [1.2, 1.2, 1.2, 0.9, 1.2]})
+    times = simulate_frame(df).race_time
+    assert times[0] > times[1] > times[2] and times[3] < times[1]
+    np.testing.assert_array_equal(times, simulate_frame(df, dedupe=False).race_time)
@@ -0,0 +1,56 @@
+# tests/test_streaming_ols.py
+import numpy as np
+import pandas as pd
+
+from streaming_ols import OLSAccumulator, predict
+
+REGRESSORS = ["wind", "rho_air_abs", "altitude_m"]
+
+
+def frame(n, seed):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({"wind": rng.uniform(-2, 2, n), "rho_air_abs": rng.normal(1.15, 0.04, n),
+                       "altitude_m": rng.uniform(0, 2000, n)})
+    df["delta"] = 0.01 - 0.06 * df["wind"] + 0.4 * (df["rho_air_abs"] - 1.2) + rng.normal(0, 0.01, n)
+    return df
+
+
+def test_merged_batches_match_one_shot_lstsq():
+    batches = [frame(n, seed) for seed, n in enumerate([5, 300, 1, 1200])]
+    acc = OLSAccumulator(REGRESSORS, "delta").update(batches[0])
+    for b in batches[1:3]:
+        acc.update(b)
+    acc.merge(OLSAccumulator(REGRESSORS, "delta").update(batches[3]))
+
+    df = pd.concat(batches, ignore_index=True)
+    X = np.column_stack([np.ones(len(df)), df[REGRESSORS].to_numpy()])
+    beta, rss = np.linalg.lstsq(X, df["delta"].to_numpy(), rcond=None)[:2]
+    fit = acc.fit()
+    assert fit.attrs["n"] == len(df)
+    np.testing.assert_allclose(fit["Coefficient"], beta, rtol=1e-9, atol=1e-12)
+    np.testing.assert_allclose(predict(fit, df), X @ beta, atol=1e-10)
+    sigma2 = rss[0] / (len(df) - X.shape[1])
+    np.testing.assert_allclose(fit["Std_Error"], np.sqrt(sigma2 * np.diag(np.linalg.inv(X.T @ X))), rtol=1e-6)
+
+
+def test_vif_matches_auxiliary_regressions():
+    df = frame(500, 7)
+    df["altitude_m"] += 3000 * df["rho_air_abs"]  # make two regressors correlated
+    vif = OLSAccumulator(REGRESSORS, "delta").update(df).vif()["VIF"].to_numpy()
+    for j, c in enumerate(REGRESSORS):
+        others = [o for o in REGRESSORS if o != c]
+        X = np.column_stack([np.ones(len(df)), df[others].to_numpy()])
+        resid = df[c] - X @ np.linalg.lstsq(X, df[c].to_numpy(), rcond=None)[0]
+        r2 = 1 - (resid ** 2).sum() / ((df[c] - df[c].mean()) ** 2).sum()
+        np.testing.assert_allclose(vif[j], 1 / (1 - r2), rtol=1e-8)
+
+
+def test_constant_and_collinear_regressors_do_not_raise():
+    df = frame(200, 1).assign(rho_air_abs=1.2)
+    acc = OLSAccumulator(REGRESSORS, "delta").update(df)
+    assert np.isfinite(acc.fit()["Coefficient"]).all()
+    assert np.isnan(acc.vif()["VIF"][1]) and np.isfinite(acc.vif()["VIF"][[0, 2]]).all()
+
+    df = frame(200, 2)
+    df["altitude_m"] = 1000 * df["wind"]
+    assert np.isinf(OLSAccumulator(REGRESSORS, "delta").update(df).vif()["VIF"][[0, 2]]).all()
@@ -0,0 +1,43 @@
+# tests/test_weather_archive.py
+import numpy as np
+import pandas as pd
+
+import weather_archive
+from npy_store import append_rows
+
+
+def hourly(lat, lon, start, hours, temp):
+    return pd.DataFrame({"lat": lat, "lon": lon, "time": pd.date_range(start, periods=hours, freq="h"),
+                         "temp_c": temp, "pressure_hpa": 1000.0, "rh_pct": 50.0})
+
+
+def test_import_updates_stored_blocks_and_appends_new_ones(tmp_path):
+    assert weather_archive.import_frame(hourly(52.5, 13.4, "2020-06-01", 48, 20.0), tmp_path) == 1
+    before = np.load(tmp_path / "temp_c.npy", mmap_mode="r").shape
+
+    frame = pd.concat([hourly(52.5, 13.4, "2020-06-02", 24, 25.0),   # same block, overwrites day 2
+                       hourly(52.5, 13.4, "2021-06-01", 24, 15.0),   # new year
+                       hourly(40.4, -3.7, "2020-06-01", 24, 30.0)])  # new location
+    assert weather_archive.import_frame(frame, tmp_path) == 3
+
+    archive = weather_archive.WeatherArchive(tmp_path)
+    assert archive.arrays["temp_c"].shape == (before[0] + 2, before[1])
+    daily = archive.daily([52.5, 52.5, 52.5, 40.4], [13.4, 13.4, 13.4, -3.7],
+                          ["2020-06-01", "2020-06-02", "2021-06-01", "2020-06-01"])
+    assert daily["temp_c"].tolist() == [20.0, 25.0, 15.0, 30.0]
+
+
+def test_append_rows_drops_rows_past_at(tmp_path):
+    file = tmp_path / "a.npy"
+    append_rows(file, np.zeros((2, 3), dtype=np.float32))
+    append_rows(file, np.ones((2, 3), dtype=np.float32))  # never indexed, as after a crash
+    assert append_rows(file, np.full((1, 3), 2, dtype=np.float32), at=2) == 3
+    assert np.load(file)[:, 0].tolist() == [0, 0, 2]
+
+
+def test_append_rows_copies_files_without_header_room(tmp_path, monkeypatch):
+    file = tmp_path / "a.npy"
+    np.save(file, np.zeros((2, 3), dtype=np.int16))
+    monkeypatch.setattr("npy_store._header", lambda shape, dtype: b"")  # force the copy path
+    assert append_rows(file, np.ones((1, 3), dtype=np.int16)) == 3
+    assert np.load(file)[:, 0].tolist() == [0, 0, 1]